@@ -0,0 +1,115 @@
+"""
+Micro-benchmarks for the hot paths of ``golos-python`` (serialization, signing, key derivation, account maths).
+
+**To run the benchmarks**:
+
+.. code-block:: bash
+
+    python3 -m benchmarks                     # Run all benchmarks, comparing against benchmarks/baseline.json
+    python3 -m benchmarks -k digest -k base58 # Only run benchmarks with 'digest' or 'base58' in their name
+    python3 -m benchmarks --save              # Run all benchmarks and save the results as the new baseline
+
+When a baseline exists, the runner exits with status code ``1`` if any benchmark is more than ``--threshold``
+(default 25%) slower than its baseline, so it can be used as a regression gate. Baselines are only comparable when
+recorded on the same machine and Python version - re-save them after changing either.
+
+Benchmarks are plain functions registered with :func:`.benchmark` in :py:mod:`benchmarks.suite`. Each one is
+called in a calibrated loop, repeated several times, and the fastest time per call is reported, as the minimum is
+the measurement least affected by other processes.
+"""
+import json
+import platform
+import sys
+import timeit
+from collections import OrderedDict
+from os.path import join, dirname, abspath, exists
+from typing import Callable, Dict, List
+
+BASE_DIR = dirname(abspath(__file__))
+BASELINE_FILE = join(BASE_DIR, 'baseline.json')
+
+REGISTRY: Dict[str, Callable] = OrderedDict()
+"""Maps each benchmark name to its function, in registration order"""
+
+
+def benchmark(name: str):
+    """
+    Decorator which registers a zero-argument function as the benchmark ``name``
+
+        >>> @benchmark('base58_encode')
+        ... def _bench():
+        ...     base58encode('deadbeef')
+
+    """
+    def _decorator(f: Callable):
+        REGISTRY[name] = f
+        return f
+    return _decorator
+
+
+def measure(func: Callable, repeat: int = 5, min_time: float = 0.2) -> dict:
+    """
+    Time ``func``, calibrating the loop count so each repeat runs for at least ``min_time`` seconds.
+
+    :return dict result: ``dict(best, median, loops, repeat)`` - ``best`` / ``median`` are seconds per call
+    """
+    timer = timeit.Timer(func)
+    loops = 1
+    while True:
+        if timer.timeit(loops) >= min_time:
+            break
+        loops *= 2 if loops < 1000 else 10
+    times = sorted(t / loops for t in timer.repeat(repeat=repeat, number=loops))
+    return dict(best=times[0], median=times[len(times) // 2], loops=loops, repeat=repeat)
+
+
+def load_baseline(path: str = BASELINE_FILE) -> dict:
+    if not exists(path):
+        return {}
+    with open(path, 'r') as fh:
+        return json.load(fh)
+
+
+def save_baseline(results: Dict[str, dict], path: str = BASELINE_FILE):
+    """Merge ``results`` into the baseline file at ``path``, recording the interpreter they were measured with"""
+    data = load_baseline(path)
+    data['python'] = platform.python_version()
+    data['machine'] = platform.machine()
+    data.setdefault('results', {}).update({k: dict(best=v['best'], median=v['median']) for k, v in results.items()})
+    with open(path, 'w') as fh:
+        json.dump(data, fh, indent=4, sort_keys=True)
+
+
+def format_time(secs: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e3), ('us', 1e6)):
+        if secs * scale >= 1:
+            return '{:.2f}{}'.format(secs * scale, unit)
+    return '{:.0f}ns'.format(secs * 1e9)
+
+
+def run(names: List[str] = None, repeat: int = 5, min_time: float = 0.2, threshold: float = 0.25,
+        baseline: dict = None, out=sys.stdout) -> Dict[str, dict]:
+    """
+    Run the benchmarks ``names`` (default: all registered benchmarks), printing a comparison with ``baseline``.
+
+    Each result has the additional keys ``baseline`` (baseline best time or ``None``), ``change``
+    (fractional change vs baseline) and ``regression`` (``True`` if slower than the baseline by > ``threshold``).
+    """
+    from benchmarks import suite  # noqa: F401 - registers the benchmarks
+    baseline = (baseline or {}).get('results', {})
+    names = list(REGISTRY.keys()) if names is None else names
+    results = OrderedDict()
+    print('{:<40}{:>12}{:>12}{:>12}{:>10}'.format('Benchmark', 'Best', 'Median', 'Baseline', 'Change'), file=out)
+    for name in names:
+        res = results[name] = measure(REGISTRY[name], repeat=repeat, min_time=min_time)
+        base = baseline.get(name, {}).get('best')
+        res['baseline'], res['change'], res['regression'] = base, None, False
+        line = '{:<40}{:>12}{:>12}'.format(name, format_time(res['best']), format_time(res['median']))
+        if base:
+            res['change'] = (res['best'] - base) / base
+            res['regression'] = res['change'] > threshold
+            line += '{:>12}{:>+9.1f}%'.format(format_time(base), res['change'] * 100)
+            if res['regression']:
+                line += '  REGRESSION'
+        print(line, file=out)
+    return results
@@ -0,0 +1,44 @@
+"""
+Command line runner for the micro-benchmarks - see :py:mod:`benchmarks` for usage.
+"""
+import argparse
+import sys
+
+from benchmarks import REGISTRY, BASELINE_FILE, run, load_baseline, save_baseline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the golos-python micro-benchmarks')
+    parser.add_argument('-k', dest='filters', action='append', default=[],
+                        help='Only run benchmarks containing this string (can be specified multiple times)')
+    parser.add_argument('--save', action='store_true', help='Save the results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='Baseline file (default: benchmarks/baseline.json)')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown vs baseline (default 0.25)')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed repeats per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Minimum seconds per timed repeat')
+    parser.add_argument('--list', action='store_true', help='List the available benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    from benchmarks import suite  # noqa: F401 - registers the benchmarks
+    names = [n for n in REGISTRY if not args.filters or any(f in n for f in args.filters)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    results = run(names, repeat=args.repeat, min_time=args.min_time, threshold=args.threshold,
+                  baseline=load_baseline(args.baseline))
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"\nSaved {len(results)} results to {args.baseline}")
+        return 0
+
+    regressions = [n for n, r in results.items() if r['regression']]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold * 100:.0f}%: "
+              f"{', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Fixture data used by the micro-benchmarks in :py:mod:`benchmarks.suite`.
+
+All data is static, so benchmark results only depend on the code being measured - never on the network.
+"""
+from copy import deepcopy
+from decimal import Decimal
+
+WIF = '5Jq19TeeVmGrBFnu32oxfxQMiipnSCKmwW7fZGUVLAoqsKJ9JwP'
+PUBLIC_KEY = 'GLS7qHue1h2eWV8M7WKtb6F8dbhKfEFvLVy9JqvSTHBBEM5JMdsmh'
+
+TRANSFER_OP = ['transfer', {'from': 'someguy123', 'to': 'ksantoprotein', 'amount': '0.100 GOLOS', 'memo': 'testing'}]
+
+VOTE_OP = ['vote', {'voter': 'someguy123', 'author': 'ksantoprotein', 'permlink': 'test-post', 'weight': 10000}]
+
+TX = dict(
+    ref_block_num=27979, ref_block_prefix=3018856747, expiration='2019-10-01T12:50:00',
+    operations=[TRANSFER_OP], extensions=[], signatures=[]
+)
+"""The transfer transaction used in ``tests.py`` (TXID ``c901c52daf57b60242d9d7be67f790e023cf2780``)"""
+
+BATCH_TX = dict(TX, operations=[TRANSFER_OP, VOTE_OP] * 50)
+"""A 100 operation transaction, mixing transfers and votes"""
+
+BULK_TX = dict(TX, operations=[TRANSFER_OP, VOTE_OP] * 500)
+"""A 1000 operation transaction, mixing transfers and votes"""
+
+BULK_OPS = BULK_TX['operations']
+"""1000 transfer and vote operations, for comparing the per-operation serializers"""
+
+POST_BODY = ('## Заголовок поста\n\nLorem ipsum dolor sit amet, **consectetur** adipiscing elit. Привет, мир! '
+             '![image](https://example.com/image.png)\n\n') * 500
+"""A ~60KB markdown post body (mixed ASCII and Cyrillic, with newlines but no control characters)"""
+
+POST_BODY_ESCAPED = POST_BODY.replace('\n\n', '\x0c\n', 50)
+"""``POST_BODY`` with some control characters that :py:meth:`golos.types.String.unicodify` rewrites"""
+
+POST_TX = dict(TX, operations=[['comment', {
+    'parent_author': '', 'parent_permlink': 'thallid', 'author': 'someguy123', 'permlink': 'test-post',
+    'title': 'Test post', 'body': POST_BODY, 'json_metadata': '{"app": "thallid", "tags": ["test"]}',
+}]])
+"""A transaction containing a single ``comment`` operation with ``POST_BODY``, as built by ``Api.post``/``replace``"""
+
+PAYOUTS = [(f'account{i}', Decimal(i * 7919 % 100000).scaleb(-3)) for i in range(1000)]
+"""1000 ``(account, Decimal amount)`` pairs, as used when building transfers for bulk payouts"""
+
+PERMISSION = {
+    'weight_threshold': 1, 'account_auths': [['someguy123', 1]],
+    'key_auths': [[PUBLIC_KEY, 1]],
+}
+
+COMMENT_EXTENSIONS = [[0, {'beneficiaries': [{'account': 'someguy123', 'weight': 1000}]}], [2, {'percent': 5000}]]
+
+DYNAMIC_GLOBAL_PROPERTIES = {
+    'id': 0, 'head_block_number': 30895436, 'head_block_id': '01d76f4cd9e7ac5aab05b9a1ee5d1b4b1b3e5e91',
+    'time': '2019-10-01T12:49:00', 'current_witness': 'someguy123', 'total_pow': 0, 'num_pow_witnesses': 0,
+    'virtual_supply': '103912034.917 GOLOS', 'current_supply': '100193462.435 GOLOS',
+    'confidential_supply': '0.000 GOLOS', 'current_sbd_supply': '1632185.434 GBG',
+    'confidential_sbd_supply': '0.000 GBG', 'total_vesting_fund_steem': '31187421.472 GOLOS',
+    'total_vesting_shares': '103773498357.264930 GESTS', 'total_reward_fund_steem': '224614.104 GOLOS',
+    'total_reward_shares2': '0', 'sbd_interest_rate': 0, 'sbd_print_rate': 10000, 'average_block_size': 1291,
+    'maximum_block_size': 65536, 'current_aslot': 31005207,
+    'recent_slots_filled': '340282366920938463463374607431768211455', 'participation_count': 128,
+    'last_irreversible_block_num': 30895421, 'max_virtual_bandwidth': '5986734968066277376',
+    'current_reserve_ratio': 20000, 'custom_ops_bandwidth_multiplier': 10, 'is_forced_min_price': True,
+    'transit_block_num': 4294967295, 'transit_witnesses': [], 'vote_regeneration_per_day': 10,
+}
+
+ACCOUNT = {
+    'id': 1234, 'name': 'someguy123', 'owner': PERMISSION, 'active': PERMISSION, 'posting': PERMISSION,
+    'memo_key': PUBLIC_KEY, 'json_metadata': '{}', 'proxy': '', 'last_owner_update': '2018-01-01T00:00:00',
+    'last_account_update': '2019-09-01T00:00:00', 'created': '2017-01-01T00:00:00', 'mined': False,
+    'recovery_account': 'golos', 'reset_account': 'null', 'comment_count': 0, 'lifetime_vote_count': 0,
+    'post_count': 120, 'can_vote': True, 'voting_power': 9500, 'last_vote_time': '2019-10-01T10:00:00',
+    'balance': '157560.231 GOLOS', 'savings_balance': '0.000 GOLOS', 'sbd_balance': '6420.916 GBG',
+    'savings_sbd_balance': '0.000 GBG', 'vesting_shares': '50058788.632180 GESTS',
+    'delegated_vesting_shares': '1000000.000000 GESTS', 'received_vesting_shares': '250000.000000 GESTS',
+    'vesting_withdraw_rate': '0.000000 GESTS', 'post_bandwidth': 12000, 'average_bandwidth': '183742000000',
+    'average_market_bandwidth': '0', 'last_bandwidth_update': '2019-10-01T12:00:00',
+    'last_market_bandwidth_update': '2019-09-20T12:00:00', 'last_post': '2019-09-30T18:00:00',
+    'last_root_post': '2019-09-30T18:00:00', 'witness_votes': ['someguy123'], 'reputation': '183774828347282',
+}
+
+ACCOUNT_NAMES = [f'account{i}' for i in range(100)]
+
+
+def replay_records() -> list:
+    """
+    Recorded traffic (see :py:mod:`golos.replay`) for constructing an :class:`golos.api.Api` and calling
+    ``get_accounts(ACCOUNT_NAMES)`` without network access.
+    """
+    accounts = [dict(deepcopy(ACCOUNT), name=n) for n in ACCOUNT_NAMES]
+    return [
+        dict(request=['database_api', 'get_config', []],
+             response={'result': {'STEEMIT_BANDWIDTH_PRECISION': 1000000}}),
+        dict(request=['database_api', 'get_chain_properties', []], response={'result': {
+            'account_creation_fee': '1.000 GOLOS', 'create_account_min_golos_fee': '0.030 GOLOS',
+            'create_account_min_delegation': '0.150 GOLOS'
+        }}),
+        dict(request=['database_api', 'get_dynamic_global_properties', []],
+             response={'result': DYNAMIC_GLOBAL_PROPERTIES}),
+        dict(request=['database_api', 'get_accounts', [ACCOUNT_NAMES]], response={'result': accounts}),
+        dict(request=['witness_api', 'get_feed_history', []], response={'result': {
+            'id': 0, 'current_median_history': {'base': '1.000 GBG', 'quote': '2.147 GOLOS'}, 'price_history': []
+        }}),
+        dict(request=['market_history', 'get_order_book', [1]], response={'result': {
+            'asks': [{'price': '0.480', 'order_price': {'base': '48.000 GBG', 'quote': '100.000 GOLOS'}}],
+            'bids': [{'price': '0.460', 'order_price': {'base': '46.000 GBG', 'quote': '100.000 GOLOS'}}],
+        }}),
+    ]
@@ -0,0 +1,176 @@
+"""
+The benchmarks run by ``python3 -m benchmarks``. See :py:mod:`benchmarks` for how to run them.
+"""
+import functools
+
+from golos import Api, Key
+from golos.base58 import Base58, base58encode, base58decode, gphBase58CheckEncode, gphBase58CheckDecode
+from golos.broadcast import Tx
+from golos.deserializer import decode_transaction
+from golos.serializer import serialize_operation, serialize_transaction
+from golos.timestamps import format_timestamp, parse_timestamp
+from golos.types import String, Amount, Int16, PublicKey, Permission, ExtensionsComment, PointInTime
+from benchmarks import benchmark, fixtures
+
+tx_builder = Tx(None)
+digest = tx_builder.get_digest(fixtures.TX)
+pubkey_hex = repr(Base58(fixtures.PUBLIC_KEY))
+pubkey_b58 = fixtures.PUBLIC_KEY[3:]
+bulk_tx_bytes = serialize_transaction(fixtures.BULK_TX)
+
+
+@functools.lru_cache()
+def replay_api() -> Api:
+    return Api(replay_from=fixtures.replay_records())
+
+
+# ----- broadcast.Tx ----- #
+
+@benchmark('tx_get_digest')
+def _tx_get_digest():
+    tx_builder.get_digest(fixtures.TX)
+
+
+@benchmark('tx_get_digest_100_ops')
+def _tx_get_digest_batch():
+    tx_builder.get_digest(fixtures.BATCH_TX)
+
+
+@benchmark('tx_get_digest_1000_ops')
+def _tx_get_digest_bulk():
+    tx_builder.get_digest(fixtures.BULK_TX)
+
+
+@benchmark('tx_get_digest_post_60kb')
+def _tx_get_digest_post():
+    tx_builder.get_digest(fixtures.POST_TX)
+
+
+@benchmark('tx_sign')
+def _tx_sign():
+    tx_builder.sign(fixtures.WIF, digest)
+
+
+# ----- serializer ----- #
+
+@benchmark('serializer_ops_1000')
+def _serialize_ops():
+    for op in fixtures.BULK_OPS:
+        serialize_operation(op)
+
+
+@benchmark('serializer_ops_1000_generic')
+def _serialize_ops_generic():
+    for op in fixtures.BULK_OPS:
+        serialize_operation(op, compiled=False)
+
+
+@benchmark('deserializer_tx_1000_ops')
+def _deserialize_tx():
+    decode_transaction(bulk_tx_bytes)
+
+
+# ----- timestamps ----- #
+
+timestamp_dt = parse_timestamp('2019-10-01T12:50:00')
+
+
+@benchmark('timestamps_parse')
+def _parse_timestamp():
+    # Bypass the cache, to measure the parsing itself
+    parse_timestamp.__wrapped__('2019-10-01T12:50:00')
+
+
+@benchmark('timestamps_format')
+def _format_timestamp():
+    format_timestamp(timestamp_dt)
+
+
+# ----- types ----- #
+
+@benchmark('types_string_bytes')
+def _string():
+    bytes(String('someguy123'))
+
+
+@benchmark('types_string_bytes_60kb')
+def _string_post():
+    bytes(String(fixtures.POST_BODY))
+
+
+@benchmark('types_string_bytes_60kb_escaped')
+def _string_post_escaped():
+    bytes(String(fixtures.POST_BODY_ESCAPED))
+
+
+@benchmark('types_amount_bytes')
+def _amount():
+    bytes(Amount('157560.231 GOLOS'))
+
+
+@benchmark('types_int16_bytes')
+def _int16():
+    bytes(Int16(10000))
+
+
+@benchmark('types_point_in_time_bytes')
+def _point_in_time():
+    bytes(PointInTime('2019-10-01T12:50:00'))
+
+
+@benchmark('types_public_key_bytes')
+def _public_key():
+    bytes(PublicKey(fixtures.PUBLIC_KEY))
+
+
+@benchmark('types_permission_bytes')
+def _permission():
+    bytes(Permission(fixtures.PERMISSION))
+
+
+@benchmark('types_extensions_comment_bytes')
+def _extensions_comment():
+    bytes(ExtensionsComment(fixtures.COMMENT_EXTENSIONS))
+
+
+# ----- base58 ----- #
+
+@benchmark('base58_encode')
+def _base58_encode():
+    base58encode(pubkey_hex)
+
+
+@benchmark('base58_decode')
+def _base58_decode():
+    base58decode(pubkey_b58)
+
+
+@benchmark('base58_gph_check_encode')
+def _gph_encode():
+    gphBase58CheckEncode(pubkey_hex)
+
+
+@benchmark('base58_gph_check_decode')
+def _gph_decode():
+    gphBase58CheckDecode(pubkey_b58)
+
+
+# ----- key ----- #
+
+@benchmark('key_get_keys')
+def _get_keys():
+    Key.get_keys('someguy123', 'example')
+
+
+# ----- api ----- #
+
+@benchmark('api_get_accounts_100')
+def _get_accounts():
+    replay_api().get_accounts(fixtures.ACCOUNT_NAMES)
+
+
+@benchmark('api_transfer_ops_1000')
+def _transfer_ops():
+    api = replay_api()
+    for to, amount in fixtures.PAYOUTS:
+        api._transfer_op(to=to, amount=amount, from_account='someguy123', memo='payout')
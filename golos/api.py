@@ -45,20 +45,27 @@ import hashlib
 import json
 import logging
 import math
+import threading
 from binascii import unhexlify
-from datetime import datetime
 from decimal import Decimal, ROUND_DOWN
 from pprint import pprint
-from time import time
-from typing import Union, List, Tuple, Dict
+from time import time, sleep
+from typing import Union, List, Tuple, Dict, Iterator, Callable
 
 from privex.helpers import dec_round, r_cache, retry_on_err
 
-from golos.extras import dict_sort, new_node_on_err
-from .exceptions import TransactionNotFound, GolosException
+from golos.chain import HeadTracker
+from golos.checkpoint import get_checkpoint
+from golos.extras import dict_sort, new_node_on_err, ordered_parallel, op_accounts
+from golos.pipeline import ingest_blocks
+from golos.serializer import serialize_transaction
+from golos.timestamps import parse_timestamp
+from .exceptions import TransactionNotFound, GolosException, UnsupportedOperation
 from .broadcast import Tx
 from .key import Key
-from .storage import time_format, asset_precision, rus_d, rus_list, asset_account_keys
+from . import storage
+from .storage import asset_precision, rus_d, rus_list, asset_account_keys
+from .types import Amount
 from .ws_client import WsClient
 
 log = logging.getLogger(__name__)
@@ -76,6 +83,12 @@ The primary asset symbol of the current blockchain. Used as the default ``asset`
 while also obligatory for power up transactions to avoid user error. 
 """
 
+STREAM_MODES = ('head', 'irreversible')
+"""
+The modes supported by block / operation streams such as :py:meth:`.Api.stream_blocks`. ``head`` follows the head
+block, while ``irreversible`` only returns blocks which can no longer be reversed by a micro-fork.
+"""
+
 
 class Api:
     """
@@ -140,10 +153,14 @@ class Api:
 
         :param list|str nodes: A list / singular ``str`` GOLOS node(s) formatted like such: ``wss://golosd.privex.io``
         :param bool report: (**KWARG**) If ``True`` - enables more verbose logging from :class:`.WsClient`
+        :param TxIndex tx_index: (**KWARG**) A :class:`golos.index.TxIndex` used by :py:meth:`.get_transaction` and
+                                 :py:meth:`.find_op_transaction` to look up transactions without network access
         :param kwargs: Any additional keyword arguments (will be forwarded to :class:`.WsClient`'s constructor)
 
         """
         log.debug('connect b4 GOLOS')
+        self.tx_index = kwargs.pop('tx_index', None)
+        self._nodes, self._rpc_kwargs = nodes, dict(kwargs)
         # Пользуемся своими нодами или новыми
         if nodes:
             self.rpc = WsClient(nodes=nodes, **kwargs)
@@ -173,6 +190,36 @@ class Api:
 
         log.debug('complite')
 
+    def _new_rpc(self, **kwargs) -> WsClient:
+        """
+        Create a new :class:`.WsClient` connection, using the same nodes and settings as :py:attr:`.rpc`.
+        
+        Used by streams and parallel fetchers, which pipeline requests and so can't share :py:attr:`.rpc` with
+        normal calls made while the stream is being consumed.
+        """
+        conf = dict(self._rpc_kwargs, **kwargs)
+        nodes = conf.pop('nodes', self._nodes)
+        return WsClient(nodes=nodes, **conf) if nodes else WsClient(**conf)
+
+    def _worker_rpcs(self) -> Tuple[Callable[[], WsClient], List[WsClient]]:
+        """
+        Returns a function which lazily creates one :class:`.WsClient` per calling thread, plus the list of every
+        client created (so they can be closed). When :py:attr:`._nodes` is a list, each new client is given the list
+        rotated by one more place, spreading the connections across all of the nodes.
+        """
+        local, clients, lock = threading.local(), [], threading.Lock()
+        nodes = [self._nodes] if isinstance(self._nodes, str) else self._nodes
+        
+        def _get_rpc() -> WsClient:
+            if getattr(local, 'rpc', None) is None:
+                with lock:
+                    i = len(clients)
+                    local.rpc = self._new_rpc(nodes=nodes[i % len(nodes):] + nodes[:i % len(nodes)]) if nodes else \
+                        self._new_rpc()
+                    clients.append(local.rpc)
+            return local.rpc
+        return _get_rpc, clients
+
     @property
     @r_cache('golos:chain_props', cache_time=30)
     @new_node_on_err(max_retries=MAX_RETRIES, delay=RETRY_DELAY)
@@ -222,12 +269,20 @@ class Api:
             >>> Api().get_transaction_hex(tx)
             '4b6d2b19f0b3784b935d01020a736f6d656775793132330d6b73616e746f70726f7465696e640000000000000003474f4c4f53
              00000774657374696e6700'
+        
+        The transaction is serialized locally (see :py:mod:`golos.serializer`) in the same format as the node -
+        the unsigned transaction, without the signatures. The node is only asked to serialize transactions containing
+        operations which aren't supported by :py:attr:`golos.operations.type_op`.
 
         :param dict tx: A transaction as a ``dict`` in the form:
                         ``dict(ref_block_num, ref_block_prefix, expiration, operations, extensions, signatures)``
         :param bool remove_sigs: (Default: ``False``) Replace the ``signatures`` key with ``[]`` (for TXID generation)
         :return str txhex: The hexadecimal representation of the transaction
         """
+        try:
+            return serialize_transaction(tx, include_signatures=False).hex()
+        except UnsupportedOperation as e:
+            log.debug('Falling back to get_transaction_hex RPC call: %s', e)
         tx = dict(tx)
         if remove_sigs:
             tx['signatures'] = []
@@ -279,10 +334,17 @@ class Api:
               'signatures': ['1f1a0212f7b9fe263acaeadf1ec127000dc234c413b543e3c268d251e...']
             }
         
+        If the :class:`.Api` was constructed with a ``tx_index`` (:class:`golos.index.TxIndex`), the transaction is
+        looked up locally first, and the node is only asked for transactions which aren't in the index.
+        
         :param str txid: A string hex transaction ID to lookup
         :raises TransactionNotFound: When the transaction ID could not be found on the blockchain.
         :return dict tx: The matching transaction as a ``dict``
         """
+        if self.tx_index is not None:
+            tx = self.tx_index.get_transaction(txid)
+            if tx is not None:
+                return tx
         return self.rpc.call('get_transaction', txid)
     
     def find_op_transaction(self, op: dict, ignore_keys: list = None) -> dict:
@@ -308,7 +370,8 @@ class Api:
 
         :param dict op: An operation as a ``dict``, containing the key ``block``, and any operation keys to match
         :param list ignore_keys: (Optional) Additional dict keys to remove from ``op``
-        :raises TransactionNotFound: When a matching transaction could not be found on the blockchain.
+        :raises TransactionNotFound: When a matching transaction could not be found on the blockchain (or in the
+                                     ``tx_index``, if it covers the block in ``op``).
         :return dict tx: The full transaction found on the blockchain as a ``dict``
         
         A returned transaction is generally formatted like such::
@@ -330,9 +393,17 @@ class Api:
         clean_tx = dict(op)
         clean_tx = {k: v for k, v in clean_tx.items() if k not in ignore_keys}
 
-        # Load the block specified in the original TX, and search for a matching transaction.
-        block = self.get_block(int(orig_tx['block']))
-        for t in block['transactions']:
+        # Load the transactions of the block specified in the original TX - from the local index if it covers that
+        # block - and search for a matching transaction.
+        block_num = int(orig_tx['block'])
+        if self.tx_index is not None and self.tx_index.covers(block_num):
+            txs = [
+                {k: v for k, v in t.items() if k not in ('block_num', 'transaction_id', 'transaction_num')}
+                for t in self.tx_index.get_block_transactions(block_num)
+            ]
+        else:
+            txs = self.get_block(block_num)['transactions']
+        for t in txs:
             for op in t['operations']:
                 if 'type_op' in orig_tx and op[0] != orig_tx['type_op']:
                     continue
@@ -443,11 +514,7 @@ class Api:
         op = {
             "author": author,
             "permlink": permlink,
-            "max_accepted_payout": '{:.{precision}f} {asset}'.format(
-                float(max_accepted_payout),
-                precision=self.asset_precision[asset],
-                asset=asset
-            ),
+            "max_accepted_payout": str(Amount.from_number(max_accepted_payout, asset)),
             "percent_steem_dollars": 10000,
             "allow_votes": allow_votes,
             "allow_curation_rewards": allow_curation_rewards,
@@ -510,9 +577,7 @@ class Api:
         op = {
             "from": from_account,
             "to": to,
-            "amount": '{:.{precision}f} {asset}'.format(
-                Decimal(amount), precision=self.asset_precision[asset], asset=asset
-            )
+            "amount": str(Amount.from_number(amount, asset))
         }
         if 'memo' in kwargs:
             op['memo'] = kwargs['memo']
@@ -644,11 +709,7 @@ class Api:
         ops = []
         op = {
             "account": account,
-            "vesting_shares": '{:.{precision}f} {asset}'.format(
-                vesting_shares,
-                precision=self.asset_precision[asset],
-                asset=asset
-            ),
+            "vesting_shares": str(Amount.from_number(vesting_shares, asset)),
         }
         ops.append(['withdraw_vesting', op])
         tx = self.finalizeOp(ops, wif)
@@ -787,11 +848,7 @@ class Api:
         op = {
             "delegator": delegator,
             "delegatee": delegatee,
-            "vesting_shares": '{:.{precision}f} {asset}'.format(
-                vesting_shares,
-                precision=self.asset_precision[asset],
-                asset=asset
-            ),
+            "vesting_shares": str(Amount.from_number(vesting_shares, asset)),
         }
         ops.append(['delegate_vesting_shares', op])
         tx = self.finalizeOp(ops, wif)
@@ -807,8 +864,7 @@ class Api:
         # delegation = self.create_account_max_delegation
         vesting_shares = self.convert_golos_to_vests(10.0)  # aka 10 GOLOS delegation
         asset = 'GESTS'
-        delegation = '{:.{precision}f} {asset}'.format(vesting_shares, precision=self.asset_precision[asset],
-                                                       asset=asset)
+        delegation = str(Amount.from_number(vesting_shares, asset))
 
         json_metadata = kwargs.pop("json_metadata", [])
 
@@ -877,11 +933,7 @@ class Api:
         op = {
             "delegator": delegator,
             "delegatee": delegatee,
-            "vesting_shares": '{:.{precision}f} {asset}'.format(
-                vesting_shares,
-                precision=self.asset_precision[asset],
-                asset=asset
-            ),
+            "vesting_shares": str(Amount.from_number(vesting_shares, asset)),
             "interest_rate": rate,
             "extensions": [],
         }
@@ -1121,8 +1173,11 @@ class Api:
         """
         Get the account history for a given ``account`` as a ``List[dict]``.
         
-        Optionally you can filter the operations returned using ``op_limit``, as well as limit the number of operations
-        with ``start_limit``, and maximum operation age with ``age``.
+        Optionally you can filter the operations returned using ``op_limit``, as well as the number of operations
+        loaded per request with ``start_limit``, and maximum operation age with ``age``.
+        
+        This is a wrapper around :py:meth:`.iter_account_history`, which should be used instead when scanning a
+        large history, as it doesn't hold every operation in memory, and can be stopped early.
         
         **Basic usage**::
         
@@ -1140,8 +1195,10 @@ class Api:
         
         :param kwargs: See below
 
-        :key int start_limit: Load at most this many history items (Default: ``1000`` items)
+        :key int start_limit: Load this many history items per request (Default: ``1000`` items)
         :key int age: Skip history items older than this many seconds (Default: ``604800`` seconds / 7 days)
+        :key int prefetch: Pages to pipeline ahead over a dedicated connection (Default: ``0`` - no prefetching)
+        :key int workers: Fetch chunks of the history concurrently with this many connections (Default: ``1``)
         
         :return List[dict] history: A ``list`` of ``dict`` history ops (see below for format)
         
@@ -1151,50 +1208,213 @@ class Api:
             
         
         """
-
-        start_limit = kwargs.pop("start_limit", 1000)  # лимит одновременного запроса
-        age_max = kwargs.pop("age", 7 * 24 * 60 * 60)  # время в сек до какой операции сканировать
-
-        info = self.dynamic_global_properties
-        raw = []
-
-        start_block, flag, n = 999999999, True, 0
-        while flag:
-            history = self.rpc.call('get_account_history', account, start_block, start_limit)
-
-            for h in reversed(history):
-                number = h[0]
-                block = h[1]["block"]
-                timestamp = h[1]["timestamp"]
-                type_op = h[1]["op"][0]
-
-                op = h[1]["op"][1]
+        return list(self.iter_account_history(
+            account, op_limit=op_limit, page_size=kwargs.pop("start_limit", 1000),
+            age=kwargs.pop("age", 7 * 24 * 60 * 60), prefetch=kwargs.pop("prefetch", 0),
+            workers=kwargs.pop("workers", 1)
+        ))
+
+    def _history_pages(self, account: str, direction: str, start: int, page_size: int, prefetch: int,
+                       workers: int = 1, chunk_pages: int = 10, rpc: WsClient = None) -> Iterator[list]:
+        """
+        Yield raw ``get_account_history`` pages (lists of ``[seq, op]``) in ``direction`` order.
+        
+        After the first page, the sequence numbers covered by every page are known in advance, so when
+        ``prefetch`` > 0 the pages are pipelined over a dedicated connection - the next ``prefetch`` pages are
+        requested before the current page is yielded. Pass ``rpc`` to use an existing connection instead (with or
+        without prefetching) - otherwise pages are loaded one at a time using :py:attr:`.rpc`.
+        
+        When ``workers`` > 1, the sequence range is split into chunks of ``chunk_pages`` pages, which are fetched
+        concurrently by ``workers`` connections (each pipelining its pages), and re-assembled in order.
+        """
+        limit = int(page_size)
+        base_rpc = self.rpc if rpc is None else rpc
+        if direction == 'desc':
+            top = 999999999 if start is None else int(start)
+            first = base_rpc.call('get_account_history', account, top, min(limit, top))
+            if not first:
+                return
+            yield list(reversed(first))
+            # Each page covers ``limit + 1`` sequence numbers: ``[from - limit, from]``
+            froms = range(first[0][0] - 1, -1, -(limit + 1))
+        elif workers > 1:
+            # The end of the range must be known to split it up - a limit of 0 returns only the newest item
+            newest = base_rpc.call('get_account_history', account, 999999999, 0)
+            if not newest:
+                return
+            froms = range(0 if start is None else int(start) + limit, newest[-1][0] + limit + 1, limit + 1)
+        else:
+            froms = range(0 if start is None else int(start) + limit, 2 ** 63, limit + 1)
+        
+        def _calls(_froms):
+            return (('get_account_history', (account, f, min(limit, f))) for f in _froms)
+        
+        def _clean(f, page):
+            if direction == 'desc':
+                return list(reversed(page))
+            # A page beyond the newest operation is clamped by the node, so it may overlap the previous page
+            return [h for h in page if h[0] >= f - min(limit, f)]
+        
+        if workers > 1:
+            get_rpc, clients = self._worker_rpcs()
+            chunks = (froms[i:i + chunk_pages] for i in range(0, len(froms), chunk_pages))
+            
+            def _fetch(chunk):
+                pages = get_rpc().call_stream(_calls(chunk), window=max(int(prefetch), 1) + 1)
+                return [_clean(f, page) for f, page in zip(chunk, pages)]
+            
+            try:
+                for pages in ordered_parallel(_fetch, chunks, workers=workers):
+                    for page in pages:
+                        if page:
+                            yield page
+            finally:
+                for c in clients:
+                    c.close()
+            return
+        
+        own_rpc = prefetch and rpc is None
+        rpc = self._new_rpc() if own_rpc else base_rpc
+        pages = rpc.call_stream(_calls(froms), window=int(prefetch) + 1) if prefetch else \
+            (rpc.call(name, *args) for name, args in _calls(froms))
+        try:
+            for f, page in zip(froms, pages):
+                page = _clean(f, page)
+                if page:
+                    yield page
+                if not page or (direction == 'asc' and page[-1][0] < f):
+                    return
+        finally:
+            if prefetch:
+                pages.close()
+            if own_rpc:
+                rpc.close()
+    
+    def iter_account_history(self, account: str, op_limit: Union[list, str] = 'all', direction: str = 'desc',
+                             start: int = None, page_size: int = 1000, **kwargs) -> Iterator[dict]:
+        """
+        Iterate over the account history of ``account``, yielding operations one page at a time - formatted like
+        :py:meth:`.get_account_history`. As it's a generator, the scan can be stopped at any point simply by
+        breaking out of the loop.
+        
+        With ``prefetch``, the next pages are already being loaded while the caller processes a page.
+        
+        **Basic usage**::
+        
+            >>> g = Api()
+            >>> # Newest transfers first, stopping once a specific transaction is found
+            >>> for op in g.iter_account_history('someguy123', op_limit='transfer'):
+            ...     if op['trx_id'] == last_seen_trx:
+            ...         break
+            ...     process(op)
+            >>> # Oldest first, starting from sequence number 5000
+            >>> ops = list(g.iter_account_history('someguy123', direction='asc', start=5000))
+        
+        :param str account: The username to load account history for, e.g. ``'someguy123'``
+        :param list op_limit: Only yield operations of these types, e.g. ``['transfer', 'vote']``, ``'transfer'``
+                              or ``'all'`` (no filter)
+        :param str direction: ``'desc'`` (default) for newest first, or ``'asc'`` for oldest first
+        :param int start: The account history sequence number to start from (Default: the newest operation for
+                          ``'desc'``, or the oldest for ``'asc'``)
+        :param int page_size: The number of history items loaded per request
+        :key int age: (``'desc'`` only) Stop after the first operation older than this many seconds, which is
+                      still yielded if it matches ``op_limit`` (Default: no limit)
+        :key int prefetch: The number of pages to load ahead of the caller over a dedicated connection (or ``rpc``).
+                           ``0`` disables prefetching, loading pages one at a time using :py:attr:`.rpc`
+                           (Default: ``0``)
+        :key int workers: Split the history into chunks fetched concurrently by this many connections, spread
+                          across the configured nodes - much faster for very long histories (Default: ``1``)
+        :key int chunk_pages: (With ``workers``) the number of pages in each chunk fetched by a worker (Default: ``10``)
+        :key WsClient rpc: Load pages over this connection, instead of :py:attr:`.rpc` or a new dedicated connection
+        :return Iterator[dict] history: A generator of ``dict`` history ops
+        """
+        if direction not in ('asc', 'desc'):
+            raise ValueError(f"Invalid direction '{direction}' - must be 'asc' or 'desc'")
+        op_limit = None if op_limit == 'all' else frozenset([op_limit] if isinstance(op_limit, str) else op_limit)
+        age_max, now = kwargs.get('age'), None
+        if age_max is not None and direction == 'desc':
+            now = self.dynamic_global_properties["now"]
+        
+        pages = self._history_pages(account, direction, start, page_size, kwargs.get('prefetch', 0),
+                                    workers=int(kwargs.get('workers', 1)), chunk_pages=kwargs.get('chunk_pages', 10),
+                                    rpc=kwargs.get('rpc'))
+        for page in pages:
+            for number, h in page:
+                timestamp = h["timestamp"]
+                # The first operation past the age cutoff is still included, as it always has been
+                too_old = now is not None and (now - parse_timestamp(timestamp)).total_seconds() > age_max
+                type_op = h["op"][0]
+                if op_limit is not None and type_op not in op_limit:
+                    if too_old:
+                        return
+                    continue
+                op = h["op"][1]
                 op["number"] = number
-                op["block"] = block
+                op["block"] = h["block"]
                 op["timestamp"] = timestamp
                 op["type_op"] = type_op
-                op["trx_id"] = h[1]["trx_id"]
-
-                if type_op in op_limit or op_limit == 'all':
-                    raw.append(op)
-                # pprint(op)
-                # input('next')
-
-                last_history_time = datetime.strptime(timestamp, time_format)
-                age = (info["now"] - last_history_time).total_seconds() / 1
-                if age > age_max:
-                    flag = False
-                    break
+                op["trx_id"] = h["trx_id"]
+                yield op
+                if too_old:
+                    return
 
-            start_block = h[0] - 1
-            if start_block < start_limit:
-                start_limit = start_block
-            if start_limit <= 0:
-                flag = False
-            n += 1
-            log.debug('%s %s %s', start_block, 'scan', n * start_limit)
-
-        return raw
+    def sync_account_history(self, account: str, store, page_size: int = 1000, **kwargs) -> int:
+        """
+        Download the history items of ``account`` which are newer than the highest sequence number already in
+        ``store``, and add them to it. The first sync of an account downloads its entire history.
+        
+        **Basic usage**::
+        
+            >>> from golos.index import HistoryStore
+            >>> store = HistoryStore('history.db')
+            >>> Api().sync_account_history('someguy123', store)    # Only new items are fetched on later runs
+            42
+        
+        :param str account: The username to sync account history for, e.g. ``'someguy123'``
+        :param HistoryStore store: The :class:`golos.index.HistoryStore` to sync into
+        :param int page_size: The number of history items loaded per request, and written to ``store`` at a time
+        :param kwargs: Passed to :py:meth:`.iter_account_history`, e.g. ``prefetch`` or ``rpc``
+        :return int count: The number of new history items which were stored
+        """
+        last = store.last_seq(account)
+        ops = self.iter_account_history(
+            account, direction='asc', start=None if last is None else last + 1, page_size=page_size, **kwargs
+        )
+        count, batch = 0, []
+        for op in ops:
+            batch.append(op)
+            if len(batch) >= page_size:
+                store.add(account, batch)
+                count, batch = count + len(batch), []
+        if batch:
+            store.add(account, batch)
+        return count + len(batch)
+    
+    def sync_histories(self, accounts: List[str], store, workers: int = 8, **kwargs) -> Dict[str, int]:
+        """
+        Run :py:meth:`.sync_account_history` for many ``accounts`` concurrently, using ``workers`` connections
+        (spread across the configured nodes) which are re-used from one account to the next.
+        
+        :param list accounts: The usernames to sync account history for
+        :param HistoryStore store: The :class:`golos.index.HistoryStore` to sync into
+        :param int workers: The number of accounts to sync at the same time
+        :param kwargs: Passed to :py:meth:`.sync_account_history`, e.g. ``page_size`` - except ``rpc``, which is
+                       reserved, as each worker uses its own connection
+        :raises ValueError: When ``rpc`` is passed in ``kwargs``
+        :return dict counts: A ``dict`` mapping each account to the number of new history items which were stored
+        """
+        if 'rpc' in kwargs:
+            raise ValueError("sync_histories does not accept 'rpc' - each worker uses its own connection")
+        get_rpc, clients = self._worker_rpcs()
+        
+        def _sync(account):
+            return account, self.sync_account_history(account, store, rpc=get_rpc(), **kwargs)
+        
+        try:
+            return dict(ordered_parallel(_sync, accounts, workers=workers))
+        finally:
+            for c in clients:
+                c.close()
 
     # ----- database_api ----- #
 
@@ -1304,7 +1524,7 @@ class Api:
             # Определение реальной батарейки 1-10000
 
             VP = float(account["voting_power"])
-            last_vote_time = datetime.strptime(account["last_vote_time"], time_format)
+            last_vote_time = parse_timestamp(account["last_vote_time"])
             age = (info["now"] - last_vote_time).total_seconds() / 1
             actualVP = VP + (10000 * age / 432000)
 
@@ -1315,10 +1535,10 @@ class Api:
 
             # Определение golos_power (SP)
 
-            vests = float(str(account["vesting_shares"]).split()[0])
-            delegated = float(str(account["delegated_vesting_shares"]).split()[0])
-            received = float(str(account["received_vesting_shares"]).split()[0])
-            account["golos_power"] = round((vests + received - delegated) * info["golos_per_vests"],
+            vests = Amount(account["vesting_shares"])
+            delegated = Amount(account["delegated_vesting_shares"])
+            received = Amount(account["received_vesting_shares"])
+            account["golos_power"] = round(float((vests + received - delegated).amount) * info["golos_per_vests"],
                                            asset_precision["GOLOS"])
 
             # Определение rshares
@@ -1344,7 +1564,7 @@ class Api:
 
             account["GOLOS"] = Decimal(str(account["balance"]).split()[0])
             account["GBG"] = Decimal(str(account["sbd_balance"]).split()[0])
-            account["GESTS"] = Decimal(str(account["vesting_shares"]).split()[0])
+            account["GESTS"] = vests.amount
             account["GP"] = self.vests_to_power(account['GESTS'])
 
             # Определение post_bandwidth
@@ -1353,7 +1573,7 @@ class Api:
             minutes_per_day = 24 * 60
             last_post_time = account.get("last_root_post")
             if last_post_time is not None:
-                last_post_time = datetime.strptime(last_post_time, time_format)
+                last_post_time = parse_timestamp(last_post_time)
                 age_after_post = (info["now"] - last_post_time).total_seconds() / 60  # minutes
                 if age_after_post >= minutes_per_day:
                     account["new_post_limit"] = 4
@@ -1377,8 +1597,8 @@ class Api:
 
             average_seconds = 7 * 24 * 60 * 60
 
-            last_forum_time = datetime.strptime(account["last_bandwidth_update"], time_format)
-            last_market_time = datetime.strptime(account["last_market_bandwidth_update"], time_format)
+            last_forum_time = parse_timestamp(account["last_bandwidth_update"])
+            last_market_time = parse_timestamp(account["last_market_bandwidth_update"])
 
             age_after_forum = int((info["now"] - last_forum_time).total_seconds() / 1)  # seconds
             age_after_market = int((info["now"] - last_market_time).total_seconds() / 1)  # seconds
@@ -1444,6 +1664,228 @@ class Api:
     def get_block(self, n):
         return self.rpc.call('get_block', str(n))
 
+    def _fetch_block_range(self, rpc: WsClient, nums: range, prefetch: int = 20, retries: int = 3) -> List[dict]:
+        """
+        Fetch the blocks ``nums`` using pipelined requests on ``rpc``. Any blocks which couldn't be fetched by the
+        pipeline are then retried individually, switching to the next node after each failure.
+        """
+        blocks = {}
+        results = rpc.call_stream((('get_block', (str(n),)) for n in nums), window=prefetch)
+        try:
+            for n, block in zip(nums, results):
+                if block is not None:
+                    blocks[n] = block
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            log.warning("Error fetching blocks %d to %d from %s - retrying individually: %s %s",
+                        nums[0], nums[-1], rpc.url, type(e), str(e))
+        finally:
+            results.close()
+        
+        for n in nums:
+            tries = 0
+            while n not in blocks:
+                tries += 1
+                try:
+                    block = rpc.call('get_block', str(n))
+                    if block is not None:
+                        blocks[n] = block
+                        continue
+                    err = GolosException(f"Block {n} was not found on node {rpc.url}")
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    err = e
+                if tries > retries:
+                    raise err
+                log.warning("Failed to fetch block %d (try %d/%d): %s", n, tries, retries, str(err))
+                rpc.next_node()
+            blocks[n]['block_num'] = n
+        return [blocks[n] for n in nums]
+
+    def get_blocks(self, start: int, end: int, workers: int = 4, chunk_size: int = 100, **kwargs) -> Iterator[dict]:
+        """
+        Fetch the blocks ``start`` to ``end`` (inclusive), yielding them in order. Each block has its block number
+        added as the key ``block_num``.
+        
+        The range is split into chunks of ``chunk_size`` blocks, which are fetched concurrently by ``workers``
+        threads, each with its own connection (spread across the configured nodes) and pipelined requests.
+        Results pass through a bounded reorder buffer, so memory use stays flat no matter how large the range is.
+        
+        **Basic Usage**:
+        
+            >>> for block in Api().get_blocks(30000000, 30100000, workers=8):
+            ...     print(block['block_num'], len(block['transactions']))
+        
+        :param int start: The first block number to fetch
+        :param int end: The last block number to fetch
+        :param int workers: The number of connections to fetch blocks with
+        :param int chunk_size: The number of blocks fetched by a worker at a time
+        :key int prefetch: The maximum requests in flight on each connection (Default: ``20``)
+        :key int retries: How many times to retry each individual block which failed (Default: ``3``)
+        :key int window: The maximum number of chunks fetched ahead of the consumer (Default: ``workers * 2``)
+        :raises GolosException: When a block could not be fetched after ``retries`` attempts
+        :return Iterator[dict] blocks: A generator of blocks as ``dict``'s
+        """
+        prefetch, retries = kwargs.get('prefetch', 20), kwargs.get('retries', 3)
+        get_rpc, clients = self._worker_rpcs()
+        chunks = (range(n, min(n + chunk_size, end + 1)) for n in range(int(start), int(end) + 1, chunk_size))
+        
+        def _fetch(nums):
+            return self._fetch_block_range(get_rpc(), nums, prefetch=prefetch, retries=retries)
+        
+        try:
+            for blocks in ordered_parallel(_fetch, chunks, workers=workers, window=kwargs.get('window')):
+                yield from blocks
+        finally:
+            for c in clients:
+                c.close()
+
+    def ingest_blocks(self, start: int, end: int, func: Callable[[dict], object], workers: int = None,
+                      **kwargs) -> Iterator:
+        """
+        Run ``func(block)`` on each block from ``start`` to ``end`` (inclusive) in a pool of ``workers`` processes,
+        yielding the return values in block order. Blocks are fetched undecoded, and JSON decoding happens in the
+        worker processes, so CPU-heavy historical ingestion isn't limited to one core by the GIL.
+
+        See :func:`golos.pipeline.ingest_blocks` for details.
+
+        **Basic Usage**:
+
+            >>> def transfers(block: dict):    # Must be a module level (picklable) function
+            ...     return [op for tx in block['transactions'] for op in tx['operations'] if op[0] == 'transfer']
+            >>> for ops in Api().ingest_blocks(30000000, 30100000, transfers, workers=8):
+            ...     print(ops)
+
+        :param int start: The first block number to ingest
+        :param int end: The last block number to ingest
+        :param callable func: A picklable function, called with each block ``dict`` (with ``block_num`` set)
+        :param int workers: The number of worker processes (default: the number of CPUs)
+        :key int prefetch: The maximum block requests in flight (Default: ``100``)
+        :key int batch_size: The number of blocks sent to a worker process at a time (Default: ``10``)
+        :key int window: The maximum number of batches queued or being processed (Default: ``workers * 2``)
+        :return Iterator results: The results of ``func`` for each block, in block order
+        """
+        rpc = self._new_rpc()
+        try:
+            yield from ingest_blocks(rpc, start, end, func, workers=workers, **kwargs)
+        finally:
+            rpc.close()
+
+    @staticmethod
+    def _stream_target(props: dict, mode: str) -> int:
+        """Return the newest block number which a stream in ``mode`` may return, based on the dynamic props"""
+        if mode == 'head':
+            return int(props['head_block_number'])
+        return int(props['last_irreversible_block_num'])
+
+    def _follow_chain(self, method: str, args: Callable[[int], tuple], start: int = None, end: int = None,
+                      mode: str = 'head', prefetch: int = 20, **kwargs) -> Iterator[Tuple[int, object]]:
+        """
+        Call ``method`` with ``args(block_num)`` for each block from ``start`` onwards, yielding
+        ``(block_num, result)`` in order, and waiting for new blocks once caught up with the chain.
+        
+        Requests are pipelined over a dedicated connection with up to ``prefetch`` requests in flight, so catching
+        up from far behind runs at network speed rather than one round trip per block.
+        
+        If a ``checkpoint`` is passed, the stream resumes from the block after the saved checkpoint (if any), and
+        block ``n`` is saved once the consumer resumes the generator after ``(n, result)`` was yielded - i.e. once
+        it has finished processing block ``n`` (see :py:mod:`golos.checkpoint`).
+        
+        :key float poll_interval: Seconds to wait before checking for new blocks (default: ``storage.block_interval``)
+        :key Checkpoint checkpoint: A :class:`golos.checkpoint.Checkpoint` (or file path) to resume from / save to
+        :key int checkpoint_every: Save the checkpoint every this many blocks (default: ``1``)
+        :key int confirmations: Stay this many blocks behind the head / irreversible block (default: ``0``)
+        """
+        if mode not in STREAM_MODES:
+            raise ValueError(f"Invalid stream mode '{mode}' - must be one of: {', '.join(STREAM_MODES)}")
+        poll_interval = kwargs.get('poll_interval', storage.block_interval)
+        checkpoint = get_checkpoint(kwargs.get('checkpoint'))
+        checkpoint_every = int(kwargs.get('checkpoint_every', 1))
+        confirmations = int(kwargs.get('confirmations', 0))
+        if checkpoint is not None:
+            saved = checkpoint.load()
+            if saved is not None:
+                start = saved + 1
+                log.debug('Resuming %s stream from checkpoint at block %d', method, saved)
+        rpc = self._new_rpc()
+        try:
+            target = self._stream_target(rpc.call('get_dynamic_global_properties'), mode) - confirmations
+            num = target if start is None else int(start)
+            saved = num - 1
+            while end is None or num <= end:
+                if num > target:
+                    target = self._stream_target(rpc.call('get_dynamic_global_properties'), mode) - confirmations
+                    if num > target:
+                        sleep(poll_interval)
+                        continue
+                last = target if end is None else min(target, end)
+                nums = range(num, last + 1)
+                results = rpc.call_stream(((method, args(n)) for n in nums), window=prefetch)
+                try:
+                    for n, res in zip(nums, results):
+                        # A node which is lagging behind may not have this block yet - wait and try again.
+                        if res is None:
+                            break
+                        yield n, res
+                        num = n + 1
+                        if checkpoint is not None and n - saved >= checkpoint_every:
+                            checkpoint.save(n)
+                            saved = n
+                finally:
+                    results.close()
+                if num <= last:
+                    sleep(poll_interval)
+            if checkpoint is not None and num - 1 > saved:
+                checkpoint.save(num - 1)
+        finally:
+            rpc.close()
+
+    def stream_blocks(self, start: int = None, mode: str = 'head', prefetch: int = 20, **kwargs) -> Iterator[dict]:
+        """
+        Yield blocks in order from block number ``start`` (default: the current head / irreversible block), then
+        keep following the chain, waiting for each new block as it's produced. Each block has its block number
+        added as the key ``block_num``.
+        
+        **Basic Usage**:
+        
+            >>> for block in Api().stream_blocks(start=30895436):
+            ...     print(block['block_num'], block['witness'], len(block['transactions']))
+        
+        :param int start: The block number to start from (Default: ``None`` - start from the current block)
+        :param str mode: ``'head'`` to follow the head block, or ``'irreversible'`` to only return irreversible blocks
+        :param int prefetch: The maximum number of block requests to have in flight while catching up
+        :key int end: Stop after yielding this block number (Default: ``None`` - stream forever)
+        :key float poll_interval: Seconds to wait before checking for new blocks (default: ``storage.block_interval``)
+        :key Checkpoint checkpoint: Resume from, and save progress to this :class:`golos.checkpoint.Checkpoint` (or
+                                    checkpoint file path). Takes priority over ``start`` once a block has been saved.
+        :key int checkpoint_every: Save the checkpoint every this many blocks (default: ``1``)
+        :return Iterator[dict] blocks: A generator of blocks as ``dict``'s
+        """
+        for num, block in self._follow_chain('get_block', lambda n: (str(n),), start=start, mode=mode,
+                                             prefetch=prefetch, **kwargs):
+            block['block_num'] = num
+            yield block
+
+    def track_head(self, start: int = None, max_depth: int = 100, **kwargs) -> HeadTracker:
+        """
+        Follow the head block with low latency, handling micro-forks. Iterating over the returned
+        :class:`golos.chain.HeadTracker` yields :class:`golos.chain.ChainEvent`'s - ``block`` events for each new
+        block, and ``rollback`` events (newest first) for blocks which were orphaned by a reorg.
+
+        **Basic Usage**:
+
+            >>> for ev in Api().track_head():
+            ...     print(ev.type, ev.block_num, ev.block_id)
+
+        :param int start: The block number to start from (Default: ``None`` - start from the current head block)
+        :param int max_depth: The number of recent blocks to remember for detecting forks
+        :param kwargs: Any additional keyword arguments are passed to :py:meth:`.stream_blocks`
+        :return HeadTracker tracker: An iterable :class:`golos.chain.HeadTracker`
+        """
+        return HeadTracker(self, start=start, max_depth=max_depth, **kwargs)
+
     @new_node_on_err(max_retries=MAX_RETRIES, delay=RETRY_DELAY)
     def get_chain_properties(self) -> dict:
         """
@@ -1509,7 +1951,7 @@ class Api:
             prop[p] = int(value)
 
         prop["golos_per_vests"] = prop["total_vesting_fund_steem"] / prop["total_vesting_shares"]
-        prop["now"] = datetime.strptime(prop["time"], time_format)
+        prop["now"] = parse_timestamp(prop["time"])
 
         return prop
 
@@ -1601,6 +2043,68 @@ class Api:
     def get_ops_in_block(self, n):
         return self.rpc.call('get_ops_in_block', str(n), True)
 
+    def stream_ops(self, op_types: List[str] = None, accounts: List[str] = None, start: int = None,
+                   mode: str = 'head', **kwargs) -> Iterator[dict]:
+        """
+        Yield operations (including virtual operations) from each block in order, starting at block ``start``
+        (default: the current head / irreversible block), and continue following the chain as new blocks arrive.
+        
+        Operations are filtered by ``op_types`` and ``accounts`` as soon as they're received, and each matching
+        operation is yielded as its ``dict`` body with context attached - in the same style as
+        :py:meth:`.get_account_history`.
+        
+        **Basic Usage**:
+        
+            >>> for op in Api().stream_ops(op_types=['transfer'], accounts=['someguy123']):
+            ...     print(op['block'], op['trx_id'], op['from'], op['to'], op['amount'])
+        
+        If every type in ``op_types`` is a virtual operation (see :py:attr:`golos.storage.virtual_op_names`), the
+        node is asked for virtual operations only, so non-virtual operations aren't even sent over the network.
+        
+        :param list op_types: Only yield operations of these types, e.g. ``['transfer', 'vote']`` (default: all)
+        :param list accounts: Only yield operations which involve one of these accounts (default: all)
+        :param int start: The block number to start from (Default: ``None`` - start from the current block)
+        :param str mode: ``'head'`` to follow the head block, or ``'irreversible'`` to only use irreversible blocks
+        :key bool virtual: (Default: ``True``) If ``False``, skip virtual operations
+        :key int end: Stop after this block number (Default: ``None`` - stream forever)
+        :key int prefetch: The maximum number of block requests to have in flight while catching up
+        :key float poll_interval: Seconds to wait before checking for new blocks (default: ``storage.block_interval``)
+        :key Checkpoint checkpoint: Resume from, and save progress to this :class:`golos.checkpoint.Checkpoint` (or
+                                    checkpoint file path). Takes priority over ``start`` once a block has been saved.
+        :key int checkpoint_every: Save the checkpoint every this many blocks (default: ``1``)
+        :key int confirmations: Only yield operations from blocks at least this many blocks behind the head block
+                                (or the last irreversible block in ``'irreversible'`` mode). Default: ``0``
+        :return Iterator[dict] ops: A generator of operations, formatted like so:
+        
+        .. code-block:: python
+            
+            dict(from, to, amount: str, memo, block, trx_id, trx_in_block, op_in_trx, virtual_op, timestamp, type_op)
+        
+        """
+        op_types = None if not op_types else frozenset([op_types] if isinstance(op_types, str) else op_types)
+        accounts = None if not accounts else frozenset([accounts] if isinstance(accounts, str) else accounts)
+        include_virtual = kwargs.pop('virtual', True)
+        only_virtual = op_types is not None and op_types.issubset(storage.virtual_op_names)
+        
+        for num, ops in self._follow_chain('get_ops_in_block', lambda n: (str(n), only_virtual), start=start,
+                                           mode=mode, **kwargs):
+            for o in ops:
+                type_op, op = o['op']
+                if op_types is not None and type_op not in op_types:
+                    continue
+                if not include_virtual and o.get('virtual_op'):
+                    continue
+                if accounts is not None and accounts.isdisjoint(op_accounts(op)):
+                    continue
+                op['block'] = o.get('block', num)
+                op['trx_id'] = o['trx_id']
+                op['trx_in_block'] = o['trx_in_block']
+                op['op_in_trx'] = o['op_in_trx']
+                op['virtual_op'] = o['virtual_op']
+                op['timestamp'] = o['timestamp']
+                op['type_op'] = type_op
+                yield op
+
     ##### ##### social_network ##### #####
 
     ##### ##### tags ##### #####
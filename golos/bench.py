@@ -0,0 +1,241 @@
+"""
+Benchmark and rank GOLOS RPC nodes.
+
+For each node, :func:`.bench_node` measures the websocket connect time, per-method latency percentiles,
+throughput with multiple concurrent connections, and how far the node's head block lags behind the best node.
+:func:`.rank_nodes` then orders the nodes, and :func:`.save_ranking` writes a JSON file which
+:class:`golos.ws_client.WsClient` can load directly using ``nodes_file``.
+
+**From the command line**:
+
+.. code-block:: bash
+
+    golos_bench --nodes wss://golosd.privex.io,wss://api.golos.blckchnd.com/ws -o nodes.json
+    # or
+    python3 -m golos.bench -o nodes.json
+
+**From Python**:
+
+    >>> from golos import storage, WsClient
+    >>> from golos.bench import bench_nodes, save_ranking
+    >>> results = bench_nodes(storage.nodes)
+    >>> save_ranking('nodes.json', results)
+    >>> rpc = WsClient(nodes_file='nodes.json')
+
+"""
+import json
+import logging
+import math
+import threading
+import time
+from datetime import datetime
+from typing import List, Tuple, Union
+
+from golos import storage
+from golos.timestamps import format_timestamp, parse_timestamp
+from golos.ws_client import WsClient
+
+log = logging.getLogger(__name__)
+
+DEFAULT_METHODS: List[Tuple[str, tuple]] = [
+    ('get_dynamic_global_properties', ()),
+    ('get_config', ()),
+    ('get_accounts', (['someguy123'],)),
+]
+"""The ``(method, args)`` pairs which are timed by :func:`.bench_node`. ``get_block`` (head) is always included."""
+
+MAX_LAG = 5
+"""Nodes whose head block lags behind the best node by more than this many blocks are ranked after healthy nodes"""
+
+
+def percentile(data: List[float], pct: Union[int, float]) -> float:
+    """
+    Return the ``pct`` percentile of ``data`` using the nearest-rank method.
+
+        >>> percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 90)
+        9
+
+    """
+    if not data:
+        return 0.0
+    ordered = sorted(data)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _connect(url: str) -> Tuple[WsClient, float]:
+    rpc = WsClient(nodes=[url], num_retries=0, auto_connect=False)
+    rpc.url = url
+    started = time.time()
+    rpc.node_connect(url)
+    return rpc, time.time() - started
+
+
+def _throughput(url: str, concurrency: int, duration: float) -> Tuple[float, int]:
+    counts, errors = [0] * concurrency, [0] * concurrency
+    deadline = time.time() + duration
+
+    def _worker(i):
+        try:
+            rpc, _ = _connect(url)
+        except Exception:
+            errors[i] += 1
+            return
+        try:
+            while time.time() < deadline:
+                try:
+                    rpc.call('get_dynamic_global_properties')
+                    counts[i] += 1
+                except Exception:
+                    errors[i] += 1
+        finally:
+            rpc.close()
+
+    threads = [threading.Thread(target=_worker, args=(i,), daemon=True) for i in range(concurrency)]
+    started = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(counts) / max(time.time() - started, 1e-9), sum(errors)
+
+
+def bench_node(url: str, samples: int = 20, concurrency: int = 4, duration: float = 3.0,
+               methods: List[Tuple[str, tuple]] = None) -> dict:
+    """
+    Benchmark a single node. Errors are recorded in the result rather than raised.
+
+    :param str url: The node to benchmark, e.g. ``wss://golosd.privex.io``
+    :param int samples: Number of times each method is called when measuring latency
+    :param int concurrency: Number of simultaneous connections used when measuring throughput
+    :param float duration: Number of seconds to measure throughput for (``0`` to skip)
+    :param list methods: ``(method, args)`` pairs to time (default: :py:attr:`.DEFAULT_METHODS`)
+    :return dict result: ``dict(node, ok, error, connect_time, head_block, head_age, latency, throughput, errors)``
+    """
+    methods = DEFAULT_METHODS if methods is None else methods
+    res = dict(node=url, ok=False, error=None, connect_time=None, head_block=0, head_age=None, latency={},
+               throughput=0.0, errors=0)
+    try:
+        rpc, res['connect_time'] = _connect(url)
+        try:
+            props = rpc.call('get_dynamic_global_properties')
+            res['head_block'] = int(props['head_block_number'])
+            head_time = parse_timestamp(props['time'])
+            res['head_age'] = (datetime.utcnow() - head_time).total_seconds()
+
+            for name, args in list(methods) + [('get_block', (str(res['head_block']),))]:
+                timings = []
+                for _ in range(samples):
+                    started = time.time()
+                    try:
+                        rpc.call(name, *args)
+                    except Exception as e:
+                        log.debug('Error calling %s on %s: %s', name, url, e)
+                        res['errors'] += 1
+                        continue
+                    timings.append(time.time() - started)
+                res['latency'][name] = dict(
+                    p50=percentile(timings, 50), p90=percentile(timings, 90), p99=percentile(timings, 99),
+                    mean=sum(timings) / len(timings) if timings else 0.0, samples=len(timings),
+                )
+        finally:
+            rpc.close()
+        if duration and concurrency:
+            res['throughput'], errors = _throughput(url, concurrency, duration)
+            res['errors'] += errors
+        res['ok'] = True
+    except Exception as e:
+        log.warning('Failed to benchmark node %s: %s %s', url, type(e), str(e))
+        res['error'] = f'{type(e).__name__}: {e}'
+    return res
+
+
+def rank_nodes(results: List[dict]) -> List[dict]:
+    """
+    Sort benchmark results from best to worst, setting ``head_lag`` and ``rank`` on each result.
+
+    Working nodes are ranked before failed nodes, and nodes within :py:attr:`.MAX_LAG` blocks of the best head
+    block are ranked before lagging nodes. Ties are broken by median ``get_block`` latency, then throughput.
+    """
+    best_head = max([r['head_block'] for r in results if r['ok']] or [0])
+    for r in results:
+        r['head_lag'] = best_head - r['head_block'] if r['ok'] else None
+
+    def _key(r):
+        if not r['ok']:
+            return 2, 0, 0, 0
+        lat = r['latency'].get('get_block', {}).get('p50', 0)
+        return (0 if r['head_lag'] <= MAX_LAG else 1), lat, -r['throughput'], r['head_lag']
+
+    ranked = sorted(results, key=_key)
+    for i, r in enumerate(ranked):
+        r['rank'] = i + 1
+    return ranked
+
+
+def bench_nodes(nodes: List[str] = None, **kwargs) -> List[dict]:
+    """
+    Benchmark each node in ``nodes`` (default: :py:attr:`golos.storage.nodes`) one at a time, so they don't
+    compete for bandwidth, and return the results ranked by :func:`.rank_nodes`.
+
+    Keyword arguments are passed through to :func:`.bench_node`
+    """
+    nodes = list(storage.nodes) if nodes is None else list(nodes)
+    return rank_nodes([bench_node(n, **kwargs) for n in nodes])
+
+
+def save_ranking(path: str, results: List[dict]):
+    """
+    Save ranked benchmark results to ``path`` as JSON, in the format loaded by ``WsClient(nodes_file=path)``:
+
+    .. code-block:: python
+
+        dict(nodes=['wss://best-node', 'wss://second-best', ...], results=[...], created='2019-10-01T12:00:00')
+
+    Failed nodes are excluded from ``nodes``, but kept in ``results``.
+    """
+    data = dict(
+        nodes=[r['node'] for r in results if r['ok']], results=results,
+        created=format_timestamp(datetime.utcnow())
+    )
+    with open(path, 'w') as fh:
+        json.dump(data, fh, indent=4)
+
+
+def format_results(results: List[dict]) -> str:
+    """Render ranked benchmark results as a plain text table"""
+    lines = ['{:<5}{:<42}{:>10}{:>10}{:>10}{:>10}{:>10}'.format(
+        'Rank', 'Node', 'Connect', 'Block p50', 'Block p99', 'Calls/s', 'Head lag'
+    )]
+    for r in results:
+        if not r['ok']:
+            lines.append('{:<5}{:<42}  FAILED: {}'.format(r['rank'], r['node'], r['error']))
+            continue
+        blk = r['latency'].get('get_block', {})
+        lines.append('{:<5}{:<42}{:>9.0f}ms{:>8.0f}ms{:>8.0f}ms{:>10.1f}{:>10}'.format(
+            r['rank'], r['node'], r['connect_time'] * 1000, blk.get('p50', 0) * 1000, blk.get('p99', 0) * 1000,
+            r['throughput'], r['head_lag']
+        ))
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None):
+    from privex.helpers import ErrHelpParser
+    parser = ErrHelpParser(description='Benchmark and rank GOLOS RPC nodes')
+    parser.add_argument('--nodes', default=None, dest='nodes', help='Comma separated nodes (default: storage.nodes)')
+    parser.add_argument('-s', '--samples', type=int, default=20, help='Calls per method for latency')
+    parser.add_argument('-c', '--concurrency', type=int, default=4, help='Connections for throughput')
+    parser.add_argument('-d', '--duration', type=float, default=3.0, help='Seconds to measure throughput for')
+    parser.add_argument('-o', '--output', default=None, help='Save the ranked node list to this JSON file')
+    args = parser.parse_args(argv)
+
+    nodes = args.nodes.split(',') if args.nodes else None
+    results = bench_nodes(nodes, samples=args.samples, concurrency=args.concurrency, duration=args.duration)
+    print(format_results(results))
+    if args.output:
+        save_ranking(args.output, results)
+        print(f"\nSaved ranked node list to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
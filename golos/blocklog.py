@@ -0,0 +1,140 @@
+"""
+Offline reading of a ``golosd`` node's ``block_log``.
+
+The ``block_log`` file is the node's append-only store of every irreversible block: each entry is a serialized
+signed block, followed by the ``uint64`` file position at which that block started. The accompanying
+``block_log.index`` file contains the ``uint64`` position of each block, in block number order.
+
+:class:`.BlockLog` memory-maps both files, so a block is located with a single index lookup and decoded directly from
+the mapped pages (see :py:mod:`golos.deserializer`) - with no network round trips, JSON or copying of the log. Scanning
+a multi-GB log is limited only by decoding speed and disk reads.
+
+**Basic Usage**:
+
+    >>> from golos.blocklog import BlockLog
+    >>> with BlockLog('/steem/witness_node_data_dir/blockchain/block_log') as block_log:
+    ...     print(block_log.head_block_num)
+    ...     block = block_log.get_block(30895436)
+    ...     for num, block in block_log.blocks(30000000, 30100000):
+    ...         process_block(num, block)
+
+If the ``block_log.index`` file is missing, the block positions are recovered by walking the log backwards using the
+position trailing each block, which doesn't require decoding any blocks.
+"""
+import logging
+import mmap
+import os
+import struct
+from typing import Iterator, List, Optional, Tuple, Union
+
+from golos.deserializer import read_block, Reader
+from golos.exceptions import GolosException
+
+log = logging.getLogger(__name__)
+
+_POS = struct.Struct('<Q')
+
+
+class BlockLog:
+    """
+    Reads blocks from a ``golosd`` ``block_log`` file - see the module docstring of :py:mod:`golos.blocklog`
+
+    :param str path: The path to the ``block_log`` file
+    :param str index_path: The path to the block position index (Default: ``path + '.index'``, if it exists)
+    """
+
+    def __init__(self, path: str, index_path: str = None):
+        self.path = path
+        index_path = path + '.index' if index_path is None else index_path
+        self.index_path = index_path if os.path.exists(index_path) else None
+        self._files, self._maps, self._views = [], [], []
+        self.data = self._map(path)
+        self._index: Union[memoryview, List[int]] = []
+        if self.index_path is not None:
+            self._index = self._map(self.index_path).cast('Q')
+            self._views.append(self._index)
+        elif len(self.data) > 0:
+            log.debug('No index for %s - recovering block positions from the log', path)
+            self._index = self._scan_positions()
+
+    def _map(self, path: str) -> memoryview:
+        fh = open(path, 'rb')
+        self._files.append(fh)
+        if os.fstat(fh.fileno()).st_size == 0:
+            return memoryview(b'')
+        m = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(m)
+        self._views.append(memoryview(m))
+        return self._views[-1]
+
+    def _scan_positions(self) -> List[int]:
+        positions, end = [], len(self.data)
+        while end > 0:
+            pos = _POS.unpack_from(self.data, end - 8)[0]
+            if pos >= end - 8:
+                raise GolosException(f'Corrupt block_log {self.path}: invalid block position {pos} at {end - 8}')
+            positions.append(pos)
+            end = pos
+        positions.reverse()
+        return positions
+
+    @property
+    def head_block_num(self) -> int:
+        """The number of the last block in the log (``0`` if the log is empty)"""
+        return len(self._index)
+
+    def __len__(self):
+        return self.head_block_num
+
+    def raw_block(self, num: int) -> memoryview:
+        """
+        Return the serialized block ``num`` as a ``memoryview`` of the mapped log (no data is copied).
+
+        :raises IndexError: When block ``num`` isn't in the log
+        """
+        if not 1 <= num <= self.head_block_num:
+            raise IndexError(f'Block {num} is not in the block_log (head block: {self.head_block_num})')
+        start = self._index[num - 1]
+        end = self._index[num] if num < self.head_block_num else len(self.data)
+        return self.data[start:end - 8]
+
+    def get_block(self, num: int) -> dict:
+        """
+        Decode and return block ``num``, in the same form as the ``get_block`` RPC call.
+
+        :raises IndexError: When block ``num`` isn't in the log
+        """
+        return read_block(Reader(self.raw_block(num)))
+
+    def blocks(self, start: int = 1, end: Optional[int] = None) -> Iterator[Tuple[int, dict]]:
+        """
+        Decode and yield ``(block_num, block)`` for each block from ``start`` to ``end`` (inclusive, Default: the
+        last block in the log).
+        """
+        end = self.head_block_num if end is None else min(int(end), self.head_block_num)
+        if start > end:
+            return
+        if start < 1:
+            raise IndexError(f'Block {start} is not in the block_log')
+        # Blocks are contiguous, so a single reader walks the log, skipping each block's trailing position
+        r = Reader(self.data, self._index[start - 1])
+        for num in range(start, end + 1):
+            yield num, read_block(r)
+            r.pos += 8
+
+    def close(self):
+        """Unmap and close the log. Any ``memoryview`` returned by :py:meth:`.raw_block` must be released first."""
+        self._index, self.data = [], memoryview(b'')
+        for view in reversed(self._views):
+            view.release()
+        for m in self._maps:
+            m.close()
+        for fh in self._files:
+            fh.close()
+        self._files, self._maps, self._views = [], [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
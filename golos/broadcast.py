@@ -4,14 +4,15 @@ import hashlib
 import struct
 import time
 from binascii import hexlify, unhexlify
-from calendar import timegm
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 import ecdsa
 
 from .base58 import Base58
-from .operations import type_op
-from .storage import chain_id, expiration, operations, prefix, time_format, time_format_utc
+from .serializer import transaction_digest
+from .timestamps import format_timestamp, parse_timestamp
+from .types import varint
+from .storage import chain_id, expiration, prefix, time_format, time_format_utc
 
 
 class Tx:
@@ -69,9 +70,9 @@ class Tx:
         
         # Properly Format Time that is x seconds in the future :param int secs: Seconds to go in the future (x>0) or
         # the past (x<0)
-        now = datetime.strptime(props["time"], self.time_format)
+        now = parse_timestamp(props["time"])
         new = timedelta(seconds=self.expiration) + now
-        tx["expiration"] = new.strftime(self.time_format)
+        tx["expiration"] = format_timestamp(new)
         
         digest = self.get_digest(tx)  # получаем хэш транзакции
         sigs = self.sign(wif, digest)  # получаем подпись
@@ -80,33 +81,12 @@ class Tx:
         return tx
     
     def get_digest(self, tx):
-        
-        b = b''
-        b += struct.pack("<H", tx["ref_block_num"])  # Uint16
-        b += struct.pack("<I", tx["ref_block_prefix"])  # Uint32
-        b += struct.pack("<I", timegm(time.strptime((tx["expiration"] + "UTC"), self.time_format_utc)))  # PointInTime
-        ops = tx["operations"]
-        b += self.varint(len(ops))  # Array len()
-        for op in ops:
-            b += self.varint(operations[op[0]])  # Id op[0] name operations in dict
-            
-            for key, type_value in type_op[op[0]]:
-                b += bytes(type_value(op[1][key]))
-        
-        b += self.varint(len(tx["extensions"]))  # Set = Array []
-        message = unhexlify(chain_id) + b  # chain_id + tx
-        digest = hashlib.sha256(message).digest()
-        
-        return digest
+        # sha256 of chain_id + the unsigned transaction, see golos.serializer.serialize_transaction
+        return transaction_digest(tx, self.chain_id)
     
     def varint(self, n):
         # Varint encoding
-        data = b''
-        while n >= 0x80:
-            data += bytes([(n & 0x7f) | 0x80])
-            n >>= 7
-        data += bytes([n])
-        return data
+        return varint(n)
     
     def sign(self, wif, digest):  # digest
         
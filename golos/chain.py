@@ -0,0 +1,136 @@
+"""
+Fork-aware tracking of the head block.
+
+Blocks near the head of the chain can be orphaned by micro-forks, so consumers normally wait ~45 seconds for
+blocks to become irreversible. :class:`.HeadTracker` instead follows the head block with low latency, verifying the
+``previous`` linkage of every block. When a reorg is detected, it emits ``rollback`` events for each orphaned block
+(newest first), followed by ``block`` events for the blocks of the new chain - so consumers can undo and redo their
+work while still staying correct.
+
+**Basic Usage**:
+
+    >>> from golos import Api
+    >>> for event in Api().track_head():
+    ...     if event.type == 'rollback':
+    ...         undo_block(event.block_num, event.block)
+    ...     else:
+    ...         process_block(event.block_num, event.block)
+
+"""
+import hashlib
+import logging
+import struct
+from collections import deque
+from time import sleep
+from typing import Iterator, NamedTuple, Optional, Deque
+
+from golos.exceptions import GolosException
+from golos.types import BlockHeaderExtension, SignedBlockHeader
+
+log = logging.getLogger(__name__)
+
+BLOCK_EXTENSION_TYPES = [name for name, _ in BlockHeaderExtension.types]
+"""The ``static_variant`` types which may appear in a block header's ``extensions``, in order of their type ID"""
+
+
+def block_num_from_id(block_id: str) -> int:
+    """
+    Extract the block number from a block ID - the first 4 bytes of an ID are the big-endian block number.
+
+        >>> block_num_from_id('01d76f4cd9e7ac5aab05b9a1ee5d1b4b1b3e5e91')
+        30895948
+
+    """
+    return int(block_id[:8], 16)
+
+
+def block_header_bytes(block: dict) -> bytes:
+    """Serialize the signed header of ``block`` (everything except the transactions)"""
+    return bytes(SignedBlockHeader(block))
+
+
+def block_id(block: dict) -> str:
+    """
+    Return the block ID of ``block``. If the node included ``block_id`` in the block it's used as-is, otherwise
+    it's calculated locally in the same way as ``golosd``: the SHA224 hash of the signed block header, truncated to
+    20 bytes, with the first 4 bytes replaced by the big-endian block number.
+    """
+    if block.get('block_id'):
+        return block['block_id']
+    num = block_num_from_id(block['previous']) + 1
+    digest = hashlib.sha224(block_header_bytes(block)).digest()
+    return (struct.pack('>I', num) + digest[4:20]).hex()
+
+
+class ChainEvent(NamedTuple):
+    """An event emitted by :class:`.HeadTracker`"""
+    type: str
+    """Either ``'block'`` (a new block was applied) or ``'rollback'`` (a previously emitted block was orphaned)"""
+    block_num: int
+    block_id: str
+    block: dict
+
+
+class HeadTracker:
+    """
+    Follows the head block, emitting :class:`.ChainEvent`'s - see the module docstring of :py:mod:`golos.chain`.
+
+    :param golos.api.Api api: The :class:`golos.api.Api` instance to stream blocks from
+    :param int start: The block number to start from (Default: ``None`` - the current head block)
+    :param int max_depth: The number of recent blocks to remember. A fork deeper than this raises an exception.
+    :param kwargs: Any additional keyword arguments are passed to :py:meth:`golos.api.Api.stream_blocks`
+    """
+    def __init__(self, api, start: int = None, max_depth: int = 100, **kwargs):
+        self.api = api
+        self.start = start
+        self.max_depth = int(max_depth)
+        self.stream_kwargs = kwargs
+        self.chain: Deque[ChainEvent] = deque(maxlen=self.max_depth)
+        self.rpc = None
+
+    @property
+    def head(self) -> Optional[ChainEvent]:
+        """The most recently applied block, or ``None`` if no blocks have been applied yet"""
+        return self.chain[-1] if self.chain else None
+
+    def _get_block(self, num: int, expected_id: str, tries: int = 5) -> dict:
+        """Fetch block ``num`` from the node, ensuring it has the ID ``expected_id``"""
+        if self.rpc is None:
+            self.rpc = self.api._new_rpc()
+        for _ in range(tries):
+            block = self.rpc.call('get_block', str(num))
+            if block is not None and block_id(block) == expected_id:
+                block['block_num'] = num
+                return block
+            # The node may have switched forks again since the child block was fetched
+            sleep(0.5)
+        raise GolosException(f"Could not fetch block {num} with ID {expected_id} while resolving a fork")
+
+    def _apply(self, num: int, block: dict) -> Iterator[ChainEvent]:
+        bid = block_id(block)
+        if not self.chain or block['previous'] == self.chain[-1].block_id:
+            ev = ChainEvent('block', num, bid, block)
+            self.chain.append(ev)
+            yield ev
+            return
+
+        # Reorg - walk back through the new chain until it links up with a block we've already applied
+        log.info("Fork detected at block %d (previous %s != %s)", num, block['previous'], self.chain[-1].block_id)
+        branch = [ChainEvent('block', num, bid, block)]
+        while self.chain and self.chain[-1].block_id != branch[0].block['previous']:
+            yield self.chain.pop()._replace(type='rollback')
+            parent_num, parent_id = branch[0].block_num - 1, branch[0].block['previous']
+            branch.insert(0, ChainEvent('block', parent_num, parent_id, self._get_block(parent_num, parent_id)))
+        if not self.chain:
+            raise GolosException(f"Fork at block {num} is deeper than the {self.max_depth} tracked blocks")
+        for ev in branch:
+            self.chain.append(ev)
+            yield ev
+
+    def __iter__(self) -> Iterator[ChainEvent]:
+        try:
+            for block in self.api.stream_blocks(start=self.start, mode='head', **self.stream_kwargs):
+                yield from self._apply(block['block_num'], block)
+        finally:
+            if self.rpc is not None:
+                self.rpc.close()
@@ -0,0 +1,144 @@
+"""
+Checkpoint stores for resumable block / operation streaming.
+
+A checkpoint records the number of the last block which was fully processed by a consumer of
+:py:meth:`golos.api.Api.stream_blocks` or :py:meth:`golos.api.Api.stream_ops`. When a stream is restarted with the
+same checkpoint, it resumes from the block after the checkpoint, instead of re-scanning from the beginning.
+
+A block is only saved to the checkpoint once the consumer asks for the item *after* that block's last item, so
+after a crash, a block is never skipped - at worst, the blocks processed since the last save are delivered again
+(at-least-once delivery). Consumers should therefore make their per-block work idempotent.
+
+**Basic Usage**:
+
+    >>> from golos import Api
+    >>> from golos.checkpoint import FileCheckpoint
+    >>> golos = Api()
+    >>> for op in golos.stream_ops(op_types=['transfer'], start=30000000, checkpoint=FileCheckpoint('scan.ckpt')):
+    ...     process_transfer(op)
+
+The first run starts from block ``30000000``, while later runs resume from the block after the one saved
+in ``scan.ckpt``. Checkpoints can be shared between processes using :class:`.SqliteCheckpoint` with different names:
+
+    >>> ckpt = SqliteCheckpoint('state.db', name='transfers')
+
+"""
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from typing import Optional, Union
+
+from golos.timestamps import format_timestamp
+
+log = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """
+    Base class for checkpoint stores. Sub-classes must implement :py:meth:`.load` and :py:meth:`.save`, and
+    :py:meth:`.save` must be atomic - a crash part way through a save must leave the previous checkpoint intact.
+    """
+    def load(self) -> Optional[int]:
+        """Return the last saved block number, or ``None`` if nothing has been saved yet"""
+        raise NotImplementedError
+
+    def save(self, block_num: int):
+        """Record ``block_num`` as the last fully processed block"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class MemoryCheckpoint(Checkpoint):
+    """A checkpoint which is only kept in memory - mainly useful for testing, or resuming within a process"""
+    def __init__(self, block_num: int = None):
+        self.block_num = block_num
+
+    def load(self) -> Optional[int]:
+        return self.block_num
+
+    def save(self, block_num: int):
+        self.block_num = int(block_num)
+
+
+class FileCheckpoint(Checkpoint):
+    """
+    Stores the checkpoint as a small JSON file at ``path``.
+
+    Each save writes a temporary file in the same folder, flushes it to disk with ``fsync``, then atomically
+    renames it over ``path``, so the file always contains either the old or the new checkpoint.
+    """
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+
+    def load(self) -> Optional[int]:
+        try:
+            with open(self.path, 'r') as fh:
+                return int(json.load(fh)['block_num'])
+        except FileNotFoundError:
+            return None
+
+    def save(self, block_num: int):
+        data = dict(block_num=int(block_num), updated=format_timestamp(datetime.utcnow()))
+        fd, tmp = tempfile.mkstemp(prefix='.ckpt-', dir=os.path.dirname(self.path))
+        try:
+            with os.fdopen(fd, 'w') as fh:
+                json.dump(data, fh)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+
+class SqliteCheckpoint(Checkpoint):
+    """
+    Stores checkpoints in the ``checkpoints`` table of the SQLite database ``path``, keyed by ``name``, so one
+    database can hold the checkpoints of several independent scanners. Each save is a single transaction.
+    """
+    def __init__(self, path: str, name: str = 'default'):
+        self.path, self.name = path, name
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS checkpoints (name TEXT PRIMARY KEY, block_num INTEGER NOT NULL, '
+                'updated TEXT NOT NULL)'
+            )
+
+    def load(self) -> Optional[int]:
+        with self.lock:
+            row = self.conn.execute('SELECT block_num FROM checkpoints WHERE name = ?', (self.name,)).fetchone()
+        return None if row is None else int(row[0])
+
+    def save(self, block_num: int):
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO checkpoints (name, block_num, updated) VALUES (?, ?, ?)',
+                (self.name, int(block_num), format_timestamp(datetime.utcnow()))
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+def get_checkpoint(checkpoint: Union[str, Checkpoint, None]) -> Optional[Checkpoint]:
+    """
+    Convert a file path into a :class:`.FileCheckpoint`, returning :class:`.Checkpoint` instances and ``None`` as-is
+    """
+    if isinstance(checkpoint, str):
+        return FileCheckpoint(checkpoint)
+    return checkpoint
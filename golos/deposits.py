@@ -0,0 +1,100 @@
+"""
+Deposit monitoring for any number of watched accounts, using a single operation stream.
+
+Polling ``get_account_history`` for each deposit account costs one or more node calls per account, per poll.
+:class:`.DepositWatcher` instead streams the ``transfer`` operations of every block once (using
+:py:meth:`golos.api.Api.stream_ops`), and matches each transfer against a hash set of watched accounts and an
+optional set of memo patterns - so the cost depends only on the number of operations on the chain.
+
+Deposits are only emitted once they're final: by default, once their block is irreversible. Alternatively,
+pass ``confirmations`` to emit deposits once their block is that many blocks behind the head block.
+
+**Basic Usage**:
+
+    >>> from golos import Api
+    >>> from golos.deposits import DepositWatcher
+    >>> watcher = DepositWatcher(Api(), accounts=['exchange-hot', 'exchange-cold'], memo_patterns=[r'^[0-9a-f]{32}$'])
+    >>> for deposit in watcher.watch(checkpoint='deposits.ckpt'):
+    ...     credit_user(deposit['memo'], deposit['amount'], deposit['trx_id'])
+
+Accounts and memo patterns can be added or removed from another thread while :py:meth:`.DepositWatcher.watch`
+is running.
+"""
+import logging
+import re
+import threading
+from typing import Iterable, Iterator, List, Optional, Pattern, Union
+
+log = logging.getLogger(__name__)
+
+
+class DepositWatcher:
+    """
+    Emits incoming transfers to watched accounts - see the module docstring of :py:mod:`golos.deposits`
+
+    :param golos.api.Api api: The :class:`golos.api.Api` instance to stream operations from
+    :param list accounts: Accounts to watch for incoming transfers (Default: ``None`` - any account)
+    :param list memo_patterns: Regular expressions, at least one of which must match (``re.search``) the memo of
+                               a transfer for it to count as a deposit (Default: ``None`` - any memo)
+    :param int confirmations: If ``None`` (default), emit deposits once their block is irreversible. Otherwise,
+                              emit them once their block is this many blocks behind the head block.
+    :param list assets: Only emit deposits of these assets, e.g. ``['GOLOS']`` (Default: ``None`` - any asset)
+    :param list op_types: The operation types which count as deposits (Default: ``['transfer']``)
+    """
+    def __init__(self, api, accounts: Iterable[str] = None, memo_patterns: Iterable[Union[str, Pattern]] = None,
+                 confirmations: Optional[int] = None, assets: Iterable[str] = None, op_types: List[str] = None):
+        self.api = api
+        self.lock = threading.Lock()
+        self.accounts = None if accounts is None else set(accounts)
+        self.memo_patterns = []
+        self._memo_re: Optional[Pattern] = None
+        for p in (memo_patterns or []):
+            self.add_memo_pattern(p)
+        self.confirmations = confirmations
+        self.assets = None if assets is None else frozenset(assets)
+        self.op_types = ['transfer'] if op_types is None else list(op_types)
+
+    def add_account(self, *accounts: str):
+        with self.lock:
+            self.accounts = set(accounts) if self.accounts is None else self.accounts | set(accounts)
+
+    def remove_account(self, *accounts: str):
+        with self.lock:
+            if self.accounts is not None:
+                self.accounts = self.accounts - set(accounts)
+
+    def add_memo_pattern(self, pattern: Union[str, Pattern]):
+        """Add a memo regular expression. All patterns are compiled into one regex, so memos are scanned once."""
+        with self.lock:
+            self.memo_patterns.append(pattern.pattern if isinstance(pattern, Pattern) else pattern)
+            self._memo_re = re.compile('|'.join(f'(?:{p})' for p in self.memo_patterns))
+
+    def matches(self, op: dict) -> bool:
+        """Returns ``True`` if the transfer ``op`` is a deposit to a watched account"""
+        # The sets / regex are replaced rather than mutated, so reading them without the lock is safe
+        accounts, memo_re = self.accounts, self._memo_re
+        if accounts is not None and op.get('to') not in accounts:
+            return False
+        if self.assets is not None and op.get('amount', '').split(' ')[-1] not in self.assets:
+            return False
+        if memo_re is not None and not memo_re.search(op.get('memo', '')):
+            return False
+        return True
+
+    def watch(self, start: int = None, **kwargs) -> Iterator[dict]:
+        """
+        Yield each deposit (in the operation format of :py:meth:`golos.api.Api.stream_ops`) in block order, once
+        it's confirmed, starting from block ``start`` (Default: the newest confirmed block).
+
+        :param int start: The block number to start scanning from
+        :param kwargs: Additional keyword arguments for :py:meth:`golos.api.Api.stream_ops`, e.g. ``end``,
+                       ``checkpoint`` or ``poll_interval``
+        :return Iterator[dict] deposits: A generator of deposit operations
+        """
+        if self.confirmations is None:
+            kwargs['mode'] = 'irreversible'
+        else:
+            kwargs['mode'], kwargs['confirmations'] = 'head', int(self.confirmations)
+        for op in self.api.stream_ops(op_types=self.op_types, start=start, virtual=False, **kwargs):
+            if self.matches(op):
+                yield op
@@ -0,0 +1,313 @@
+"""
+Binary deserialization of GOLOS transactions and blocks - the inverse of :py:mod:`golos.serializer`.
+
+Operations are decoded using the same schemas as they're encoded with (:py:attr:`golos.operations.type_op`), so raw
+chain data (``get_transaction_hex`` output, or the records of a ``block_log``) can be processed without JSON.
+
+A :class:`.Reader` wraps a ``memoryview`` of the data, so decoding a record never copies the rest of the buffer, and
+many concatenated records can be decoded as a stream with :func:`.iter_transactions` / :func:`.iter_blocks`.
+
+**Basic Usage**:
+
+    >>> from golos.deserializer import decode_transaction
+    >>> tx = decode_transaction(bytes.fromhex(
+    ...     '4b6d2b19f0b3784b935d01020a736f6d656775793132330d6b73616e746f70726f7465696e640000000000000003474f4c4f53'
+    ...     '00000774657374696e6700'
+    ... ), include_signatures=False)
+    >>> tx['operations']
+    [['transfer', {'from': 'someguy123', 'to': 'ksantoprotein', 'amount': '0.100 GOLOS', 'memo': 'testing'}]]
+
+"""
+import logging
+import struct
+from typing import Callable, Dict, Iterator, List, Union
+
+from golos.base58 import gphBase58CheckEncode
+from golos.exceptions import UnsupportedOperation
+from golos.operations import Operation, type_op
+from golos.storage import op_names, prefix
+from golos.timestamps import epoch_to_timestamp
+from golos.types import Amount, ArrayOf, ArrayString, Bool, Bytes, Enum, ExtensionsComment, FixedBytes, Int16, Int64, \
+    Optional_Permission, OptionalOf, Permission, PointInTime, PublicKey, Set, SignedBlockHeader, StaticVariantOf, \
+    String, Struct, Uint8, Uint16, Uint32, Uint64, Varint32, Version, Void, format_amount
+
+log = logging.getLogger(__name__)
+
+_U8, _U16, _U32, _U64 = struct.Struct('<B'), struct.Struct('<H'), struct.Struct('<I'), struct.Struct('<Q')
+_I16, _I64 = struct.Struct('<h'), struct.Struct('<q')
+_AMOUNT = struct.Struct('<qB7s')
+
+
+class Reader:
+    """
+    Reads serialized GOLOS types from ``data`` (``bytes``, ``bytearray``, ``mmap`` or ``memoryview``), starting at
+    ``pos``, without copying it.
+
+        >>> r = Reader(bytes.fromhex('0a736f6d6567757931323310270000'))
+        >>> r.string(), r.uint16(), r.remaining
+        ('someguy123', 10000, 2)
+
+    """
+    __slots__ = ('data', 'pos')
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview], pos: int = 0):
+        self.data = data if isinstance(data, memoryview) else memoryview(data)
+        self.pos = pos
+
+    @property
+    def remaining(self) -> int:
+        return len(self.data) - self.pos
+
+    def raw(self, length: int) -> memoryview:
+        """Return the next ``length`` bytes as a ``memoryview`` slice"""
+        end = self.pos + length
+        if end > len(self.data):
+            raise ValueError(f'Unexpected end of data: needed {length} bytes at offset {self.pos}')
+        view = self.data[self.pos:end]
+        self.pos = end
+        return view
+
+    def _unpack(self, st: struct.Struct):
+        v = st.unpack_from(self.data, self.pos)
+        self.pos += st.size
+        return v
+
+    def varint(self) -> int:
+        result, shift, data = 0, 0, self.data
+        while True:
+            b = data[self.pos]
+            self.pos += 1
+            result |= (b & 0x7f) << shift
+            if not b & 0x80:
+                return result
+            shift += 7
+
+    def uint8(self) -> int:
+        return self._unpack(_U8)[0]
+
+    def uint16(self) -> int:
+        return self._unpack(_U16)[0]
+
+    def uint32(self) -> int:
+        return self._unpack(_U32)[0]
+
+    def uint64(self) -> int:
+        return self._unpack(_U64)[0]
+
+    def int16(self) -> int:
+        return self._unpack(_I16)[0]
+
+    def int64(self) -> int:
+        return self._unpack(_I64)[0]
+
+    def bool(self) -> bool:
+        return bool(self.uint8())
+
+    def string(self) -> str:
+        return str(self.raw(self.varint()), 'utf-8')
+
+    def hex(self, length: int) -> str:
+        return self.raw(length).hex()
+
+    def bytes_hex(self) -> str:
+        """A varint length prefixed byte string, as hex (:class:`golos.types.Bytes`)"""
+        return self.hex(self.varint())
+
+    def point_in_time(self) -> str:
+        return epoch_to_timestamp(self.uint32())
+
+    def amount(self) -> str:
+        amount, precision, asset = self._unpack(_AMOUNT)
+        return format_amount(amount, precision, asset.rstrip(b'\x00').decode('ascii'))
+
+    def version(self) -> str:
+        v = self.uint32()
+        return f'{v >> 24}.{(v >> 16) & 0xff}.{v & 0xffff}'
+
+    def public_key(self) -> str:
+        return prefix + gphBase58CheckEncode(self.hex(33))
+
+    def permission(self) -> dict:
+        weight_threshold = self.uint32()
+        account_auths = [[self.string(), self.uint16()] for _ in range(self.varint())]
+        key_auths = [[self.public_key(), self.uint16()] for _ in range(self.varint())]
+        return dict(weight_threshold=weight_threshold, account_auths=account_auths, key_auths=key_auths)
+
+    def optional_permission(self):
+        return self.permission() if self.uint8() else None
+
+    def string_array(self) -> List[str]:
+        return [self.string() for _ in range(self.varint())]
+
+    def void_extensions(self) -> list:
+        """A set of ``future_extensions`` (void static variants), which only contain their type ID"""
+        return [[self.varint(), {}] for _ in range(self.varint())]
+
+    def comment_extensions(self) -> list:
+        exts = []
+        for _ in range(self.varint()):
+            type_id = self.varint()
+            if type_id == 0:
+                value = dict(beneficiaries=[
+                    dict(account=self.string(), weight=self.uint16()) for _ in range(self.varint())
+                ])
+            elif type_id == 1:
+                value = dict(destination=self.uint64())
+            elif type_id == 2:
+                value = dict(percent=self.uint16())
+            else:
+                raise UnsupportedOperation(f'Unknown comment_options extension type {type_id}')
+            exts.append([type_id, value])
+        return exts
+
+
+DECODERS: Dict[type, Callable[[Reader], object]] = {
+    String: Reader.string, Uint8: Reader.uint8, Bool: Reader.bool, Int16: Reader.int16, Uint16: Reader.uint16,
+    Uint32: Reader.uint32, Uint64: Reader.uint64, Int64: Reader.int64, Varint32: Reader.varint,
+    Bytes: Reader.bytes_hex, PointInTime: Reader.point_in_time, Amount: Reader.amount, PublicKey: Reader.public_key,
+    Permission: Reader.permission, Optional_Permission: Reader.optional_permission, ArrayString: Reader.string_array,
+    Set: Reader.void_extensions, ExtensionsComment: Reader.comment_extensions, Version: Reader.version,
+    Void: lambda r: {}, Operation: lambda r: read_operation(r),
+}
+"""Maps :py:mod:`.types` classes to the function which decodes them from a :class:`.Reader`. Decoders for the
+generic composite types (:class:`golos.types.Struct`, :class:`golos.types.ArrayOf` etc.) are added on first use by
+:func:`.decoder_for`."""
+
+_schemas: Dict[str, list] = {}
+
+
+def _struct_decoder(fields: list) -> Callable[[Reader], dict]:
+    decoders = [(key, decoder_for(type_value)) for key, type_value in fields]
+    return lambda r: {key: decode(r) for key, decode in decoders}
+
+
+def _array_decoder(item: type) -> Callable[[Reader], list]:
+    decode = decoder_for(item)
+    return lambda r: [decode(r) for _ in range(r.varint())]
+
+
+def _optional_decoder(item: type) -> Callable[[Reader], object]:
+    decode = decoder_for(item)
+    return lambda r: decode(r) if r.uint8() else None
+
+
+def _variant_decoder(types: list) -> Callable[[Reader], list]:
+    decoders = [decoder_for(type_value) for _, type_value in types]
+
+    def _decode(r: Reader) -> list:
+        type_id = r.varint()
+        if type_id >= len(decoders):
+            raise UnsupportedOperation(f'Unknown static variant type {type_id}')
+        return [type_id, decoders[type_id](r)]
+    return _decode
+
+
+def _enum_decoder(names: list) -> Callable[[Reader], Union[str, int]]:
+    def _decode(r: Reader) -> Union[str, int]:
+        v = r.int64()
+        return names[v] if 0 <= v < len(names) else v
+    return _decode
+
+
+def decoder_for(type_value: type) -> Callable[[Reader], object]:
+    """Return the function which decodes the :py:mod:`.types` class ``type_value`` from a :class:`.Reader`"""
+    decode = DECODERS.get(type_value)
+    if decode is not None:
+        return decode
+    if issubclass(type_value, Struct):
+        decode = _struct_decoder(type_value.fields)
+    elif issubclass(type_value, ArrayOf):
+        decode = _array_decoder(type_value.type)
+    elif issubclass(type_value, OptionalOf):
+        decode = _optional_decoder(type_value.type)
+    elif issubclass(type_value, StaticVariantOf):
+        decode = _variant_decoder(type_value.types)
+    elif issubclass(type_value, FixedBytes):
+        length = type_value.length
+        decode = lambda r: r.hex(length)
+    elif issubclass(type_value, Enum):
+        decode = _enum_decoder(type_value.names)
+    else:
+        raise UnsupportedOperation(f'No decoder for type {type_value.__name__}')
+    DECODERS[type_value] = decode
+    return decode
+
+
+def _schema(name: str) -> list:
+    fields = _schemas.get(name)
+    if fields is None:
+        if name not in type_op:
+            raise UnsupportedOperation(f"Cannot deserialize unsupported operation type '{name}'")
+        fields = _schemas[name] = [(key, decoder_for(type_value)) for key, type_value in type_op[name]]
+    return fields
+
+
+def read_operation(r: Reader) -> list:
+    """
+    Read an operation from ``r`` and return it as ``[op_name, op_dict]``
+
+    :raises UnsupportedOperation: When the operation type isn't defined in :py:attr:`golos.operations.type_op`
+    """
+    type_id = r.varint()
+    if type_id >= len(op_names):
+        raise UnsupportedOperation(f'Unknown operation type ID {type_id}')
+    name = op_names[type_id]
+    return [name, {key: decode(r) for key, decode in _schema(name)}]
+
+
+def read_transaction(r: Reader, include_signatures: bool = True) -> dict:
+    """
+    Read a transaction from ``r`` - see :func:`.decode_transaction`
+
+    :raises UnsupportedOperation: When the transaction contains an operation which can't be deserialized
+    """
+    tx = dict(ref_block_num=r.uint16(), ref_block_prefix=r.uint32(), expiration=r.point_in_time())
+    tx['operations'] = [read_operation(r) for _ in range(r.varint())]
+    tx['extensions'] = r.void_extensions()
+    if include_signatures:
+        tx['signatures'] = [r.hex(65) for _ in range(r.varint())]
+    return tx
+
+
+def decode_transaction(data: Union[bytes, memoryview], include_signatures: bool = True) -> dict:
+    """
+    Decode a serialized transaction into the ``dict`` form used by the RPC API:
+    ``dict(ref_block_num, ref_block_prefix, expiration, operations, extensions, signatures)``
+
+    :param bytes data: The serialized transaction
+    :param bool include_signatures: ``False`` if ``data`` is an unsigned transaction, with no signature section
+    :raises UnsupportedOperation: When the transaction contains an operation which can't be deserialized
+    :return dict tx: The decoded transaction
+    """
+    return read_transaction(Reader(data), include_signatures)
+
+
+def iter_transactions(data: Union[bytes, memoryview], include_signatures: bool = True) -> Iterator[dict]:
+    """Decode and yield each of the serialized transactions concatenated in ``data``"""
+    r = Reader(data)
+    while r.remaining > 0:
+        yield read_transaction(r, include_signatures)
+
+
+def read_block(r: Reader) -> dict:
+    """
+    Read a signed block from ``r`` - in the same form as ``get_block``, i.e. ``dict(previous, timestamp, witness,
+    transaction_merkle_root, extensions, witness_signature, transactions)``
+
+    :raises UnsupportedOperation: When the block contains an operation which can't be deserialized
+    """
+    block = decoder_for(SignedBlockHeader)(r)
+    block['transactions'] = [read_transaction(r) for _ in range(r.varint())]
+    return block
+
+
+def decode_block(data: Union[bytes, memoryview]) -> dict:
+    """Decode a serialized signed block - see :func:`.read_block`"""
+    return read_block(Reader(data))
+
+
+def iter_blocks(data: Union[bytes, memoryview]) -> Iterator[dict]:
+    """Decode and yield each of the serialized signed blocks concatenated in ``data``"""
+    r = Reader(data)
+    while r.remaining > 0:
+        yield read_block(r)
@@ -63,3 +63,8 @@ class RetriesExceeded(GolosException):
 class TransactionNotFound(KnownGolosError):
     """Raised when a requested transaction could not be located"""
     pass
+
+
+class UnsupportedOperation(GolosException):
+    """Raised when an operation can't be serialized locally, as its type isn't in :py:attr:`golos.operations.type_op`"""
+    pass
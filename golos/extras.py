@@ -1,5 +1,7 @@
 import functools
-from typing import List, Union
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Union, Set, Callable, Iterable, Iterator
 
 from privex.helpers import retry_on_err
 import logging
@@ -22,6 +24,76 @@ def dict_sort(data: dict) -> List[tuple]:
     return sorted(tuple(dict(data).items()))
 
 
+ACCOUNT_KEYS = frozenset([
+    'account', 'account_to_recover', 'agent', 'author', 'benefactor', 'comment_author', 'creator', 'curator',
+    'delegatee', 'delegator', 'from', 'from_account', 'new_account_name', 'new_recovery_account', 'owner',
+    'parent_author', 'producer', 'proxy', 'receiver', 'recovery_account', 'reset_account', 'to', 'to_account',
+    'voter', 'who', 'witness',
+])
+"""Operation keys which contain a single account name, used by :func:`.op_accounts`"""
+
+ACCOUNT_LIST_KEYS = frozenset(['required_auths', 'required_posting_auths', 'required_active_auths'])
+"""Operation keys which contain a list of account names, used by :func:`.op_accounts`"""
+
+
+def op_accounts(op: dict) -> Set[str]:
+    """
+    Return the set of account names which are referenced by an operation's ``dict`` body, i.e. the accounts
+    whose history the operation would appear in.
+    
+    **Basic Usage**:
+    
+        >>> sorted(op_accounts({'from': 'someguy123', 'to': 'ksantoprotein', 'amount': '0.100 GOLOS', 'memo': ''}))
+        ['ksantoprotein', 'someguy123']
+    
+    """
+    accs = set()
+    for k, v in op.items():
+        if k in ACCOUNT_KEYS:
+            if v and isinstance(v, str):
+                accs.add(v)
+        elif k in ACCOUNT_LIST_KEYS and v:
+            accs.update(v)
+    return accs
+
+
+def ordered_parallel(func: Callable, items: Iterable, workers: int = 4, window: int = None,
+                     processes: bool = False) -> Iterator:
+    """
+    Run ``func(item)`` for each of ``items`` on a pool of ``workers`` threads, yielding the results in the same
+    order as ``items``.
+    
+    For CPU-bound work, pass ``processes=True`` to use a pool of ``workers`` processes instead, which isn't limited
+    by the GIL - though ``func``, the items and the results must then be picklable.
+    
+    At most ``window`` (default: ``workers * 2``) items are submitted ahead of the result being waited on, so
+    results which complete out of order are held in a bounded reorder buffer, and ``items`` may be a
+    very long (or infinite) generator.
+    
+    **Basic Usage**:
+    
+        >>> list(ordered_parallel(lambda x: x * 2, range(5), workers=3))
+        [0, 2, 4, 6, 8]
+    
+    If ``func`` raises an exception, it's re-raised when the generator reaches that item.
+    """
+    window = workers * 2 if window is None else max(1, int(window))
+    items = iter(items)
+    futures = deque()
+    pool = (ProcessPoolExecutor if processes else ThreadPoolExecutor)(max_workers=workers)
+    try:
+        for item in items:
+            futures.append(pool.submit(func, item))
+            if len(futures) >= window:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+    finally:
+        for f in futures:
+            f.cancel()
+        pool.shutdown(wait=True)
+
+
 def new_node_on_err(max_retries: int = 3, delay: Union[int, float] = 3, **retry_conf):
     fail_on = tuple(retry_conf.get('fail_on', (KeyboardInterrupt,)))
     import golos.api, golos.ws_client
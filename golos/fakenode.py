@@ -0,0 +1,536 @@
+"""
+A lightweight, in-process fake GOLOS node, for benchmarking and testing :class:`golos.ws_client.WsClient`,
+:class:`golos.api.Api`, block streaming and broadcasting with no network access.
+
+:class:`.FakeNode` runs a minimal WebSocket (RFC 6455) server on ``127.0.0.1`` which speaks the GOLOS ``call``
+JSON-RPC dialect for the APIs listed in :py:attr:`golos.storage.api_list`. It produces a synthetic block every
+``block_interval`` seconds, and includes transactions accepted via ``broadcast_transaction`` /
+``broadcast_transaction_synchronous`` in the next block.
+
+**Basic Usage**:
+
+    >>> from golos import Api
+    >>> from golos.fakenode import FakeNode
+    >>> with FakeNode(block_interval=0.5) as node:
+    ...     golos = Api(nodes=node.url)
+    ...     props = golos.get_dynamic_global_properties()
+    ...     block = golos.get_block(props['head_block_number'])
+
+Methods which aren't implemented by default can be added with :py:meth:`.FakeNode.register`:
+
+    >>> node.register('get_witness_count', lambda: 21)
+
+Micro-forks can be simulated with :py:meth:`.FakeNode.fork`, which replaces the most recent blocks with a
+longer competing chain:
+
+    >>> node.fork(depth=2)
+
+"""
+import base64
+import hashlib
+import json
+import logging
+import random
+import socket
+import socketserver
+import struct
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from golos.chain import block_id
+from golos.exceptions import UnsupportedOperation
+from golos.extras import op_accounts
+from golos.serializer import serialize_transaction, transaction_id
+from golos.storage import api_total
+from golos.timestamps import format_timestamp
+from golos.types import Amount
+
+log = logging.getLogger(__name__)
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_CONT, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+CHAIN_BLOCK_INTERVAL = 3
+"""The number of seconds between the timestamps of synthetic blocks, regardless of how fast they're produced"""
+
+EMPTY_ID = '0' * 40
+
+
+class FakeNodeError(Exception):
+    """
+    Raised by method handlers to return a Graphene style JSON error to the client. ``message`` may contain
+    format variables such as ``${id}``, which are filled in by the client from ``data``.
+    """
+    def __init__(self, message: str, data: dict = None, code: int = -32000):
+        super().__init__(message)
+        self.message, self.data, self.code = message, dict(data or {}), code
+
+
+class _WsHandler(socketserver.StreamRequestHandler):
+    """Handles a single WebSocket client connection for :class:`.FakeNode`"""
+    server: '_WsServer'
+
+    def handshake(self) -> bool:
+        headers = {}
+        request_line = self.rfile.readline()
+        if not request_line:
+            return False
+        while True:
+            line = self.rfile.readline().decode('latin-1').strip()
+            if not line:
+                break
+            k, _, v = line.partition(':')
+            headers[k.strip().lower()] = v.strip()
+        key = headers.get('sec-websocket-key')
+        if not key:
+            self.wfile.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n')
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode('ascii')).digest()).decode('ascii')
+        self.wfile.write(
+            b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n' +
+            f'Sec-WebSocket-Accept: {accept}\r\n\r\n'.encode('ascii')
+        )
+        return True
+
+    def read_frame(self):
+        head = self.rfile.read(2)
+        if len(head) < 2:
+            return None, None, None
+        fin, opcode = head[0] & 0x80, head[0] & 0x0F
+        masked, length = head[1] & 0x80, head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack('>H', self.rfile.read(2))[0]
+        elif length == 127:
+            length = struct.unpack('>Q', self.rfile.read(8))[0]
+        mask = self.rfile.read(4) if masked else None
+        payload = self.rfile.read(length)
+        if mask:
+            # XOR the whole payload at once against the repeated 4 byte mask
+            full_mask = (mask * (length // 4 + 1))[:length]
+            payload = (int.from_bytes(payload, 'big') ^ int.from_bytes(full_mask, 'big')).to_bytes(length, 'big')
+        return fin, opcode, payload
+
+    def read_message(self) -> Optional[bytes]:
+        chunks = []
+        while True:
+            fin, opcode, payload = self.read_frame()
+            if opcode is None or opcode == OP_CLOSE:
+                if opcode == OP_CLOSE:
+                    self.send_frame(b'', OP_CLOSE)
+                return None
+            if opcode == OP_PING:
+                self.send_frame(payload, OP_PONG)
+                continue
+            if opcode == OP_PONG:
+                continue
+            chunks.append(payload)
+            if fin:
+                return b''.join(chunks)
+
+    def send_frame(self, payload: bytes, opcode: int = OP_TEXT):
+        length = len(payload)
+        if length < 126:
+            head = struct.pack('>BB', 0x80 | opcode, length)
+        elif length < 65536:
+            head = struct.pack('>BBH', 0x80 | opcode, 126, length)
+        else:
+            head = struct.pack('>BBQ', 0x80 | opcode, 127, length)
+        self.wfile.write(head + payload)
+        self.wfile.flush()
+
+    def handle(self):
+        node = self.server.node
+        node.connections.add(self.request)
+        try:
+            if not self.handshake():
+                return
+            while True:
+                msg = self.read_message()
+                if msg is None:
+                    return
+                self.send_frame(node.handle_message(msg).encode('utf8'))
+        except (ConnectionError, OSError, ValueError):
+            return
+        finally:
+            node.connections.discard(self.request)
+
+
+class _WsServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    node: 'FakeNode'
+
+
+class FakeNode:
+    """
+    An in-process fake GOLOS node, see the module docstring of :py:mod:`golos.fakenode`
+
+    :param float block_interval: Produce a new block every this many seconds. ``None`` disables automatic
+                                 block production (use :py:meth:`.produce_block` to produce blocks manually).
+    :param int initial_blocks: Number of blocks to produce on startup
+    :param list accounts: Account names which exist on the fake chain
+    :param int ops_per_block: Number of synthetic ``transfer`` / ``vote`` operations to include in each block
+    :param int irreversible_depth: How many blocks behind the head block the last irreversible block is
+    :param int seed: Seed for the synthetic operation generator, so runs are reproducible
+    """
+    def __init__(self, block_interval: Optional[float] = 3.0, initial_blocks: int = 10, accounts: List[str] = None,
+                 ops_per_block: int = 0, irreversible_depth: int = 15, seed: int = 0, host: str = '127.0.0.1',
+                 port: int = 0):
+        self.block_interval = block_interval
+        self.ops_per_block = int(ops_per_block)
+        self.irreversible_depth = int(irreversible_depth)
+        self.random = random.Random(seed)
+        self.host, self.port = host, port
+        self.lock = threading.RLock()
+        self.block_produced = threading.Condition(self.lock)
+        self.connections = set()
+
+        self.blocks: Dict[int, dict] = {}
+        self.block_ids: Dict[int, str] = {}
+        self.block_ops: Dict[int, List[dict]] = {}
+        self.transactions: Dict[str, dict] = {}
+        self.pending: List[dict] = []
+        self.history: Dict[str, List[list]] = {}
+        self.witnesses = [f'witness{i}' for i in range(1, 22)]
+        self.genesis_time = datetime.utcnow().replace(microsecond=0) - timedelta(
+            seconds=CHAIN_BLOCK_INTERVAL * (initial_blocks + 1)
+        )
+        self.accounts = {}
+        for name in (accounts or ['someguy123', 'ksantoprotein', 'privex', 'golos']):
+            self.add_account(name)
+
+        self.handlers: Dict[str, Callable] = {}
+        for name in api_total.keys():
+            h = getattr(self, f'api_{name}', None)
+            if h is not None:
+                self.handlers[name] = h
+
+        for _ in range(int(initial_blocks)):
+            self.produce_block()
+
+        self.server: Optional[_WsServer] = None
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+
+    @property
+    def url(self) -> str:
+        """The ``ws://`` URL of this node, for passing to :class:`.WsClient` / :class:`.Api`"""
+        return f'ws://{self.host}:{self.port}'
+
+    @property
+    def head_block_number(self) -> int:
+        return len(self.blocks)
+
+    @property
+    def last_irreversible_block_num(self) -> int:
+        return max(0, self.head_block_number - self.irreversible_depth)
+
+    def start(self) -> 'FakeNode':
+        """Start the WebSocket server (and block production) in background threads"""
+        self.server = _WsServer((self.host, self.port), _WsHandler)
+        self.server.node = self
+        self.port = self.server.server_address[1]
+        self._stop.clear()
+        t = threading.Thread(target=self.server.serve_forever, name='FakeNode-server', daemon=True)
+        t.start()
+        self._threads = [t]
+        if self.block_interval:
+            t = threading.Thread(target=self._producer, name='FakeNode-producer', daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self):
+        """Stop block production, shutdown the WebSocket server and disconnect all clients"""
+        self._stop.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        for conn in list(self.connections):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def register(self, method: str, handler: Callable):
+        """Add or override the handler for the RPC method ``method``. ``handler`` receives the call's params"""
+        self.handlers[method] = handler
+
+    # ----- chain simulation ----- #
+
+    def add_account(self, name: str, balance='1000.000 GOLOS', sbd_balance='100.000 GBG',
+                    vesting_shares='1000000.000000 GESTS'):
+        t = format_timestamp(self.genesis_time)
+        self.accounts[name] = dict(
+            id=len(self.accounts), name=name, owner=self._authority(), active=self._authority(),
+            posting=self._authority(), memo_key='GLS1111111111111111111111111111111114T1Anm', json_metadata='',
+            proxy='', last_owner_update=t, last_account_update=t, created=t, mined=False, recovery_account='',
+            last_account_recovery=t, reset_account='null', comment_count=0, lifetime_vote_count=0, post_count=0,
+            can_vote=True, voting_power=10000, last_vote_time=t, balance=balance, savings_balance='0.000 GOLOS',
+            sbd_balance=sbd_balance, savings_sbd_balance='0.000 GBG', vesting_shares=vesting_shares,
+            delegated_vesting_shares='0.000000 GESTS', received_vesting_shares='0.000000 GESTS',
+            vesting_withdraw_rate='0.000000 GESTS', post_bandwidth=10000, average_bandwidth='0',
+            average_market_bandwidth='0', last_bandwidth_update=t, last_market_bandwidth_update=t, last_post=t,
+            last_root_post=t, witness_votes=[], reputation='0',
+        )
+
+    @staticmethod
+    def _authority() -> dict:
+        return dict(weight_threshold=1, account_auths=[], key_auths=[])
+
+    def block_time(self, num: int) -> str:
+        return format_timestamp(self.genesis_time + timedelta(seconds=CHAIN_BLOCK_INTERVAL * num))
+
+    @staticmethod
+    def make_signature(witness: str, salt: str = '') -> str:
+        """Generate a fake 65 byte witness signature, so blocks from different witnesses / forks have different IDs"""
+        digest = hashlib.sha256(f'{witness}:{salt}'.encode('utf8')).hexdigest()
+        return '1f' + digest * 2
+
+    def make_txid(self, tx: dict) -> str:
+        try:
+            return transaction_id(tx)
+        except UnsupportedOperation:
+            pass
+        # Operations which can't be serialized locally get a stable pseudo ID instead
+        tx = {k: v for k, v in tx.items() if k != 'signatures'}
+        return hashlib.sha256(json.dumps(tx, sort_keys=True).encode('utf8')).hexdigest()[:40]
+
+    def _synthetic_tx(self, num: int) -> dict:
+        names = list(self.accounts.keys())
+        a, b = self.random.sample(names, 2) if len(names) > 1 else (names[0], names[0])
+        if self.random.random() < 0.5:
+            amount = str(Amount.from_satoshis(self.random.randint(1, 10000), 'GOLOS'))
+            op = ['transfer', {'from': a, 'to': b, 'amount': amount, 'memo': f'synthetic {num}'}]
+        else:
+            op = ['vote', {'voter': a, 'author': b, 'permlink': f'post-{num}', 'weight': 10000}]
+        return dict(
+            ref_block_num=(num - 1) & 0xFFFF, ref_block_prefix=0, expiration=self.block_time(num + 20),
+            operations=[op], extensions=[], signatures=[]
+        )
+
+    def _apply_op(self, op_name: str, op: dict, undo: bool = False):
+        if op_name != 'transfer':
+            return
+        amount = Amount(op['amount'])
+        key = 'balance' if amount.asset == 'GOLOS' else 'sbd_balance'
+        for name, sign in ((op['from'], 1 if undo else -1), (op['to'], -1 if undo else 1)):
+            if name not in self.accounts:
+                continue
+            acc = self.accounts[name]
+            acc[key] = str(Amount(acc[key]) + sign * amount)
+
+    def _add_history(self, num: int, opobj: dict):
+        for name in op_accounts(opobj['op'][1]):
+            hist = self.history.setdefault(name, [])
+            hist.append([len(hist), opobj])
+
+    def produce_block(self, witness: str = None, salt: str = '') -> dict:
+        """Produce a new block containing all pending transactions, plus any synthetic operations"""
+        with self.lock:
+            num = self.head_block_number + 1
+            timestamp = self.block_time(num)
+            witness = witness or self.witnesses[num % len(self.witnesses)]
+            txs = self.pending
+            self.pending = []
+            txs += [self._synthetic_tx(num) for _ in range(self.ops_per_block)]
+
+            ops = []
+            for trx_in_block, tx in enumerate(txs):
+                txid = self.make_txid(tx)
+                self.transactions[txid] = dict(tx, block_num=num, transaction_id=txid, transaction_num=trx_in_block)
+                for op_in_trx, op in enumerate(tx['operations']):
+                    self._apply_op(op[0], op[1])
+                    ops.append(dict(
+                        trx_id=txid, block=num, trx_in_block=trx_in_block, op_in_trx=op_in_trx, virtual_op=0,
+                        timestamp=timestamp, op=op
+                    ))
+            ops.append(dict(
+                trx_id=EMPTY_ID, block=num, trx_in_block=len(txs), op_in_trx=0, virtual_op=1, timestamp=timestamp,
+                op=['producer_reward', {'producer': witness, 'vesting_shares': '1.000000 GESTS'}]
+            ))
+
+            block = dict(
+                previous=self.block_ids.get(num - 1, EMPTY_ID), timestamp=timestamp, witness=witness,
+                transaction_merkle_root=EMPTY_ID, extensions=[], witness_signature=self.make_signature(witness, salt),
+                transactions=txs,
+            )
+            self.blocks[num] = block
+            self.block_ids[num] = block_id(block)
+            self.block_ops[num] = ops
+            for o in ops:
+                self._add_history(num, o)
+            self.block_produced.notify_all()
+            return block
+
+    def fork(self, depth: int = 1, witness: str = None) -> List[dict]:
+        """
+        Simulate a micro-fork: the last ``depth`` blocks are orphaned and replaced by ``depth + 1`` new blocks
+        produced by ``witness``. Transactions from the orphaned blocks are returned to the pending pool, and are
+        included again in the new chain.
+
+        :return list blocks: The newly produced blocks of the winning chain
+        """
+        with self.lock:
+            fork_num = self.head_block_number - int(depth) + 1
+            if fork_num < 1:
+                raise ValueError(f'Cannot fork {depth} blocks deep with only {self.head_block_number} blocks')
+            orphaned_txs = []
+            for num in range(self.head_block_number, fork_num - 1, -1):
+                block = self.blocks.pop(num)
+                del self.block_ids[num]
+                for o in reversed(self.block_ops.pop(num)):
+                    self._apply_op(o['op'][0], o['op'][1], undo=True)
+                for tx in block['transactions']:
+                    self.transactions.pop(self.make_txid(tx), None)
+                orphaned_txs = block['transactions'] + orphaned_txs
+            for hist in self.history.values():
+                while hist and hist[-1][1]['block'] >= fork_num:
+                    hist.pop()
+            self.pending = orphaned_txs + self.pending
+            witness = witness or 'forker'
+            return [self.produce_block(witness=witness, salt='fork') for _ in range(int(depth) + 1)]
+
+    def _producer(self):
+        while not self._stop.wait(self.block_interval):
+            self.produce_block()
+
+    # ----- JSON-RPC ----- #
+
+    def handle_message(self, message: bytes) -> str:
+        req_id = None
+        try:
+            req = json.loads(message)
+            req_id = req.get('id')
+            if req.get('method') != 'call':
+                raise FakeNodeError('Method not found ${method}', dict(method=req.get('method')), code=-32601)
+            api, method, params = req['params']
+            if api_total.get(method) != api:
+                raise FakeNodeError('Could not find API ${api}', dict(api=api), code=-381)
+            if method not in self.handlers:
+                raise FakeNodeError('Method ${method} is not supported by FakeNode', dict(method=method))
+            result = self.handlers[method](*params)
+            return json.dumps(dict(jsonrpc='2.0', id=req_id, result=result))
+        except FakeNodeError as e:
+            err = dict(code=e.code, message=e.message, data=e.data)
+        except Exception as e:
+            log.exception('FakeNode error while handling message: %s', message)
+            err = dict(code=-32000, message=f'{type(e).__name__}: {e}', data={})
+        return json.dumps(dict(jsonrpc='2.0', id=req_id, error=err))
+
+    def api_get_config(self):
+        return dict(STEEMIT_BANDWIDTH_PRECISION=1000000, STEEMIT_BLOCK_INTERVAL=CHAIN_BLOCK_INTERVAL,
+                    STEEMIT_ADDRESS_PREFIX='GLS', STEEMIT_CHAIN_ID='0' * 64)
+
+    def api_get_chain_properties(self):
+        return dict(
+            account_creation_fee='1.000 GOLOS', maximum_block_size=65536, sbd_interest_rate=0,
+            create_account_min_golos_fee='0.030 GOLOS', create_account_min_delegation='0.150 GOLOS',
+            create_account_delegation_time=2592000, min_delegation='0.010 GOLOS', min_curation_percent=2500,
+            max_curation_percent=10000,
+        )
+
+    def api_get_dynamic_global_properties(self):
+        with self.lock:
+            head = self.head_block_number
+            return dict(
+                id=0, head_block_number=head, head_block_id=self.block_ids.get(head, EMPTY_ID),
+                time=self.block_time(head), current_witness=self.blocks[head]['witness'] if head else '',
+                total_pow=0, num_pow_witnesses=0, virtual_supply='100000000.000 GOLOS',
+                current_supply='90000000.000 GOLOS', current_sbd_supply='1000000.000 GBG',
+                total_vesting_fund_steem='30000000.000 GOLOS', total_reward_fund_steem='100000.000 GOLOS',
+                total_vesting_shares='100000000000.000000 GESTS', total_reward_shares2='0',
+                sbd_interest_rate=0, maximum_block_size=65536, current_aslot=head, participation_count=128,
+                max_virtual_bandwidth='5986734968066277376', current_reserve_ratio=20000,
+                last_irreversible_block_num=self.last_irreversible_block_num, vote_regeneration_per_day=10,
+            )
+
+    def api_get_block(self, num):
+        return self.blocks.get(int(num))
+
+    def api_get_block_header(self, num):
+        block = self.blocks.get(int(num))
+        if block is None:
+            return None
+        return {k: block[k] for k in ('previous', 'timestamp', 'witness', 'transaction_merkle_root', 'extensions')}
+
+    def api_get_ops_in_block(self, num, only_virtual=False):
+        ops = self.block_ops.get(int(num), [])
+        return [o for o in ops if o['virtual_op']] if only_virtual else list(ops)
+
+    def api_get_account_history(self, account, start, limit):
+        start, limit = int(start), int(limit)
+        if start < limit:
+            raise FakeNodeError('From must be greater than limit', dict(start=start, limit=limit), code=10)
+        hist = self.history.get(account, [])
+        if not hist:
+            return []
+        start = min(start, len(hist) - 1)
+        return hist[max(0, start - limit):start + 1]
+
+    def api_get_accounts(self, names):
+        return [self.accounts[n] for n in names if n in self.accounts]
+
+    def api_lookup_account_names(self, names):
+        return [self.accounts.get(n) for n in names]
+
+    def api_get_account_count(self):
+        return len(self.accounts)
+
+    def api_lookup_accounts(self, lower_bound, limit):
+        return sorted(n for n in self.accounts if n >= lower_bound)[:int(limit)]
+
+    def api_get_transaction(self, txid):
+        if txid not in self.transactions:
+            raise FakeNodeError('Missing Transaction With ID ${id}', dict(id=txid))
+        return self.transactions[txid]
+
+    def api_get_feed_history(self):
+        return dict(id=0, current_median_history=dict(base='1.000 GBG', quote='2.000 GOLOS'), price_history=[])
+
+    def api_get_current_median_history_price(self):
+        return dict(base='1.000 GBG', quote='2.000 GOLOS')
+
+    def api_get_order_book(self, limit):
+        return dict(asks=[dict(price='0.510', order_price=dict(base='51.000 GBG', quote='100.000 GOLOS'))],
+                    bids=[dict(price='0.490', order_price=dict(base='49.000 GBG', quote='100.000 GOLOS'))])
+
+    def api_get_witness_count(self):
+        return len(self.witnesses)
+
+    def api_get_active_witnesses(self):
+        return list(self.witnesses)
+
+    def api_get_transaction_hex(self, tx):
+        return serialize_transaction(tx, include_signatures=False).hex()
+
+    def api_broadcast_transaction(self, tx):
+        if not tx.get('operations'):
+            raise FakeNodeError('Transaction contains no operations')
+        with self.lock:
+            self.pending.append(tx)
+        return None
+
+    def api_broadcast_transaction_synchronous(self, tx):
+        txid = self.make_txid(tx)
+        with self.lock:
+            self.api_broadcast_transaction(tx)
+            if not self.block_interval:
+                self.produce_block()
+            while txid not in self.transactions:
+                if not self.block_produced.wait(timeout=max(self.block_interval or 0, 1) * 5):
+                    raise FakeNodeError('Timed out waiting for transaction ${id} to be included', dict(id=txid))
+            t = self.transactions[txid]
+            return dict(id=txid, block_num=t['block_num'], trx_num=t['transaction_num'], expired=False)
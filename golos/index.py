@@ -0,0 +1,602 @@
+"""
+Local SQLite indexes of blockchain operations, transactions and account histories.
+
+:class:`.OpIndex` stores operations (including virtual operations) streamed from a node in a SQLite database,
+indexed by account, operation type, block number, timestamp and transaction ID. Queries which would otherwise need
+many ``get_account_history`` / ``get_block`` round trips to a node are then answered locally in milliseconds.
+
+**Building the index**:
+
+    >>> from golos import Api
+    >>> from golos.index import OpIndex
+    >>> idx = OpIndex('ops.db')
+    >>> idx.sync(Api(), start=30000000, end=30100000)   # Resumes from the last indexed block when re-run
+
+**Querying it**:
+
+    >>> idx.get_account_history('someguy123', op_limit='transfer', age=30 * 24 * 60 * 60)
+    [{'from': 'someguy123', 'to': 'ksantoprotein', 'amount': '0.100 GOLOS', 'memo': 'testing', 'block': 30895436,
+      'timestamp': '2019-10-01T12:49:00', 'type_op': 'transfer', 'trx_id': 'c901c52daf57b60242d9d7be67f790e023cf2780',
+      ...}]
+    >>> idx.query(trx_id='c901c52daf57b60242d9d7be67f790e023cf2780')
+
+:class:`.TxIndex` similarly stores full transactions by transaction ID, and can be passed to
+:class:`golos.api.Api` as ``tx_index`` so transaction lookups don't need the node's ``operation_history`` plugin.
+:class:`.HistoryStore` keeps per-account history for :py:meth:`golos.api.Api.sync_histories`.
+
+Each block is written in a single SQLite transaction, together with the number of the last indexed block,
+so an index is always consistent and can double as its own checkpoint.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Union
+
+from golos.exceptions import UnsupportedOperation
+from golos.extras import dict_sort, op_accounts
+from golos.serializer import transaction_id
+from golos.timestamps import format_timestamp
+
+log = logging.getLogger(__name__)
+
+HISTORY_AGE = 7 * 24 * 60 * 60
+"""The default ``age`` of :py:meth:`golos.api.Api.get_account_history`, and its local equivalents (7 days)"""
+
+
+def _op_filter(op_limit: Union[list, str]) -> Optional[List[str]]:
+    if not op_limit or op_limit == 'all':
+        return None
+    return [op_limit] if isinstance(op_limit, str) else list(op_limit)
+
+
+def _history_cutoff(kwargs: dict) -> Optional[datetime]:
+    """The oldest timestamp a ``get_account_history`` call with ``kwargs`` returns, or ``None`` for no limit"""
+    age = kwargs.get('age', HISTORY_AGE)
+    return None if age is None else datetime.utcnow() - timedelta(seconds=age)
+
+
+OP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ops (
+    id INTEGER PRIMARY KEY,
+    block INTEGER NOT NULL,
+    trx_id TEXT NOT NULL,
+    trx_in_block INTEGER NOT NULL,
+    op_in_trx INTEGER NOT NULL,
+    virtual_op INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    type_op TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ops_block ON ops (block);
+CREATE INDEX IF NOT EXISTS ops_type_op ON ops (type_op, block);
+CREATE INDEX IF NOT EXISTS ops_timestamp ON ops (timestamp);
+CREATE INDEX IF NOT EXISTS ops_trx_id ON ops (trx_id);
+CREATE TABLE IF NOT EXISTS op_accounts (
+    account TEXT NOT NULL,
+    op_id INTEGER NOT NULL,
+    PRIMARY KEY (account, op_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS op_accounts_op_id ON op_accounts (op_id);
+"""
+
+TX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS txs (
+    trx_id TEXT PRIMARY KEY,
+    block INTEGER NOT NULL,
+    trx_in_block INTEGER NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS txs_block ON txs (block, trx_in_block);
+"""
+
+META_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+RANGES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS indexed_ranges (first INTEGER PRIMARY KEY, last INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS indexed_ranges_last ON indexed_ranges (last);
+"""
+
+CONTEXT_KEYS = ('trx_id', 'trx_in_block', 'op_in_trx', 'virtual_op')
+"""Keys added to operations returned by the index, which aren't part of the operation body"""
+
+
+class SqliteStore:
+    """
+    Base class for the SQLite backed stores, which manages the connection and lock, and stores integer settings in
+    the ``meta`` table. Sub-classes set :py:attr:`.SCHEMA`.
+
+    :param str path: The SQLite database file to use (Default: ``':memory:'`` - an in-memory database)
+    """
+    SCHEMA = ''
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.executescript(META_SCHEMA + self.SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _get_meta(self, key: str) -> Optional[int]:
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else int(row[0])
+
+    @staticmethod
+    def _set_meta(cur: sqlite3.Cursor, key: str, value: int):
+        cur.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+
+class SqliteIndex(SqliteStore):
+    """
+    Base class for the SQLite backed block indexes, which track the first and last blocks indexed in the ``meta``
+    table, and the exact (possibly non-contiguous) ranges of indexed blocks in ``indexed_ranges``. Sub-classes set
+    :py:attr:`.SCHEMA`.
+
+    :param str path: The SQLite database file to use (Default: ``':memory:'`` - an in-memory database)
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        super().__init__(path)
+        with self.conn:
+            self.conn.executescript(RANGES_SCHEMA)
+            first, last = self.first_block, self.last_block
+            if first is not None and last is not None and first <= last and \
+                    self.conn.execute('SELECT COUNT(*) FROM indexed_ranges').fetchone()[0] == 0:
+                # Indexes created before ranges were tracked were always indexed contiguously
+                self.conn.execute('INSERT INTO indexed_ranges (first, last) VALUES (?, ?)', (first, last))
+
+    @property
+    def first_block(self) -> Optional[int]:
+        """The number of the first block which was indexed, or ``None`` if the index is empty"""
+        return self._get_meta('first_block')
+
+    @property
+    def last_block(self) -> Optional[int]:
+        """The number of the last block which was fully indexed, or ``None`` if the index is empty"""
+        return self._get_meta('last_block')
+
+    def covers(self, block_num: int) -> bool:
+        """Returns ``True`` if block ``block_num`` has been indexed (and not since removed)"""
+        block_num = int(block_num)
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT 1 FROM indexed_ranges WHERE first <= ? AND last >= ?', (block_num, block_num)
+            ).fetchone()
+        return row is not None
+
+    def _mark_indexed(self, cur: sqlite3.Cursor, block_num: int):
+        """Record ``block_num`` as indexed - call within the block's write transaction"""
+        first, last = self.first_block, self.last_block
+        self._set_meta(cur, 'first_block', block_num if first is None else min(first, block_num))
+        self._set_meta(cur, 'last_block', block_num if last is None else max(last, block_num))
+        if cur.execute('SELECT 1 FROM indexed_ranges WHERE first <= ? AND last >= ?',
+                       (block_num, block_num)).fetchone():
+            return
+        # Merge with the ranges ending just before / starting just after the block, if any
+        before = cur.execute('SELECT first FROM indexed_ranges WHERE last = ?', (block_num - 1,)).fetchone()
+        after = cur.execute('SELECT last FROM indexed_ranges WHERE first = ?', (block_num + 1,)).fetchone()
+        first = block_num if before is None else before[0]
+        last = block_num if after is None else after[0]
+        cur.execute('DELETE FROM indexed_ranges WHERE first IN (?, ?)', (first, block_num + 1))
+        cur.execute('INSERT INTO indexed_ranges (first, last) VALUES (?, ?)', (first, last))
+
+    def _delete_blocks(self, cur: sqlite3.Cursor, first: int, last: int):
+        raise NotImplementedError
+
+    def remove_blocks(self, first: int, last: int = None):
+        """
+        Remove blocks ``first`` to ``last`` (default: just ``first``) from the index, e.g. when they were orphaned
+        by a fork. The blocks are no longer :py:meth:`.covers`'d, and the last indexed block is reset to ``first - 1``
+        if it was within the range.
+        """
+        last = first if last is None else last
+        with self.lock, self.conn:
+            cur = self.conn.cursor()
+            self._delete_blocks(cur, first, last)
+            if first <= (self.last_block or 0) <= last:
+                self._set_meta(cur, 'last_block', first - 1)
+            overlapping = cur.execute(
+                'SELECT first, last FROM indexed_ranges WHERE first <= ? AND last >= ?', (last, first)
+            ).fetchall()
+            for r_first, r_last in overlapping:
+                cur.execute('DELETE FROM indexed_ranges WHERE first = ?', (r_first,))
+                if r_first < first:
+                    cur.execute('INSERT INTO indexed_ranges (first, last) VALUES (?, ?)', (r_first, first - 1))
+                if r_last > last:
+                    cur.execute('INSERT INTO indexed_ranges (first, last) VALUES (?, ?)', (last + 1, r_last))
+
+
+class OpIndex(SqliteIndex):
+    """
+    A SQLite backed index of operations - see the module docstring of :py:mod:`golos.index`
+
+    :param str path: The SQLite database file to use (Default: ``':memory:'`` - an in-memory database)
+    """
+    SCHEMA = OP_SCHEMA
+
+    # ----- writing ----- #
+
+    @staticmethod
+    def _delete_blocks(cur: sqlite3.Cursor, first: int, last: int):
+        cur.execute(
+            'DELETE FROM op_accounts WHERE op_id IN (SELECT id FROM ops WHERE block BETWEEN ? AND ?)', (first, last)
+        )
+        cur.execute('DELETE FROM ops WHERE block BETWEEN ? AND ?', (first, last))
+
+    def add_block_ops(self, block_num: int, ops: Iterable[dict]):
+        """
+        Index the operations of block ``block_num``, replacing any which were previously indexed for that block -
+        so re-indexing a block (e.g. after a restart) never creates duplicates.
+
+        :param int block_num: The block number the operations belong to
+        :param ops: The operations as returned by ``get_ops_in_block``, i.e. ``dict(trx_id, block, trx_in_block,
+                    op_in_trx, virtual_op, timestamp, op=[type_op, body])``
+        """
+        with self.lock, self.conn:
+            cur = self.conn.cursor()
+            self._delete_blocks(cur, block_num, block_num)
+            for o in ops:
+                type_op, body = o['op']
+                cur.execute(
+                    'INSERT INTO ops (block, trx_id, trx_in_block, op_in_trx, virtual_op, timestamp, type_op, body) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (block_num, o['trx_id'], o['trx_in_block'], o['op_in_trx'], int(bool(o.get('virtual_op'))),
+                     o['timestamp'], type_op, json.dumps(body, ensure_ascii=False))
+                )
+                op_id = cur.lastrowid
+                cur.executemany(
+                    'INSERT OR IGNORE INTO op_accounts (account, op_id) VALUES (?, ?)',
+                    [(acc, op_id) for acc in op_accounts(body)]
+                )
+            self._mark_indexed(cur, block_num)
+
+    def sync(self, api, start: int = None, end: int = None, mode: str = 'irreversible', **kwargs) -> Optional[int]:
+        """
+        Index every block's operations from ``start`` (or the block after :py:attr:`.last_block`, if the index isn't
+        empty) until ``end`` - or forever, following the chain, if ``end`` is ``None``.
+
+        :param golos.api.Api api: The :class:`golos.api.Api` instance to load operations with
+        :param int start: The first block to index, if nothing has been indexed yet (Default: the current block)
+        :param int end: The last block to index (Default: ``None`` - keep following the chain)
+        :param str mode: ``'irreversible'`` (default) to only index irreversible blocks, or ``'head'``
+        :key int prefetch: The maximum number of requests in flight while catching up (Default: ``20``)
+        :key float poll_interval: Seconds to wait before checking for new blocks
+        :return int last_block: The last block number which was indexed
+        """
+        if self.last_block is not None:
+            start = self.last_block + 1
+        for num, ops in api._follow_chain('get_ops_in_block', lambda n: (str(n), False), start=start, end=end,
+                                          mode=mode, **kwargs):
+            self.add_block_ops(num, ops)
+        return self.last_block
+
+    # ----- querying ----- #
+
+    @staticmethod
+    def _row_to_op(row: sqlite3.Row) -> dict:
+        op = json.loads(row['body'])
+        op['block'] = row['block']
+        op['timestamp'] = row['timestamp']
+        op['type_op'] = row['type_op']
+        op['trx_id'] = row['trx_id']
+        op['trx_in_block'] = row['trx_in_block']
+        op['op_in_trx'] = row['op_in_trx']
+        op['virtual_op'] = row['virtual_op']
+        return op
+
+    def query(self, account: str = None, op_types: Union[List[str], str] = 'all', **kwargs) -> List[dict]:
+        """
+        Query the index, returning matching operations formatted like :py:meth:`golos.api.Api.get_account_history`
+        (plus ``trx_in_block``, ``op_in_trx`` and ``virtual_op``). All filters are optional and combined with AND.
+
+        :param str account: Only return operations which involve this account
+        :param list op_types: Only return operations of these types, as a list or a single string (``'all'``: any)
+        :key int start_block: Only return operations from this block number onwards
+        :key int end_block: Only return operations up to and including this block number
+        :key str since: Only return operations with a timestamp at or after this ``%Y-%m-%dT%H:%M:%S`` time
+        :key str until: Only return operations with a timestamp at or before this time
+        :key str trx_id: Only return operations from this transaction ID
+        :key int limit: Return at most this many operations (Default: ``None`` - no limit)
+        :key bool reverse: If ``True`` (default), return the newest operations first
+        :return List[dict] ops: The matching operations
+        """
+        where, params = [], []
+        joins = ''
+        if account is not None:
+            joins = ' JOIN op_accounts a ON a.op_id = ops.id'
+            where.append('a.account = ?')
+            params.append(account)
+        if op_types and op_types != 'all':
+            op_types = [op_types] if isinstance(op_types, str) else list(op_types)
+            where.append(f"ops.type_op IN ({', '.join('?' * len(op_types))})")
+            params += op_types
+        for key, clause in (('start_block', 'ops.block >= ?'), ('end_block', 'ops.block <= ?'),
+                            ('since', 'ops.timestamp >= ?'), ('until', 'ops.timestamp <= ?'),
+                            ('trx_id', 'ops.trx_id = ?')):
+            if kwargs.get(key) is not None:
+                where.append(clause)
+                params.append(kwargs[key])
+
+        order = 'DESC' if kwargs.get('reverse', True) else 'ASC'
+        sql = f'SELECT ops.* FROM ops{joins}'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += f' ORDER BY ops.id {order}'
+        if kwargs.get('limit') is not None:
+            sql += ' LIMIT ?'
+            params.append(int(kwargs['limit']))
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [self._row_to_op(r) for r in rows]
+
+    def get_account_history(self, account: str, op_limit: Union[list, str] = 'all', **kwargs) -> List[dict]:
+        """
+        A local equivalent of :py:meth:`golos.api.Api.get_account_history`, with the same arguments and results:
+        every matching operation newer than ``age`` - plus, like the node-backed version, the newest operation
+        just past the cutoff if it matches ``op_limit`` - returned newest first in the same format.
+
+        :param str account: The username to load account history for, e.g. ``'someguy123'``
+        :param list op_limit: Only return operations of these types, e.g. ``['transfer', 'vote']`` or ``'all'``
+        :key int start_limit: Only used for paging by the node-backed version - has no effect locally
+        :key int age: Skip history items older than this many seconds (Default: ``604800`` seconds / 7 days,
+                      ``None`` for no limit)
+        :return List[dict] history: A ``list`` of ``dict`` history ops
+        """
+        cutoff = _history_cutoff(kwargs)
+        if cutoff is None:
+            return self.query(account, op_types=op_limit)
+        ops = self.query(account, op_types=op_limit, since=format_timestamp(cutoff))
+        older = self.query(account, until=format_timestamp(cutoff - timedelta(seconds=1)), limit=1)
+        op_types = _op_filter(op_limit)
+        if older and (op_types is None or older[0]['type_op'] in op_types):
+            ops.append(older[0])
+        return ops
+
+    def find_op(self, op: dict, ignore_keys: list = None) -> Optional[dict]:
+        """
+        Find an operation in the index using the same matching rules as :py:meth:`golos.api.Api.find_op_transaction`
+        - ``op`` must contain ``block``, and its remaining operation keys must match exactly.
+
+        :param dict op: An operation as a ``dict``, containing the key ``block``, and any operation keys to match
+        :param list ignore_keys: (Optional) Additional dict keys to remove from ``op``
+        :return dict op: The indexed operation (including ``trx_id``), or ``None`` if it isn't in the index
+        """
+        if 'block' not in op:
+            raise AttributeError("Error: find_op requires that 'op' contains the key 'block'")
+        ignore_keys = list(ignore_keys or []) + ['number', 'block', 'timestamp', 'type_op'] + list(CONTEXT_KEYS)
+        clean = dict_sort({k: v for k, v in op.items() if k not in ignore_keys})
+        sql, params = 'SELECT * FROM ops WHERE block = ?', [int(op['block'])]
+        if 'type_op' in op:
+            sql += ' AND type_op = ?'
+            params.append(op['type_op'])
+        with self.lock:
+            rows = self.conn.execute(sql + ' ORDER BY id', params).fetchall()
+        for row in rows:
+            if dict_sort(json.loads(row['body'])) == clean:
+                return self._row_to_op(row)
+        return None
+
+
+def trx_ids_from_ops(ops: Iterable[dict]) -> List[str]:
+    """
+    Return the transaction IDs of a block in order of ``trx_in_block``, using the non-virtual operations returned
+    by ``get_ops_in_block`` - as GOLOS nodes don't include ``transaction_ids`` in blocks.
+    """
+    ids = {}
+    for o in ops:
+        if not o.get('virtual_op'):
+            ids[int(o['trx_in_block'])] = o['trx_id']
+    return [ids[i] for i in sorted(ids)]
+
+
+def block_trx_ids(block: dict) -> List[str]:
+    """
+    Return the transaction IDs of ``block`` in order - from ``transaction_ids`` if the node included them,
+    otherwise calculated locally with :func:`golos.serializer.transaction_id`.
+
+    :raises UnsupportedOperation: When a transaction contains an operation which can't be serialized locally
+    """
+    if block.get('transaction_ids') is not None:
+        return block['transaction_ids']
+    return [transaction_id(tx) for tx in block.get('transactions', [])]
+
+
+class TxIndex(SqliteIndex):
+    """
+    A SQLite backed index of full transactions, keyed by transaction ID, and by ``(block, trx_in_block)``.
+
+    When passed to :class:`golos.api.Api` as ``tx_index``, :py:meth:`golos.api.Api.get_transaction` and
+    :py:meth:`golos.api.Api.find_op_transaction` answer from the index whenever possible, without any network access.
+
+        >>> from golos import Api
+        >>> from golos.index import TxIndex
+        >>> txs = TxIndex('txs.db')
+        >>> txs.sync(Api(), start=30895000, end=30896000)
+        >>> golos = Api(tx_index=txs)
+        >>> golos.get_transaction('c901c52daf57b60242d9d7be67f790e023cf2780')
+
+    :param str path: The SQLite database file to use (Default: ``':memory:'`` - an in-memory database)
+    """
+    SCHEMA = TX_SCHEMA
+
+    @staticmethod
+    def _delete_blocks(cur: sqlite3.Cursor, first: int, last: int):
+        cur.execute('DELETE FROM txs WHERE block BETWEEN ? AND ?', (first, last))
+
+    def add_block(self, block_num: int, block: dict, trx_ids: List[str] = None):
+        """
+        Index the transactions of block ``block_num``, replacing any previously indexed for that block.
+
+        :param int block_num: The block number of ``block``
+        :param dict block: The block as returned by ``get_block``
+        :param list trx_ids: The transaction IDs of each transaction in the block, in order (Default: ``None`` -
+                             use :func:`.block_trx_ids`)
+        :raises UnsupportedOperation: When ``trx_ids`` is ``None``, and they can't be calculated locally
+        """
+        trx_ids = block_trx_ids(block) if trx_ids is None else trx_ids
+        txs = block.get('transactions', [])
+        if len(trx_ids) != len(txs):
+            raise ValueError(f'Block {block_num} has {len(txs)} transactions, but {len(trx_ids or [])} trx_ids')
+        with self.lock, self.conn:
+            cur = self.conn.cursor()
+            self._delete_blocks(cur, block_num, block_num)
+            cur.executemany(
+                'INSERT OR REPLACE INTO txs (trx_id, block, trx_in_block, body) VALUES (?, ?, ?, ?)',
+                [(txid, block_num, i, json.dumps(tx, ensure_ascii=False))
+                 for i, (txid, tx) in enumerate(zip(trx_ids, txs))]
+            )
+            self._mark_indexed(cur, block_num)
+
+    def sync(self, api, start: int = None, end: int = None, mode: str = 'irreversible', **kwargs) -> Optional[int]:
+        """
+        Index every block's transactions from ``start`` (or the block after :py:attr:`.last_block`, if the index
+        isn't empty) until ``end`` - or forever, following the chain, if ``end`` is ``None``.
+
+        Transaction IDs are calculated locally (see :func:`.block_trx_ids`), so only ``get_block`` is streamed -
+        ``get_ops_in_block`` is only called for blocks with operations which can't be serialized locally (including
+        unknown operations or static variant types).
+        Accepts the same arguments as :py:meth:`.OpIndex.sync`.
+
+        :return int last_block: The last block number which was indexed
+        """
+        if self.last_block is not None:
+            start = self.last_block + 1
+        for num, block in api._follow_chain('get_block', lambda n: (str(n),), start=start, end=end, mode=mode,
+                                            **kwargs):
+            try:
+                trx_ids = block_trx_ids(block)
+            except (UnsupportedOperation, ValueError, IndexError, KeyError) as e:
+                # e.g. an operation without a local schema, or a static variant type ID newer than our schemas
+                log.debug('Fetching trx_ids of block %d from the node: %s %s', num, type(e).__name__, e)
+                trx_ids = trx_ids_from_ops(api.rpc.call('get_ops_in_block', str(num), False))
+            self.add_block(num, block, trx_ids)
+        return self.last_block
+
+    @staticmethod
+    def _row_to_tx(row: sqlite3.Row) -> dict:
+        tx = json.loads(row['body'])
+        tx['block_num'] = row['block']
+        tx['transaction_id'] = row['trx_id']
+        tx['transaction_num'] = row['trx_in_block']
+        return tx
+
+    def get_transaction(self, trx_id: str) -> Optional[dict]:
+        """
+        Return the transaction ``trx_id`` in the same format as the ``get_transaction`` RPC call (the transaction
+        plus ``block_num``, ``transaction_id`` and ``transaction_num``), or ``None`` if it isn't in the index
+        """
+        with self.lock:
+            row = self.conn.execute('SELECT * FROM txs WHERE trx_id = ?', (trx_id,)).fetchone()
+        return None if row is None else self._row_to_tx(row)
+
+    def get_block_transactions(self, block_num: int) -> List[dict]:
+        """
+        Return the indexed transactions of block ``block_num`` in order, formatted like :py:meth:`.get_transaction`
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT * FROM txs WHERE block = ? ORDER BY trx_in_block', (int(block_num),)
+            ).fetchall()
+        return [self._row_to_tx(r) for r in rows]
+
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    account TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    block INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    type_op TEXT NOT NULL,
+    trx_id TEXT NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (account, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS history_type_op ON history (account, type_op, seq);
+"""
+
+
+class HistoryStore(SqliteStore):
+    """
+    A SQLite store of per-account history, as returned by :py:meth:`golos.api.Api.iter_account_history`, which
+    remembers the highest sequence number stored for each account - so :py:meth:`golos.api.Api.sync_account_history`
+    only has to download history items newer than the last sync.
+
+        >>> from golos import Api
+        >>> from golos.index import HistoryStore
+        >>> store = HistoryStore('history.db')
+        >>> Api().sync_histories(['someguy123', 'ksantoprotein'], store)
+        {'someguy123': 12345, 'ksantoprotein': 6789}
+        >>> store.get_account_history('someguy123', op_limit='transfer')
+
+    :param str path: The SQLite database file to use (Default: ``':memory:'`` - an in-memory database)
+    """
+    SCHEMA = HISTORY_SCHEMA
+
+    def last_seq(self, account: str) -> Optional[int]:
+        """Return the highest history sequence number stored for ``account``, or ``None`` if none are stored"""
+        with self.lock:
+            row = self.conn.execute('SELECT MAX(seq) FROM history WHERE account = ?', (account,)).fetchone()
+        return row[0]
+
+    def add(self, account: str, ops: Iterable[dict]):
+        """
+        Store history items for ``account`` in a single transaction. Each item must be formatted like the items
+        from :py:meth:`golos.api.Api.iter_account_history` (containing ``number``, ``block``, ``timestamp``,
+        ``type_op`` and ``trx_id``). Items which are already stored are replaced.
+        """
+        rows = [
+            (account, op['number'], op['block'], op['timestamp'], op['type_op'], op['trx_id'],
+             json.dumps(op, ensure_ascii=False)) for op in ops
+        ]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO history (account, seq, block, timestamp, type_op, trx_id, body) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', rows
+            )
+
+    def get_account_history(self, account: str, op_limit: Union[list, str] = 'all', **kwargs) -> List[dict]:
+        """
+        A local equivalent of :py:meth:`golos.api.Api.get_account_history` (like
+        :py:meth:`.OpIndex.get_account_history`), with the same arguments and results, returning stored history items
+        newest first.
+
+        :param str account: The username to load account history for, e.g. ``'someguy123'``
+        :param list op_limit: Only return operations of these types, e.g. ``['transfer', 'vote']`` or ``'all'``
+        :key int start_limit: Only used for paging by the node-backed version - has no effect locally
+        :key int age: Skip history items older than this many seconds (Default: ``604800`` seconds / 7 days,
+                      ``None`` for no limit)
+        :return List[dict] history: A ``list`` of ``dict`` history ops
+        """
+        cutoff = _history_cutoff(kwargs)
+        op_types = _op_filter(op_limit)
+        sql, params = 'SELECT type_op, body FROM history WHERE account = ?', [account]
+        if op_types is not None:
+            sql += f" AND type_op IN ({', '.join('?' * len(op_types))})"
+            params += op_types
+        if cutoff is not None:
+            sql += ' AND timestamp >= ?'
+            params.append(format_timestamp(cutoff))
+        with self.lock:
+            rows = self.conn.execute(sql + ' ORDER BY seq DESC', params).fetchall()
+            if cutoff is not None:
+                # The node-backed version also includes the newest item just past the cutoff, if it matches
+                older = self.conn.execute(
+                    'SELECT type_op, body FROM history WHERE account = ? AND timestamp < ? ORDER BY seq DESC LIMIT 1',
+                    (account, format_timestamp(cutoff))
+                ).fetchall()
+                rows += [r for r in older if op_types is None or r['type_op'] in op_types]
+        return [json.loads(r['body']) for r in rows]
@@ -3,10 +3,35 @@
 Contains the attribute :py:attr:`.type_op` which maps each transaction operation to a list of arguments and
 their types.
 
-Used by :py:meth:`golos.broadcast.Tx.get_digest` for generating a transaction digest.
+Used by :py:mod:`golos.serializer` (and so :py:meth:`golos.broadcast.Tx.get_digest`) for serializing transactions.
 
 """
 from .types import *
+from .storage import operations
+
+
+class Operation(BaseType):
+    """ An ``[op_name, op_dict]`` operation (``static_variant`` of every operation), e.g. within a proposal
+    """
+    def __init__(self, d):
+        self.name, self.data = d
+    
+    def write(self, buf: bytearray):
+        write_varint(buf, operations[self.name])
+        for key, type_value in type_op[self.name]:
+            type_value(self.data[key]).write(buf)
+    
+    def __str__(self):
+        return json.dumps([self.name, self.data])
+
+
+class OperationWrapper(Struct):
+    fields = [['op', Operation]]
+
+
+class OperationWrapperArray(ArrayOf):
+    type = OperationWrapper
+
 
 # Сериализатор
 # https://github.com/GolosChain/golos-js/blob/master/src/auth/serializer/src/operations.js
@@ -25,6 +50,16 @@ type_op = {
     
     "withdraw_vesting":               [['account', String], ['vesting_shares', Amount]],
     
+    "limit_order_create":             [['owner', String], ['orderid', Uint32], ['amount_to_sell', Amount],
+                                       ['min_to_receive', Amount], ['fill_or_kill', Bool],
+                                       ['expiration', PointInTime]],
+    
+    "limit_order_cancel":             [['owner', String], ['orderid', Uint32]],
+    
+    "feed_publish":                   [['publisher', String], ['exchange_rate', Price]],
+    
+    "convert":                        [['owner', String], ['requestid', Uint32], ['amount', Amount]],
+    
     "account_create":                 [['fee', Amount], ['creator', String], ['new_account_name', String],
                                        ['owner', Permission], ['active', Permission], ['posting', Permission],
                                        ['memo_key', PublicKey],
@@ -36,6 +71,22 @@ type_op = {
                                        ['posting', Optional_Permission], ['memo_key', PublicKey],
                                        ['json_metadata', String]],
     
+    "witness_update":                 [['owner', String], ['url', String], ['block_signing_key', PublicKey],
+                                       ['props', ChainProperties17], ['fee', Amount]],
+    
+    "account_witness_vote":           [['account', String], ['witness', String], ['approve', Bool]],
+    
+    "account_witness_proxy":          [['account', String], ['proxy', String]],
+    
+    "pow":                            [['worker_account', String], ['block_id', Ripemd160], ['nonce', Uint64],
+                                       ['work', Pow], ['props', ChainProperties17]],
+    
+    "custom":                         [['required_auths', ArrayString], ['id', Uint16], ['data', Bytes]],
+    
+    "report_over_production":         [['reporter', String], ['first_block', SignedBlockHeader],
+                                       ['second_block', SignedBlockHeader]],
+    
+    "delete_comment":                 [['author', String], ['permlink', String]],
     
     "custom_json":                    [['required_auths', ArrayString], ['required_posting_auths', ArrayString],
                                        ['id', String], ['json', String]],
@@ -46,9 +97,62 @@ type_op = {
                                        ['allow_curation_rewards', Bool],
                                        ['extensions', ExtensionsComment]],
     
+    "set_withdraw_vesting_route":     [['from_account', String], ['to_account', String], ['percent', Uint16],
+                                       ['auto_vest', Bool]],
+    
+    "limit_order_create2":            [['owner', String], ['orderid', Uint32], ['amount_to_sell', Amount],
+                                       ['exchange_rate', Price], ['fill_or_kill', Bool], ['expiration', PointInTime]],
+    
+    "challenge_authority":            [['challenger', String], ['challenged', String], ['require_owner', Bool]],
+    
+    "prove_authority":                [['challenged', String], ['require_owner', Bool]],
+    
+    "request_account_recovery":       [['recovery_account', String], ['account_to_recover', String],
+                                       ['new_owner_authority', Permission], ['extensions', Set]],
+    
+    "recover_account":                [['account_to_recover', String], ['new_owner_authority', Permission],
+                                       ['recent_owner_authority', Permission], ['extensions', Set]],
+    
     "change_recovery_account":        [['account_to_recover', String], ['new_recovery_account', String],
                                        ['extensions', Set]],
     
+    "escrow_transfer":                [['from', String], ['to', String], ['sbd_amount', Amount],
+                                       ['steem_amount', Amount], ['escrow_id', Uint32], ['agent', String],
+                                       ['fee', Amount], ['json_meta', String], ['ratification_deadline', PointInTime],
+                                       ['escrow_expiration', PointInTime]],
+    
+    "escrow_dispute":                 [['from', String], ['to', String], ['agent', String], ['who', String],
+                                       ['escrow_id', Uint32]],
+    
+    "escrow_release":                 [['from', String], ['to', String], ['agent', String], ['who', String],
+                                       ['receiver', String], ['escrow_id', Uint32], ['sbd_amount', Amount],
+                                       ['steem_amount', Amount]],
+    
+    "pow2":                           [['work', Pow2Work], ['new_owner_key', OptionalPublicKey],
+                                       ['props', ChainProperties17]],
+    
+    "escrow_approve":                 [['from', String], ['to', String], ['agent', String], ['who', String],
+                                       ['escrow_id', Uint32], ['approve', Bool]],
+    
+    "transfer_to_savings":            [['from', String], ['to', String], ['amount', Amount], ['memo', String]],
+    
+    "transfer_from_savings":          [['from', String], ['request_id', Uint32], ['to', String], ['amount', Amount],
+                                       ['memo', String]],
+    
+    "cancel_transfer_from_savings":   [['from', String], ['request_id', Uint32]],
+    
+    "custom_binary":                  [['required_owner_auths', ArrayString], ['required_active_auths', ArrayString],
+                                       ['required_posting_auths', ArrayString], ['required_auths', PermissionArray],
+                                       ['id', String], ['data', Bytes]],
+    
+    "decline_voting_rights":          [['account', String], ['decline', Bool]],
+    
+    "reset_account":                  [['reset_account', String], ['account_to_reset', String],
+                                       ['new_owner_authority', Permission]],
+    
+    "set_reset_account":              [['account', String], ['current_reset_account', String],
+                                       ['reset_account', String]],
+    
     "delegate_vesting_shares":        [['delegator', String], ['delegatee', String], ['vesting_shares', Amount]],
     
     "account_create_with_delegation": [['fee', Amount], ['delegation', Amount], ['creator', String],
@@ -59,14 +163,85 @@ type_op = {
     
     "account_metadata":               [['account', String], ['json_metadata', String]],
     
+    "proposal_create":                [['author', String], ['title', String], ['memo', String],
+                                       ['expiration_time', PointInTime], ['proposed_operations', OperationWrapperArray],
+                                       ['review_period_time', OptionalPointInTime], ['extensions', Set]],
+    
+    "proposal_update":                [['author', String], ['title', String],
+                                       ['active_approvals_to_add', ArrayString],
+                                       ['active_approvals_to_remove', ArrayString],
+                                       ['owner_approvals_to_add', ArrayString],
+                                       ['owner_approvals_to_remove', ArrayString],
+                                       ['posting_approvals_to_add', ArrayString],
+                                       ['posting_approvals_to_remove', ArrayString],
+                                       ['key_approvals_to_add', PublicKeySet],
+                                       ['key_approvals_to_remove', PublicKeySet],
+                                       ['extensions', Set]],
+    
+    "proposal_delete":                [['author', String], ['title', String], ['requester', String],
+                                       ['extensions', Set]],
+    
+    "chain_properties_update":        [['owner', String], ['props', ChainPropertiesVariant]],
+    
+    "break_free_referral":            [['referral', String], ['extensions', Set]],
+    
     "delegate_vesting_shares_with_interest":
                                       [['delegator', String], ['delegatee', String], ['vesting_shares', Amount],
                                        ['interest_rate', Uint16], ['extensions', Set]],
     
+    "reject_vesting_shares_delegation":
+                                      [['delegator', String], ['delegatee', String], ['extensions', Set]],
+    
+    # ----- Virtual operations (only produced by the blockchain, so only needed for decoding) ----- #
+    
+    "fill_convert_request":           [['owner', String], ['requestid', Uint32], ['amount_in', Amount],
+                                       ['amount_out', Amount]],
+    
+    "author_reward":                  [['author', String], ['permlink', String], ['sbd_payout', Amount],
+                                       ['steem_payout', Amount], ['vesting_payout', Amount]],
+    
+    "curation_reward":                [['curator', String], ['reward', Amount], ['comment_author', String],
+                                       ['comment_permlink', String]],
+    
+    "comment_reward":                 [['author', String], ['permlink', String], ['payout', Amount]],
+    
+    "liquidity_reward":               [['owner', String], ['payout', Amount]],
+    
+    "interest":                       [['owner', String], ['interest', Amount]],
+    
+    "fill_vesting_withdraw":          [['from_account', String], ['to_account', String], ['withdrawn', Amount],
+                                       ['deposited', Amount]],
+    
+    "fill_order":                     [['current_owner', String], ['current_orderid', Uint32],
+                                       ['current_pays', Amount], ['open_owner', String], ['open_orderid', Uint32],
+                                       ['open_pays', Amount]],
+    
+    "shutdown_witness":               [['owner', String]],
+    
+    "fill_transfer_from_savings":     [['from', String], ['to', String], ['amount', Amount], ['request_id', Uint32],
+                                       ['memo', String]],
+    
+    "hardfork":                       [['hardfork_id', Uint32]],
+    
+    "comment_payout_update":          [['author', String], ['permlink', String]],
+    
+    "comment_benefactor_reward":      [['benefactor', String], ['author', String], ['permlink', String],
+                                       ['reward', Amount]],
+    
+    "return_vesting_delegation":      [['account', String], ['vesting_shares', Amount]],
+    
+    "producer_reward":                [['producer', String], ['vesting_shares', Amount]],
+    
+    "delegation_reward":              [['delegator', String], ['delegatee', String],
+                                       ['payout_strategy', DelegatorPayoutStrategy], ['vesting_shares', Amount]],
+    
+    "auction_window_reward":          [['reward', Amount], ['comment_author', String], ['comment_permlink', String]],
+    
 }
 """
 A dictionary which maps each GOLOS operation such as ``vote`` - to a list of argument pairs (``['arg_name', String]``)
-which map each argument of the operation to it's type in :py:mod:`.types` 
+which map each argument of the operation to it's type in :py:mod:`.types`. Every operation in
+:py:attr:`golos.storage.op_names` is defined, including virtual operations (for decoding).
 
 Example:
 
@@ -77,14 +252,3 @@ Example:
 	]
 
 """
-
-# "withdraw_vesting":				[['account', String], ['vesting_shares', Amount]],
-# "set_withdraw_vesting_route":	[['from_account', String], ['to_account', String], ['percent', Uint16], ['auto_vest', Bool]],
-#
-# "account_witness_proxy":		[['account', String], ['proxy', String]],
-# "account_witness_vote":			[['account', String], ['witness', String], ['approve', Bool]],
-# "account_update":				[['account', String], ['master', Optional_Permission], ['active', Optional_Permission],
-# 								['regular', Optional_Permission], ['memo_key', PublicKey], ['json_metadata', String]],
-#
-# "custom":	 					[['required_active_auths', ArrayString], ['required_regular_auths', ArrayString],
-# 								['id', String], ['json', String]],
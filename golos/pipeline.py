@@ -0,0 +1,77 @@
+"""
+Multi-process block ingestion.
+
+Decoding the JSON of full blocks and processing their operations is CPU-bound, so a single Python process can't
+keep up with a fast node while catching up on history. :func:`.ingest_blocks` fetches raw (undecoded) block
+responses over a pipelined connection in the main process, fans them out in batches to a pool of worker
+processes which decode each block and run a user-supplied function on it, then yields the results in block order.
+
+**Basic Usage**:
+
+    >>> from golos import Api
+    >>>
+    >>> def count_transfers(block: dict):
+    ...     # Must be a module level function, so it can be sent to the worker processes
+    ...     ops = [op for tx in block['transactions'] for op in tx['operations']]
+    ...     return block['block_num'], sum(1 for op in ops if op[0] == 'transfer')
+    >>>
+    >>> for num, transfers in Api().ingest_blocks(30000000, 30100000, count_transfers, workers=8):
+    ...     print(num, transfers)
+
+"""
+import logging
+import os
+from itertools import islice
+from typing import Callable, Iterator, List, Tuple
+
+from golos.exceptions import GolosException
+from golos.extras import ordered_parallel
+from golos.ws_client import WsClient, decode_response
+
+log = logging.getLogger(__name__)
+
+
+def _process_batch(job: Tuple[Callable, List[Tuple[int, str]]]) -> list:
+    """Worker side of :func:`.ingest_blocks` - decode each raw block response in a batch and run ``func`` on it"""
+    func, batch = job
+    results = []
+    for num, raw in batch:
+        block = decode_response(raw)
+        if block is None:
+            raise GolosException(f'Block {num} does not exist (yet) on this node')
+        block['block_num'] = num
+        results.append(func(block))
+    return results
+
+
+def _batches(rpc: WsClient, func: Callable, start: int, end: int, prefetch: int, batch_size: int):
+    nums = range(start, end + 1)
+    raw = zip(nums, rpc.call_stream((('get_block', (str(n),)) for n in nums), window=prefetch, raw=True))
+    while True:
+        batch = list(islice(raw, batch_size))
+        if not batch:
+            return
+        yield func, batch
+
+
+def ingest_blocks(rpc: WsClient, start: int, end: int, func: Callable, workers: int = None, prefetch: int = 100,
+                  batch_size: int = 10, window: int = None) -> Iterator:
+    """
+    Fetch blocks ``start`` to ``end`` (inclusive) using ``rpc``, run ``func(block)`` on each block in a pool of
+    ``workers`` processes, and yield the return values in block order.
+
+    :param WsClient rpc: The :class:`.WsClient` to fetch blocks with - preferably a dedicated connection
+    :param int start: The first block number to ingest
+    :param int end: The last block number to ingest
+    :param callable func: A picklable (module level) function, which is passed each decoded block ``dict``, with
+                          the block number set as ``block_num``. Its return value must also be picklable.
+    :param int workers: The number of worker processes (default: the number of CPUs)
+    :param int prefetch: The maximum number of block requests to have in flight
+    :param int batch_size: The number of blocks sent to a worker at a time - larger batches reduce IPC overhead
+    :param int window: The maximum number of batches queued or being processed (default: ``workers * 2``)
+    :return Iterator results: The results of ``func`` for each block, in block order
+    """
+    workers = (os.cpu_count() or 1) if workers is None else int(workers)
+    jobs = _batches(rpc, func, int(start), int(end), prefetch, batch_size)
+    for results in ordered_parallel(_process_batch, jobs, workers=workers, window=window, processes=True):
+        yield from results
@@ -0,0 +1,194 @@
+"""
+Recording and replay transports for :class:`golos.ws_client.WsClient`.
+
+These classes implement the small subset of the :class:`websocket.WebSocket` interface which is used by
+:class:`.WsClient` (``connect``, ``send``, ``recv`` and ``close``), allowing traffic to be captured from a real
+GOLOS node, and later served back offline - making benchmarks and tests of :class:`golos.api.Api` deterministic.
+
+**Recording traffic from a live node**:
+
+    >>> from golos import Api
+    >>> golos = Api(nodes='wss://golosd.privex.io', record_to='traffic.jsonl')
+    >>> acc = golos.get_accounts(['someguy123'])
+
+**Replaying the recorded traffic (no network required)**:
+
+    >>> golos = Api(replay_from='traffic.jsonl')
+    >>> acc = golos.get_accounts(['someguy123'])
+
+Each line of a recording is a JSON object in the form::
+
+    {"request": [api, method, params], "response": {...}, "latency": 0.0312}
+
+"""
+import json
+import logging
+import time
+from collections import deque
+from typing import Union, List, Iterable, Optional, Dict
+
+log = logging.getLogger(__name__)
+
+
+def request_key(request: Union[list, tuple]) -> str:
+    """
+    Generate a stable lookup key from a ``[api, method, params]`` request, used to match replayed requests
+    against recorded ones.
+
+        >>> request_key(['database_api', 'get_block', ['123']])
+        '["database_api", "get_block", ["123"]]'
+
+    """
+    return json.dumps(list(request), sort_keys=True, ensure_ascii=False)
+
+
+def load_records(source: Union[str, Iterable[dict]]) -> List[dict]:
+    """
+    Load a list of recorded request/response pairs, either from a JSON-lines file path, or from an iterable
+    of record ``dict``'s.
+    """
+    if not isinstance(source, str):
+        return [dict(r) for r in source]
+
+    records = []
+    with open(source, 'r', encoding='utf8') as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return records
+
+
+class RecordingWebSocket:
+    """
+    Wraps a connected :class:`websocket.WebSocket` and appends every request/response pair sent through it to the
+    JSON-lines file ``path``, along with the round-trip latency of each call.
+
+    Requests are matched to responses in the order they were sent, so pipelined calls are recorded correctly.
+    """
+    def __init__(self, ws, path: str):
+        self.ws = ws
+        self.path = path
+        self.pending = deque()
+        self._fh = open(path, 'a', encoding='utf8')
+
+    def connect(self, url, **kwargs):
+        return self.ws.connect(url, **kwargs)
+
+    def send(self, body: Union[str, bytes]):
+        req = json.loads(body)
+        self.pending.append((req.get('params'), time.time()))
+        return self.ws.send(body)
+
+    def recv(self) -> str:
+        response = self.ws.recv()
+        if self.pending:
+            params, started = self.pending.popleft()
+            resp = json.loads(response)
+            resp.pop('id', None)
+            rec = dict(request=params, response=resp, latency=round(time.time() - started, 6))
+            self._fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            self._fh.flush()
+        return response
+
+    def close(self):
+        if not self._fh.closed:
+            self._fh.close()
+        return self.ws.close()
+
+
+class ReplayRecording:
+    """
+    The parsed request/response pairs of a recording, along with the position reached in each request's list of
+    recorded responses.
+
+    A single :class:`.ReplayRecording` is shared by every :class:`.ReplayWebSocket` created by a :class:`.WsClient`,
+    so the recording is only loaded once, and reconnecting continues the replay where it left off, rather than
+    serving the same responses again.
+    """
+    def __init__(self, source: Union[str, Iterable[dict]]):
+        self.records: Dict[str, List[dict]] = {}
+        self.cursors: Dict[str, int] = {}
+
+        for rec in load_records(source):
+            self.records.setdefault(request_key(rec['request']), []).append(rec)
+
+    def lookup(self, params) -> Optional[dict]:
+        """
+        Return the next recorded response for the ``[api, method, params]`` request ``params``, wrapping around once
+        exhausted, or ``None`` if the request was never recorded.
+        """
+        key = request_key(params)
+        recs = self.records.get(key)
+        if not recs:
+            return None
+        pos = self.cursors.get(key, 0)
+        self.cursors[key] = pos + 1
+        return recs[pos % len(recs)]
+
+
+class ReplayWebSocket:
+    """
+    A fake websocket which serves back responses previously captured by :class:`.RecordingWebSocket`.
+
+    ``source`` may be a recording file path, an iterable of record ``dict``'s, or a :class:`.ReplayRecording` - pass the
+    same :class:`.ReplayRecording` to each new connection to share the loaded records and response positions.
+
+    Requests are matched by their ``[api, method, params]`` - if the same request was recorded multiple times, the
+    recorded responses are returned in order, wrapping around once exhausted, so replays are fully deterministic.
+
+    Requests which were never recorded receive a Graphene style JSON error, which :class:`.WsClient` raises as a
+    :class:`golos.exceptions.GolosException`.
+
+    **Latency simulation** (``latency`` param):
+
+     - ``None`` - (default) respond immediately
+     - ``'recorded'`` - sleep for the latency that was recorded alongside each response
+     - ``float`` / ``int`` - sleep for this many seconds before every response
+
+    """
+    def __init__(self, source: Union[str, Iterable[dict], ReplayRecording], latency: Union[str, float, int] = None):
+        self.latency = latency
+        self.recording = source if isinstance(source, ReplayRecording) else ReplayRecording(source)
+        self.pending = deque()
+        self.connected = False
+
+    @property
+    def records(self) -> Dict[str, List[dict]]:
+        return self.recording.records
+
+    @property
+    def cursors(self) -> Dict[str, int]:
+        return self.recording.cursors
+
+    def connect(self, url=None, **kwargs):
+        self.connected = True
+        return True
+
+    def send(self, body: Union[str, bytes]):
+        req = json.loads(body)
+        params = req.get('params', [])
+        rec = self.recording.lookup(params)
+        if rec is None:
+            method = params[1] if len(params) > 1 else 'unknown'
+            log.debug('No recorded response for request %s', params)
+            rec = dict(
+                response=dict(error=dict(
+                    code=-32000, message='No recorded response for method ${method}', data=dict(method=method)
+                )),
+                latency=0
+            )
+        self.pending.append((req.get('id'), rec))
+
+    def recv(self) -> str:
+        req_id, rec = self.pending.popleft()
+        if self.latency == 'recorded':
+            time.sleep(float(rec.get('latency', 0)))
+        elif self.latency:
+            time.sleep(float(self.latency))
+        resp = dict(rec['response'])
+        resp['id'] = req_id
+        return json.dumps(resp, ensure_ascii=False)
+
+    def close(self):
+        self.connected = False
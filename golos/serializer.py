@@ -0,0 +1,219 @@
+"""
+Local binary serialization of GOLOS transactions, using the types in :py:mod:`.types` and the operation
+definitions in :py:attr:`golos.operations.type_op`.
+
+An unsigned transaction (``include_signatures=False``) serializes to the same bytes as a node's
+``get_transaction_hex`` call, so transaction IDs and signing digests can be calculated without a round trip to a node.
+
+**Basic Usage**:
+
+    >>> from golos.serializer import transaction_id, serialize_transaction
+    >>> tx = {
+    ...     'ref_block_num': 27979, 'ref_block_prefix': 3018856747, 'expiration': '2019-10-01T12:50:00',
+    ...     'operations': [
+    ...         ['transfer', {'from': 'someguy123', 'to': 'ksantoprotein', 'amount': '0.100 GOLOS', 'memo': 'testing'}]
+    ...     ],
+    ...     'extensions': [], 'signatures': []
+    ... }
+    >>> transaction_id(tx)
+    'c901c52daf57b60242d9d7be67f790e023cf2780'
+    >>> serialize_transaction(tx, include_signatures=False).hex()
+    '4b6d2b19f0b3784b935d01020a736f6d656775793132330d6b73616e746f70726f7465696e640000000000000003474f4c4f5300000774657374696e6700'
+
+Each operation type's schema in :py:attr:`golos.operations.type_op` is compiled on first use into a specialized
+writer (see :func:`.compile_operation`), which packs runs of fixed size fields with a single precomputed
+:class:`struct.Struct`, and encodes strings and amounts without creating a :py:mod:`.types` object per field.
+A whole transaction is written into one ``bytearray`` (see :func:`.write_transaction`), which is copied to
+``bytes`` once at the end.
+
+"""
+import hashlib
+import logging
+import struct
+from binascii import unhexlify
+from typing import Callable, Dict, List
+
+from golos.chain import block_header_bytes
+from golos.exceptions import UnsupportedOperation
+from golos.operations import type_op
+from golos.storage import chain_id, operations
+from golos.timestamps import timestamp_to_epoch
+from golos.types import Amount, Bool, Int16, Int64, PointInTime, String, Uint8, Uint16, Uint32, Uint64, asset_info, \
+    parse_amount, unicodify, varint, write_varint
+
+log = logging.getLogger(__name__)
+
+FIXED_FORMATS = {
+    Uint8: ('B', None), Bool: ('B', None), Int16: ('h', int), Uint16: ('H', int), Uint32: ('I', int),
+    Uint64: ('Q', int), Int64: ('q', None), PointInTime: ('I', timestamp_to_epoch),
+}
+"""Maps fixed size :py:mod:`.types` classes to their :py:mod:`struct` format, and the conversion their class applies"""
+
+_TX_HEADER = struct.Struct('<HII')
+
+OpWriter = Callable[[bytearray, dict], None]
+
+_compiled: Dict[str, OpWriter] = {}
+
+
+def _write_string(buf: bytearray, value: str):
+    """Equivalent to ``String(value).write(buf)``, without creating a :class:`golos.types.String`"""
+    d = unicodify(value)
+    write_varint(buf, len(d))
+    buf += d
+
+
+def _amount_values(value: str) -> tuple:
+    """The :py:mod:`struct` values (``<qb7s``) which ``Amount(value).write(buf)`` would pack"""
+    satoshis, precision, asset = parse_amount(value)
+    return satoshis, precision, asset_info(asset)[2]
+
+
+def _fixed_field(key: str, type_value: type):
+    if type_value is Amount:
+        return 'qb7s', lambda data: _amount_values(data[key])
+    fmt, conv = FIXED_FORMATS[type_value]
+    if conv is None:
+        return fmt, lambda data: (data[key],)
+    return fmt, lambda data: (conv(data[key]),)
+
+
+def _fixed_part(fields: List[tuple]) -> OpWriter:
+    """Pack a run of consecutive fixed size fields with a single :class:`struct.Struct`"""
+    packed = [_fixed_field(key, type_value) for key, type_value in fields]
+    pack = struct.Struct('<' + ''.join(fmt for fmt, _ in packed)).pack
+    if len(packed) == 1:
+        values = packed[0][1]
+
+        def _write(buf: bytearray, data: dict):
+            buf += pack(*values(data))
+        return _write
+    getters = [get for _, get in packed]
+
+    def _write_many(buf: bytearray, data: dict):
+        buf += pack(*[v for get in getters for v in get(data)])
+    return _write_many
+
+
+def _variable_part(key: str, type_value: type) -> OpWriter:
+    if type_value is String:
+        return lambda buf, data: _write_string(buf, data[key])
+    return lambda buf, data: type_value(data[key]).write(buf)
+
+
+def compile_operation(name: str) -> OpWriter:
+    """
+    Return a function ``write(buf, data)`` which appends the serialized ``dict`` body ``data`` of operation type
+    ``name``, prefixed with the operation's type ID, to the ``bytearray`` ``buf``. Compiled writers are cached, so
+    each schema is only compiled once.
+
+        >>> buf = bytearray()
+        >>> compile_operation('vote')(buf, {'voter': 'a', 'author': 'b', 'permlink': 'c', 'weight': 10000})
+        >>> buf.hex()
+        '000161016201631027'
+
+    :raises UnsupportedOperation: When the operation type isn't defined in :py:attr:`golos.operations.type_op`
+    """
+    func = _compiled.get(name)
+    if func is not None:
+        return func
+    if name not in type_op:
+        raise UnsupportedOperation(f"Cannot serialize unsupported operation type '{name}'")
+    prefix = varint(operations[name])
+    parts, fixed = [], []
+    for key, type_value in type_op[name]:
+        if type_value is Amount or type_value in FIXED_FORMATS:
+            fixed.append((key, type_value))
+            continue
+        if fixed:
+            parts.append(_fixed_part(fixed))
+            fixed = []
+        parts.append(_variable_part(key, type_value))
+    if fixed:
+        parts.append(_fixed_part(fixed))
+
+    def write(buf: bytearray, data: dict):
+        buf += prefix
+        for part in parts:
+            part(buf, data)
+
+    log.debug('Compiled serializer for operation %s', name)
+    _compiled[name] = write
+    return write
+
+
+def serialize_operation(op: list, compiled: bool = True) -> bytes:
+    """
+    Serialize a single ``[op_name, op_dict]`` operation, prefixed with its operation type ID.
+
+    :param list op: The operation to serialize
+    :param bool compiled: If ``False``, serialize each field by creating its :py:mod:`.types` object, rather than
+                          using the cached :func:`.compile_operation` writer (only useful for benchmarking)
+    :raises UnsupportedOperation: When the operation type isn't defined in :py:attr:`golos.operations.type_op`
+    """
+    name, data = op
+    buf = bytearray()
+    if compiled:
+        compile_operation(name)(buf, data)
+        return bytes(buf)
+    if name not in type_op:
+        raise UnsupportedOperation(f"Cannot serialize unsupported operation type '{name}'")
+    write_varint(buf, operations[name])
+    for key, type_value in type_op[name]:
+        type_value(data[key]).write(buf)
+    return bytes(buf)
+
+
+def write_transaction(buf: bytearray, tx: dict, include_signatures: bool = True):
+    """Append the serialized transaction ``tx`` to ``buf`` - see :func:`.serialize_transaction`"""
+    buf += _TX_HEADER.pack(tx["ref_block_num"], tx["ref_block_prefix"], timestamp_to_epoch(tx["expiration"]))
+    write_varint(buf, len(tx["operations"]))
+    for name, data in tx["operations"]:
+        compile_operation(name)(buf, data)
+    # Transaction extensions are a set of void static variants, which only serialize their type ID
+    extensions = tx.get("extensions", [])
+    write_varint(buf, len(extensions))
+    for e in extensions:
+        write_varint(buf, int(e[0]))
+    if include_signatures:
+        sigs = tx.get("signatures", [])
+        write_varint(buf, len(sigs))
+        for sig in sigs:
+            buf += unhexlify(sig)
+
+
+def serialize_transaction(tx: dict, include_signatures: bool = True) -> bytes:
+    """
+    Serialize the ``dict`` transaction ``tx`` into its binary form.
+
+    :param dict tx: A transaction in the form ``dict(ref_block_num, ref_block_prefix, expiration, operations,
+                    extensions, signatures)``
+    :param bool include_signatures: If ``False``, only serialize the unsigned transaction (as used for the
+                                    transaction ID and signing digest)
+    :raises UnsupportedOperation: When the transaction contains an operation which can't be serialized locally
+    :return bytes data: The serialized transaction
+    """
+    buf = bytearray()
+    write_transaction(buf, tx, include_signatures)
+    return bytes(buf)
+
+
+def serialize_block(block: dict) -> bytes:
+    """Serialize the ``dict`` block ``block`` (as returned by ``get_block``), including its transactions"""
+    buf = bytearray(block_header_bytes(block))
+    write_varint(buf, len(block['transactions']))
+    for tx in block['transactions']:
+        write_transaction(buf, tx)
+    return bytes(buf)
+
+
+def transaction_id(tx: dict) -> str:
+    """Calculate the transaction ID of ``tx`` - the first 20 bytes of the SHA256 hash of the unsigned transaction"""
+    return hashlib.sha256(serialize_transaction(tx, include_signatures=False)).hexdigest()[:40]
+
+
+def transaction_digest(tx: dict, chain: str = chain_id) -> bytes:
+    """Calculate the digest of ``tx`` which is signed by each key - the SHA256 hash of the chain ID + unsigned tx"""
+    buf = bytearray(unhexlify(chain))
+    write_transaction(buf, tx, include_signatures=False)
+    return hashlib.sha256(buf).digest()
@@ -26,6 +26,9 @@ time_format_utc = '%Y-%m-%dT%H:%M:%S%Z'
 expiration = 60
 """The integer expiration time (in seconds) to place inside of newly built transactions"""
 
+block_interval = 3
+"""The number of seconds between each block on the network, used for pacing block / operation streams"""
+
 # https://ropox.app/steemjs/api/database_api/get_chain_properties
 # create_account_min_golos_fee = 0.030			# GOLOS
 # create_account_max_delegation = 33333.333333	# GEST
@@ -229,6 +232,9 @@ op_names = [
 ]
 """A list of known transaction operation names"""
 
+virtual_op_names = op_names[op_names.index('fill_convert_request'):]
+"""A list of virtual operation names - operations generated by the blockchain itself, rather than by transactions"""
+
 #: assign operation ids
 operations = dict(zip(op_names, range(len(op_names))))
 """Map operations names from :py:attr:`.op_names` to their operation ID"""
@@ -0,0 +1,63 @@
+"""
+Fast parsing and formatting of the ISO timestamps used by GOLOS (:py:attr:`golos.storage.time_format`, e.g.
+``2019-10-01T12:50:00``, always UTC).
+
+``datetime.strptime`` / ``time.strptime`` are slow, and are called for every timestamp field when serializing
+transactions or enriching accounts and operations. These functions parse the fixed format with a single regex
+match, and keep a small cache, as the same timestamps (e.g. the ``timestamp`` of every operation in a block) repeat
+heavily.
+
+**Basic Usage**:
+
+    >>> from golos.timestamps import parse_timestamp, format_timestamp, timestamp_to_epoch
+    >>> parse_timestamp('2019-10-01T12:50:00')
+    datetime.datetime(2019, 10, 1, 12, 50)
+    >>> timestamp_to_epoch('2019-10-01T12:50:00')
+    1569934200
+    >>> format_timestamp(parse_timestamp('2019-10-01T12:50:00'))
+    '2019-10-01T12:50:00'
+
+"""
+import functools
+import re
+from datetime import datetime, timedelta
+
+from golos.storage import time_format
+
+EPOCH = datetime(1970, 1, 1)
+
+CACHE_SIZE = 4096
+"""The number of recently parsed / formatted timestamps to cache"""
+
+_TIMESTAMP = re.compile(r'(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)', re.ASCII)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse_timestamp(value: str) -> datetime:
+    """
+    Parse a ``YYYY-MM-DDTHH:MM:SS`` timestamp into a naive (UTC) ``datetime`` - the same result as
+    ``datetime.strptime(value, time_format)``.
+
+    :raises ValueError: When ``value`` isn't a valid timestamp
+    """
+    m = _TIMESTAMP.fullmatch(value)
+    if m is not None:
+        return datetime(*map(int, m.groups()))
+    return datetime.strptime(value, time_format)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def timestamp_to_epoch(value: str) -> int:
+    """Convert a timestamp into seconds since the unix epoch (as serialized by :class:`golos.types.PointInTime`)"""
+    return (parse_timestamp(value) - EPOCH) // timedelta(seconds=1)
+
+
+def format_timestamp(dt: datetime) -> str:
+    """Format a ``datetime`` as a timestamp - the same result as ``dt.strftime(time_format)``"""
+    return '%04d-%02d-%02dT%02d:%02d:%02d' % (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def epoch_to_timestamp(secs: int) -> str:
+    """Convert seconds since the unix epoch into a timestamp - the inverse of :func:`.timestamp_to_epoch`"""
+    return format_timestamp(EPOCH + timedelta(seconds=secs))
@@ -1,15 +1,29 @@
 """
 Contains various GOLOS type classes which are used within :py:mod:`.operations` for specifying operation arguments and
 their types.
+
+Each type serializes itself by appending to a shared ``bytearray`` with ``write(buf)``, so nested types (e.g. the
+accounts and keys of a :class:`.Permission`) and whole transactions are built in one buffer, with a single final
+``bytes()`` copy - rather than by repeated ``bytes`` concatenation, which is quadratic for large operations.
+
+    >>> buf = bytearray()
+    >>> String('someguy123').write(buf)
+    >>> Uint16(10000).write(buf)
+    >>> bytes(buf) == bytes(String('someguy123')) + bytes(Uint16(10000))
+    True
+
 """
+import functools
 import json
+import re
 import struct
-import time
 from binascii import hexlify, unhexlify
-from calendar import timegm
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Tuple
 
 from .storage import asset_precision, prefix
 from .base58 import Base58
+from .timestamps import timestamp_to_epoch
 from pprint import pprint
 
 
@@ -37,16 +51,62 @@ object_type = {
 
 timeformat = '%Y-%m-%dT%H:%M:%S%Z'
 
+UNICODIFY_TABLE = {o: "u%04x" % o for o in range(32) if o not in (8, 9, 10, 12, 13)}
+UNICODIFY_TABLE.update({8: "b", 12: "f"})
+"""The ``str.translate`` table of :py:func:`.unicodify` - control characters other than tab, newline and carriage
+return are replaced (without a leading backslash, matching the original golos-js serializer)"""
 
-def varint(n):	#ok
-    """ Varint encoding
+_CONTROL_BYTES = bytes(UNICODIFY_TABLE)
+_ESCAPED_BYTES = re.compile(b'[' + re.escape(_CONTROL_BYTES) + b']')
+_ESCAPES = {bytes((o,)): r.encode('ascii') for o, r in UNICODIFY_TABLE.items()}
+
+
+def _escape(m) -> bytes:
+    return _ESCAPES[m.group()]
+
+
+def unicodify(value: str) -> bytes:
+    """ UTF-8 encode ``value``, rewriting control characters using :py:attr:`.UNICODIFY_TABLE`.
+    
+    UTF-8 never uses bytes below ``0x80`` within multi-byte characters, so the table is applied to the encoded bytes.
+    Strings without control characters (nearly all of them) are only scanned once, by ``bytes.translate``.
+    
+        >>> unicodify('a\x00b\tc')
+        b'au0000b\tc'
+    
+    """
+    d = value.encode('utf-8')
+    if len(d.translate(None, _CONTROL_BYTES)) != len(d):
+        d = _ESCAPED_BYTES.sub(_escape, d)
+    return d
+
+
+def write_varint(buf: bytearray, n: int):
+    """ Varint encoding, appended to ``buf``
     """
-    data = b''
     while n >= 0x80:
-        data += bytes([(n & 0x7f) | 0x80])
+        buf.append((n & 0x7f) | 0x80)
         n >>= 7
-    data += bytes([n])
-    return data
+    buf.append(n)
+
+
+def varint(n):	#ok
+    """ Varint encoding
+    """
+    if n < 0x80:
+        return bytes((n,))
+    buf = bytearray()
+    write_varint(buf, n)
+    return bytes(buf)
+
+
+def write_obj(buf: bytearray, obj):
+    """ Append the serialized ``obj`` to ``buf``, using ``obj.write`` if it has one, otherwise ``bytes(obj)``
+    """
+    if isinstance(obj, BaseType):
+        obj.write(buf)
+    else:
+        buf += bytes(obj)
 
 
 def varintdecode(data):
@@ -82,7 +142,22 @@ def JsonObj(data):
                              (type(data).__name__, data.__class__))
 
 
-class String:	### ok
+class BaseType:
+    """ Base class for the types - subclasses implement :meth:`.write`, which ``bytes(obj)`` calls (small fixed
+    types override ``__bytes__`` too, to skip the intermediate buffer)
+    """
+    __slots__ = ()
+    
+    def write(self, buf: bytearray):
+        raise NotImplementedError
+    
+    def __bytes__(self):
+        buf = bytearray()
+        self.write(buf)
+        return bytes(buf)
+
+
+class String(BaseType):	### ok
     def __init__(self, d):
         self.data = d
     
@@ -90,115 +165,115 @@ class String:	### ok
         d = self.unicodify()
         return varint(len(d)) + d
     
+    def write(self, buf: bytearray):
+        d = self.unicodify()
+        write_varint(buf, len(d))
+        buf += d
+    
     def __str__(self):
         return '%s' % str(self.data)
     
-    def unicodify(self):
-        r = []
-        for s in self.data:
-            o = ord(s)
-            if o <= 7:
-                r.append("u%04x" % o)
-            elif o == 8:
-                r.append("b")
-            elif o == 9:
-                r.append("\t")
-            elif o == 10:
-                r.append("\n")
-            elif o == 11:
-                r.append("u%04x" % o)
-            elif o == 12:
-                r.append("f")
-            elif o == 13:
-                r.append("\r")
-            elif 13 < o < 32:
-                r.append("u%04x" % o)
-            else:
-                r.append(s)
-        return bytes("".join(r), "utf-8")
-
-
+    def unicodify(self) -> bytes:
+        return unicodify(self.data)
 
 
-class Uint8:
+class Uint8(BaseType):
     def __init__(self, d):
         self.data = d
     
     def __bytes__(self):
         return struct.pack("<B", self.data)
     
+    def write(self, buf: bytearray):
+        buf += struct.pack("<B", self.data)
+    
     def __str__(self):
         return '%d' % self.data
 
 
-class Int16:	#ok
+class Int16(BaseType):	#ok
     def __init__(self, d):
         self.data = int(d)
     
     def __bytes__(self):
         return struct.pack("<h", int(self.data))
     
+    def write(self, buf: bytearray):
+        buf += struct.pack("<h", int(self.data))
+    
     def __str__(self):
         return '%d' % self.data
 
 
-class Uint16:	#ok
+class Uint16(BaseType):	#ok
     def __init__(self, d):
         self.data = int(d)
     
     def __bytes__(self):
         return struct.pack("<H", self.data)
     
+    def write(self, buf: bytearray):
+        buf += struct.pack("<H", self.data)
+    
     def __str__(self):
         return '%d' % self.data
 
 
-class Uint32:
+class Uint32(BaseType):
     def __init__(self, d):
         self.data = int(d)
     
     def __bytes__(self):
         return struct.pack("<I", self.data)
     
+    def write(self, buf: bytearray):
+        buf += struct.pack("<I", self.data)
+    
     def __str__(self):
         return '%d' % self.data
 
 
-class Uint64:
+class Uint64(BaseType):
     def __init__(self, d):
         self.data = int(d)
     
     def __bytes__(self):
         return struct.pack("<Q", self.data)
     
+    def write(self, buf: bytearray):
+        buf += struct.pack("<Q", self.data)
+    
     def __str__(self):
         return '%d' % self.data
 
 
-class Varint32:
+class Varint32(BaseType):
     def __init__(self, d):
         self.data = d
     
-    def __bytes__(self):
-        return varint(self.data)
+    def write(self, buf: bytearray):
+        write_varint(buf, self.data)
     
     def __str__(self):
         return '%d' % self.data
 
 
-class Int64:
+class Int64(BaseType):
     def __init__(self, d):
         self.data = d
     
     def __bytes__(self):
         return struct.pack("<q", self.data)
     
+    def write(self, buf: bytearray):
+        buf += struct.pack("<q", self.data)
+    
     def __str__(self):
         return '%d' % self.data
 
 
 
-class Bytes:
+class Bytes(BaseType):
     def __init__(self, d, length=None):
         self.data = d
         if length:
@@ -206,33 +281,36 @@ class Bytes:
         else:
             self.length = len(self.data)
     
-    def __bytes__(self):
+    def write(self, buf: bytearray):
         # FIXME constraint data to self.length
         d = unhexlify(bytes(self.data, 'utf-8'))
-        return varint(len(d)) + d
+        write_varint(buf, len(d))
+        buf += d
     
     def __str__(self):
         return str(self.data)
 
 
-class Void:
-    def __init__(self):
+class Void(BaseType):
+    def __init__(self, d=None):
         pass
     
-    def __bytes__(self):
-        return b''
+    def write(self, buf: bytearray):
+        pass
     
     def __str__(self):
         return ""
 
 
-class Array:
+class Array(BaseType):
     def __init__(self, d):
         self.data = d
         self.length = Varint32(len(self.data))
     
-    def __bytes__(self):
-        return bytes(self.length) + b"".join([bytes(a) for a in self.data])
+    def write(self, buf: bytearray):
+        self.length.write(buf)
+        for a in self.data:
+            write_obj(buf, a)
     
     def __str__(self):
         r = []
@@ -248,23 +326,26 @@ class Array:
         return json.dumps(r)
 
 
-class PointInTime:
+class PointInTime(BaseType):
     def __init__(self, d):
         self.data = d
     
     def __bytes__(self):
-        return struct.pack("<I", timegm(time.strptime((self.data + "UTC"), timeformat)))
+        return struct.pack("<I", timestamp_to_epoch(self.data))
+    
+    def write(self, buf: bytearray):
+        buf += bytes(self)
     
     def __str__(self):
         return self.data
 
 
-class Signature:
+class Signature(BaseType):
     def __init__(self, d):
         self.data = d
     
-    def __bytes__(self):
-        return self.data
+    def write(self, buf: bytearray):
+        buf += self.data
     
     def __str__(self):
         return json.dumps(hexlify(self.data).decode('ascii'))
@@ -294,15 +375,25 @@ class FixedArray:
         raise NotImplementedError
 
 
-class Optional:	#ok
+def _write_optional(buf: bytearray, data):
+    """ Write the optional ``data`` - a ``1`` flag byte then ``data``, or a ``0`` byte if it's empty
+    """
+    if not data:
+        buf.append(0)
+        return
+    pos = len(buf)
+    buf.append(1)
+    write_obj(buf, data)
+    if len(buf) == pos + 1:
+        buf[pos] = 0
+
+
+class Optional(BaseType):	#ok
     def __init__(self, d):
         self.data = d
     
-    def __bytes__(self):
-        if not self.data:
-            return bytes(Bool(0))
-        else:
-            return bytes(Bool(1)) + bytes(self.data) if bytes(self.data) else bytes(Bool(0))
+    def write(self, buf: bytearray):
+        _write_optional(buf, self.data)
     
     def __str__(self):
         return str(self.data)
@@ -313,28 +404,28 @@ class Optional:	#ok
         return not bool(bytes(self.data))
 
 
-class StaticVariant:
+class StaticVariant(BaseType):
     def __init__(self, d, type_id):
         self.data = d
         self.type_id = type_id
     
-    def __bytes__(self):
-        return varint(self.type_id) + bytes(self.data)
+    def write(self, buf: bytearray):
+        write_varint(buf, self.type_id)
+        write_obj(buf, self.data)
     
     def __str__(self):
         return json.dumps([self.type_id, self.data.json()])
 
 
-class Map:
+class Map(BaseType):
     def __init__(self, data):
         self.data = data
     
-    def __bytes__(self):
-        b = b""
-        b += varint(len(self.data))
+    def write(self, buf: bytearray):
+        write_varint(buf, len(self.data))
         for e in self.data:
-            b += bytes(e[0]) + bytes(e[1])
-        return b
+            write_obj(buf, e[0])
+            write_obj(buf, e[1])
     
     def __str__(self):
         r = []
@@ -343,33 +434,33 @@ class Map:
         return json.dumps(r)
 
 
-class Id:
+class Id(BaseType):
     def __init__(self, d):
         self.data = Varint32(d)
     
-    def __bytes__(self):
-        return bytes(self.data)
+    def write(self, buf: bytearray):
+        self.data.write(buf)
     
     def __str__(self):
         return str(self.data)
 
 
-class VoteId:
+class VoteId(BaseType):
     def __init__(self, vote):
         parts = vote.split(":")
         assert len(parts) == 2
         self.type = int(parts[0])
         self.instance = int(parts[1])
     
-    def __bytes__(self):
+    def write(self, buf: bytearray):
         binary = (self.type & 0xff) | (self.instance << 8)
-        return struct.pack("<I", binary)
+        buf += struct.pack("<I", binary)
     
     def __str__(self):
         return "%d:%d" % (self.type, self.instance)
 
 
-class ObjectId:
+class ObjectId(BaseType):
     """ Encodes object/protocol ids
     """
     
@@ -388,103 +479,232 @@ class ObjectId:
         else:
             raise Exception("Object id is invalid")
     
-    def __bytes__(self):
-        return bytes(self.instance) # only yield instance
+    def write(self, buf: bytearray):
+        self.instance.write(buf) # only yield instance
     
     def __str__(self):
         return self.Id
 
 
-class Amount:	#ok
+_AMOUNT = struct.Struct('<qb7s')
+
+
+@functools.lru_cache(maxsize=None)
+def asset_info(asset: str) -> Tuple[int, int, bytes]:
+    """ Return ``(precision, 10 ** precision, padded_symbol)`` for ``asset``, from
+    :py:attr:`golos.storage.asset_precision` (cached, as it's needed for every amount serialized)
+    """
+    if asset not in asset_precision:
+        raise Exception("Asset unknown")
+    precision = asset_precision[asset]
+    return precision, 10 ** precision, asset.encode('ascii').ljust(7, b'\x00')
+
+
+def _to_satoshis(amount: str, precision: int) -> int:
+    if precision and amount[-precision - 1:-precision] == '.':
+        digits = amount[:-precision - 1] + amount[-precision:]
+        if digits.isdigit():
+            return int(digits)
+    try:
+        return int(Decimal(amount).scaleb(precision).to_integral_value(ROUND_HALF_EVEN))
+    except (ArithmeticError, ValueError):
+        raise ValueError(f"Invalid amount: {amount!r}")
+
+
+def parse_amount(value: str) -> Tuple[int, int, str]:
+    """ Parse an amount such as ``'0.100 GOLOS'`` into ``(satoshis, precision, asset)`` - e.g. ``(100, 3, 'GOLOS')``.
+    Amounts with more decimal places than the asset's precision are rounded (half to even).
+    """
+    amount, asset = value.split()
+    precision = asset_info(asset)[0]
+    return _to_satoshis(amount, precision), precision, asset
+
+
+def format_amount(satoshis: int, precision: int, asset: str) -> str:
+    """ Format an integer amount of ``asset``'s smallest units, e.g. ``format_amount(100, 3, 'GOLOS') == '0.100 GOLOS'``
+    """
+    if satoshis < 0:
+        return '-' + format_amount(-satoshis, precision, asset)
+    if not precision:
+        return f'{satoshis} {asset}'
+    s = str(satoshis).rjust(precision + 1, '0')
+    return f'{s[:-precision]}.{s[-precision:]} {asset}'
+
+
+@functools.total_ordering
+class Amount(BaseType):	#ok
+    """ An immutable amount of an asset, e.g. ``Amount('0.100 GOLOS')``. The value is held as an integer number of
+    the asset's smallest units (:py:attr:`.satoshis`), so arithmetic and serialization are exact.
+    
+        >>> a = Amount('1.500 GOLOS') + Amount.from_number('0.25', 'GOLOS')
+        >>> a.satoshis, a.amount, str(a)
+        (1750, Decimal('1.750'), '1.750 GOLOS')
+    
+    """
+    __slots__ = ('_satoshis', '_precision', '_asset')
+    
     def __init__(self, d):
-        self.amount, self.asset = d.strip().split(" ")
-        self.amount = float(self.amount)
-        
-        if self.asset in asset_precision:
-            self.precision = asset_precision[self.asset]
+        if isinstance(d, Amount):
+            self._satoshis, self._precision, self._asset = d._satoshis, d._precision, d._asset
         else:
-            raise Exception("Asset unknown")
+            self._satoshis, self._precision, self._asset = parse_amount(d)
+    
+    @classmethod
+    def from_satoshis(cls, satoshis: int, asset: str) -> 'Amount':
+        """ Create an amount from an integer number of ``asset``'s smallest units (e.g. ``1000`` = ``1.000 GOLOS``)
+        """
+        a = cls.__new__(cls)
+        a._satoshis, a._precision, a._asset = int(satoshis), asset_info(asset)[0], asset
+        return a
+    
+    @classmethod
+    def from_number(cls, value, asset: str) -> 'Amount':
+        """ Create an amount from a ``Decimal``, ``str``, ``int`` or ``float`` number of ``asset`` (e.g. ``'0.1'``),
+        rounding (half to even) to the asset's precision - the same result as formatting ``Decimal(value)``.
+        """
+        precision, scale, _ = asset_info(asset)
+        if type(value) is int:
+            sat = value * scale
+        elif isinstance(value, str):
+            sat = _to_satoshis(value.strip(), precision)
+        else:
+            sat = int(Decimal(value).scaleb(precision).to_integral_value(ROUND_HALF_EVEN))
+        a = cls.__new__(cls)
+        a._satoshis, a._precision, a._asset = sat, precision, asset
+        return a
+    
+    @property
+    def satoshis(self) -> int:
+        """ The amount as an integer number of the asset's smallest units, e.g. ``100`` for ``0.100 GOLOS``
+        """
+        return self._satoshis
+    
+    @property
+    def precision(self) -> int:
+        return self._precision
+    
+    @property
+    def asset(self) -> str:
+        return self._asset
+    
+    @property
+    def amount(self) -> Decimal:
+        """ The amount as a ``Decimal`` with the asset's precision, e.g. ``Decimal('0.100')``
+        """
+        return Decimal(self._satoshis).scaleb(-self._precision)
     
     def __bytes__(self):
-        # padding
-        asset = self.asset + "\x00" * (7 - len(self.asset))
-        amount = round(float(self.amount) * 10 ** self.precision)
-        return (
-                struct.pack("<q", amount) +
-                struct.pack("<b", self.precision) +
-                bytes(asset, "ascii")
-        )
+        return _AMOUNT.pack(self._satoshis, self._precision, asset_info(self._asset)[2])
+    
+    def write(self, buf: bytearray):
+        buf += bytes(self)
+    
+    def _same_asset(self, other: 'Amount'):
+        if other.asset != self.asset:
+            raise ValueError(f"Cannot combine amounts of different assets: {self.asset} and {other.asset}")
+    
+    def __add__(self, other):
+        if not isinstance(other, Amount):
+            return NotImplemented
+        self._same_asset(other)
+        return Amount.from_satoshis(self.satoshis + other.satoshis, self.asset)
+    
+    def __sub__(self, other):
+        if not isinstance(other, Amount):
+            return NotImplemented
+        self._same_asset(other)
+        return Amount.from_satoshis(self.satoshis - other.satoshis, self.asset)
+    
+    def __mul__(self, other):
+        if not isinstance(other, int):
+            return NotImplemented
+        return Amount.from_satoshis(self.satoshis * other, self.asset)
+    
+    __rmul__ = __mul__
+    
+    def __neg__(self):
+        return Amount.from_satoshis(-self.satoshis, self.asset)
+    
+    def __bool__(self):
+        return self.satoshis != 0
+    
+    def __eq__(self, other):
+        if not isinstance(other, Amount):
+            return NotImplemented
+        return self.satoshis == other.satoshis and self.asset == other.asset
+    
+    def __lt__(self, other):
+        if not isinstance(other, Amount):
+            return NotImplemented
+        self._same_asset(other)
+        return self.satoshis < other.satoshis
+    
+    def __hash__(self):
+        return hash((self.satoshis, self.asset))
     
     def __str__(self):
-        return '{:.{}f} {}'.format(
-            self.amount,
-            self.precision,
-            self.asset
-        )
+        return format_amount(self.satoshis, self.precision, self.asset)
+    
+    def __repr__(self):
+        return f"Amount('{self}')"
 
 
-class Beneficiaries:
+class Beneficiaries(BaseType):
     
     def __init__(self, d):
         self.data = d
     
-    def __bytes__(self):
-        b = varint(len(self.data))
+    def write(self, buf: bytearray):
+        write_varint(buf, len(self.data))
         for beneficiary in self.data:
-            b += bytes(String(beneficiary["account"]))
-            b += bytes(Uint16(beneficiary["weight"]))
-        return b
+            String(beneficiary["account"]).write(buf)
+            Uint16(beneficiary["weight"]).write(buf)
     
     def __str__(self):
         return str(self.data)
 
 
-class PublicKey:	#ok
+class PublicKey(BaseType):	#ok
     
     def __init__(self, d):
         self.data = d
     
-    def __bytes__(self):
-        return bytes(Base58(self.data, prefix = prefix))
+    def write(self, buf: bytearray):
+        buf += bytes(Base58(self.data, prefix = prefix))
     
     def __str__(self):
         return str(self.data)
 
 
-class Permission:	#ok
+class Permission(BaseType):	#ok
     
     def __init__(self, d):
         self.data = d
     
-    def __bytes__(self):
+    def write(self, buf: bytearray):
         
-        b = bytes(Uint32(self.data["weight_threshold"]))
+        Uint32(self.data["weight_threshold"]).write(buf)
         
-        b += varint(len(self.data["account_auths"]))			# Array []
+        write_varint(buf, len(self.data["account_auths"]))			# Array []
         for account, weight in self.data["account_auths"]:
-            b += bytes(String(account))
-            b += bytes(Uint16(weight))
+            String(account).write(buf)
+            Uint16(weight).write(buf)
         
-        b += varint(len(self.data["key_auths"]))				# Array []
+        write_varint(buf, len(self.data["key_auths"]))				# Array []
         for key, weight in self.data["key_auths"]:
-            b += bytes(PublicKey(key))
-            b += bytes(Uint16(weight))
-        
-        return b
+            PublicKey(key).write(buf)
+            Uint16(weight).write(buf)
     
     def __str__(self):
         return str(self.data)
 
 
-class Optional_Permission:	#ok
+class Optional_Permission(BaseType):	#ok
     def __init__(self, d):
         self.data = Permission(d) if d else d
     
-    def __bytes__(self):
-        if not self.data:
-            return bytes(Bool(0))
-        else:
-            return bytes(Bool(1)) + bytes(self.data) if bytes(self.data) else bytes(Bool(0))
+    def write(self, buf: bytearray):
+        _write_optional(buf, self.data)
     
     def __str__(self):
         return str(self.data)
@@ -495,37 +715,37 @@ class Optional_Permission:	#ok
         return not bool(bytes(self.data))
 
 
-class ExtensionsComment:	#ok
+class ExtensionsComment(BaseType):	#ok
     
     def __init__(self, d):
         self.data = d
     
-    def __bytes__(self):
+    def write(self, buf: bytearray):
         
-        b = varint(len(self.data))
+        write_varint(buf, len(self.data))
         for value in self.data:
-            b += varint(value[0])
+            write_varint(buf, value[0])
             
             if value[0] == 0:
-                b += bytes(Beneficiaries(value[1]["beneficiaries"]))
+                Beneficiaries(value[1]["beneficiaries"]).write(buf)
             elif value[0] == 1:
-                b += bytes(Uint64(value[1]["destination"]))
+                Uint64(value[1]["destination"]).write(buf)
             elif value[0] == 2:
-                b += bytes(Uint16(value[1]["percent"]))
-        
-        return b
+                Uint16(value[1]["percent"]).write(buf)
     
     def __str__(self):
         return str(self.data)
 
 
-class ArrayString:	#ok
+class ArrayString(BaseType):	#ok
     def __init__(self, d):
         self.data = d
         self.length = Varint32(len(self.data))
     
-    def __bytes__(self):
-        return bytes(self.length) + b"".join([bytes(String(a)) for a in self.data])
+    def write(self, buf: bytearray):
+        self.length.write(buf)
+        for a in self.data:
+            String(a).write(buf)
     #return bytes(self.length) + b"".join([varint(len(a)) + bytes(a, 'utf-8') for a in self.data])
     
     def __str__(self):
@@ -540,3 +760,241 @@ class ArrayString:	#ok
             else:
                 r.append(JsonObj(a))
         return json.dumps(r)
+
+
+
+class Struct(BaseType):
+    """ A struct of named fields, written in order - subclasses set ``fields`` to a list of ``[key, Type]`` pairs
+    """
+    fields = []
+    
+    def __init__(self, d):
+        self.data = d
+    
+    def write(self, buf: bytearray):
+        for key, type_value in self.fields:
+            type_value(self.data[key]).write(buf)
+    
+    def __str__(self):
+        return str(self.data)
+
+
+class ArrayOf(BaseType):
+    """ A varint length prefixed array (or set) of ``type`` - subclasses set ``type``
+    """
+    type = None
+    
+    def __init__(self, d):
+        self.data = d
+    
+    def write(self, buf: bytearray):
+        write_varint(buf, len(self.data))
+        for a in self.data:
+            self.type(a).write(buf)
+    
+    def __str__(self):
+        return str(self.data)
+
+
+class OptionalOf(BaseType):
+    """ An optional ``type`` (``None`` if absent), written with a ``0`` / ``1`` flag byte - subclasses set ``type``
+    """
+    type = None
+    
+    def __init__(self, d):
+        self.data = d
+    
+    def write(self, buf: bytearray):
+        if self.data is None:
+            buf.append(0)
+        else:
+            buf.append(1)
+            self.type(self.data).write(buf)
+    
+    def __str__(self):
+        return str(self.data)
+
+
+class StaticVariantOf(BaseType):
+    """ A ``[type_id, value]`` static variant of one of ``types``, a list of ``(name, Type)`` pairs in order of their
+    type ID. The type may also be given by name, e.g. ``['chain_properties_18', {...}]``.
+    """
+    types = []
+    
+    def __init__(self, d):
+        type_id, self.value = d
+        if isinstance(type_id, str):
+            type_id = [name for name, _ in self.types].index(type_id)
+        self.type_id = int(type_id)
+    
+    def write(self, buf: bytearray):
+        write_varint(buf, self.type_id)
+        self.types[self.type_id][1](self.value).write(buf)
+    
+    def __str__(self):
+        return json.dumps([self.type_id, self.value])
+
+
+class FixedBytes(BaseType):
+    """ A hex string of exactly ``length`` bytes, written without a length prefix - subclasses set ``length``
+    """
+    length = 0
+    
+    def __init__(self, d):
+        self.data = d
+    
+    def write(self, buf: bytearray):
+        d = unhexlify(self.data)
+        if len(d) != self.length:
+            raise ValueError('%s must be %d bytes, not %d' % (self.__class__.__name__, self.length, len(d)))
+        buf += d
+    
+    def __str__(self):
+        return str(self.data)
+
+
+class Ripemd160(FixedBytes):
+    length = 20
+
+
+class Sha256(FixedBytes):
+    length = 32
+
+
+class CompactSignature(FixedBytes):
+    length = 65
+
+
+class Enum(BaseType):
+    """ An enum, given by name or number, which is written as an ``int64`` - subclasses set ``names`` in order
+    """
+    names = []
+    
+    def __init__(self, d):
+        self.data = d
+    
+    def write(self, buf: bytearray):
+        value = self.names.index(self.data) if isinstance(self.data, str) else int(self.data)
+        buf += struct.pack("<q", value)
+    
+    def __str__(self):
+        return str(self.data)
+
+
+class Version(BaseType):
+    """ A ``major.minor.hotfix`` version string, packed into a ``uint32``
+    """
+    def __init__(self, d):
+        self.data = d
+    
+    def write(self, buf: bytearray):
+        major, minor, hotfix = (int(x) for x in str(self.data).split('.'))
+        buf += struct.pack("<I", (major << 24) | (minor << 16) | hotfix)
+    
+    def __str__(self):
+        return str(self.data)
+
+
+class PublicKeySet(ArrayOf):
+    type = PublicKey
+
+
+class PermissionArray(ArrayOf):
+    type = Permission
+
+
+class Uint32Array(ArrayOf):
+    type = Uint32
+
+
+class OptionalPublicKey(OptionalOf):
+    type = PublicKey
+
+
+class OptionalPointInTime(OptionalOf):
+    type = PointInTime
+
+
+class Price(Struct):
+    fields = [['base', Amount], ['quote', Amount]]
+
+
+class ChainProperties17(Struct):
+    fields = [['account_creation_fee', Amount], ['maximum_block_size', Uint32], ['sbd_interest_rate', Uint16]]
+
+
+class ChainProperties18(Struct):
+    fields = ChainProperties17.fields + [
+        ['create_account_min_golos_fee', Amount], ['create_account_min_delegation', Amount],
+        ['create_account_delegation_time', Uint32], ['min_delegation', Amount],
+    ]
+
+
+class CurationCurve(Enum):
+    names = ['detect', 'bounded', 'linear', 'square_root']
+
+
+class DelegatorPayoutStrategy(Enum):
+    names = ['to_delegator', 'to_delegated_vesting']
+
+
+class ChainProperties19(Struct):
+    fields = ChainProperties18.fields + [
+        ['max_referral_interest_rate', Uint16], ['max_referral_term_sec', Uint32],
+        ['min_referral_break_fee', Amount], ['max_referral_break_fee', Amount],
+        ['posts_window', Uint16], ['posts_per_window', Uint16], ['comments_window', Uint16],
+        ['comments_per_window', Uint16], ['votes_window', Uint16], ['votes_per_window', Uint16],
+        ['auction_window_size', Uint16], ['max_delegated_vesting_interest_rate', Uint16],
+        ['custom_ops_bandwidth_multiplier', Uint16], ['min_curation_percent', Uint16], ['max_curation_percent', Uint16],
+        ['curation_reward_curve', CurationCurve], ['allow_distribute_auction_reward', Bool],
+        ['allow_return_auction_reward_to_fund', Bool],
+    ]
+
+
+class ChainPropertiesVariant(StaticVariantOf):
+    types = [('chain_properties_17', ChainProperties17), ('chain_properties_18', ChainProperties18),
+             ('chain_properties_19', ChainProperties19)]
+
+
+class Pow(Struct):
+    fields = [['worker', PublicKey], ['input', Sha256], ['signature', CompactSignature], ['work', Sha256]]
+
+
+class Pow2Input(Struct):
+    fields = [['worker_account', String], ['prev_block', Ripemd160], ['nonce', Uint64]]
+
+
+class Pow2(Struct):
+    fields = [['input', Pow2Input], ['pow_summary', Uint32]]
+
+
+class EquihashProof(Struct):
+    fields = [['n', Uint32], ['k', Uint32], ['seed', Sha256], ['inputs', Uint32Array]]
+
+
+class EquihashPow(Struct):
+    fields = [['input', Pow2Input], ['proof', EquihashProof], ['prev_block', Ripemd160], ['pow_summary', Uint32]]
+
+
+class Pow2Work(StaticVariantOf):
+    types = [('pow2', Pow2), ('equihash_pow', EquihashPow)]
+
+
+class HardforkVersionVote(Struct):
+    fields = [['hf_version', Version], ['hf_time', PointInTime]]
+
+
+class BlockHeaderExtension(StaticVariantOf):
+    types = [('void', Void), ('version', Version), ('hardfork_version_vote', HardforkVersionVote)]
+
+
+class BlockHeaderExtensions(ArrayOf):
+    type = BlockHeaderExtension
+
+
+class SignedBlockHeader(Struct):
+    fields = [
+        ['previous', Ripemd160], ['timestamp', PointInTime], ['witness', String],
+        ['transaction_merkle_root', Ripemd160], ['extensions', BlockHeaderExtensions],
+        ['witness_signature', CompactSignature],
+    ]
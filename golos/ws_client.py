@@ -41,7 +41,9 @@ Copyright::
 """
 import functools
 import random
-from typing import Union, List, Iterator, Optional
+import re
+from collections import deque
+from typing import Union, List, Iterator, Optional, Iterable, Tuple
 
 import websocket
 import ssl
@@ -55,12 +57,26 @@ from golos.extras import new_node_on_err
 from .storage import api_total
 from time import sleep
 from pprint import pprint
-from itertools import cycle
+from itertools import cycle, count
 from .exceptions import GolosException, APINotFound, RetriesExceeded, TransactionNotFound, KnownGolosError
+from .replay import RecordingWebSocket, ReplayWebSocket, ReplayRecording
 
 log = logging.getLogger(__name__)
 
 
+def load_nodes_file(path: str) -> List[str]:
+    """
+    Load a list of nodes from the JSON file ``path``, which may contain either a plain list of node URLs, or a
+    ``dict`` with the key ``nodes`` - such as the ranked node lists saved by :func:`golos.bench.save_ranking`
+    """
+    with open(path, 'r') as fh:
+        data = json.load(fh)
+    nodes = data['nodes'] if isinstance(data, dict) else data
+    if not nodes:
+        raise GolosException(f"No nodes found in nodes file '{path}'")
+    return list(nodes)
+
+
 def _find_exception(msg):
     if 'could not find api' in msg.lower():
         raise APINotFound(msg)
@@ -122,6 +138,37 @@ def error_handler(data: dict = None, msg: str = None):
     return _find_exception(msg=msg)
 
 
+_RESPONSE_ID = re.compile(r'^\s*\{\s*(?:"jsonrpc"\s*:\s*"2\.0"\s*,\s*)?"id"\s*:\s*(\d+)')
+
+
+def response_id(response: str) -> Optional[int]:
+    """
+    Return the request ID of a raw JSON-RPC response, without decoding the (potentially huge) result when
+    the ``id`` comes before it - as it does in responses from ``golosd``.
+    
+        >>> response_id('{"jsonrpc":"2.0","id":5,"result":{"previous":"..."}}')
+        5
+    
+    """
+    m = _RESPONSE_ID.match(response)
+    if m is not None:
+        return int(m.group(1))
+    return json.loads(response).get('id')
+
+
+def decode_response(response: str):
+    """
+    Decode a raw JSON-RPC response string, as yielded by ``WsClient.call_stream(raw=True)``, and return its result,
+    raising the appropriate exception if the response contains an error.
+    """
+    data = json.loads(response)
+    if 'error' in data:
+        error_handler(data)
+    if 'result' not in data:
+        raise GolosException("No 'result' key found in response...")
+    return data['result']
+
+
 class WsClient:
     """
     Simple Golos JSON-WebSocket-RPC API
@@ -142,12 +189,17 @@ class WsClient:
     
         >>> rpc.call('command', 'my_param1', 'other_param2')
     
+    Record all traffic to a file, then replay it later without any network access (see :py:mod:`golos.replay`):
+    
+        >>> rpc = WsClient(nodes=['wss://golosd.privex.io'], record_to='traffic.jsonl')
+        >>> rpc = WsClient(replay_from='traffic.jsonl', replay_latency='recorded')
+    
     """
     nodes: Iterator[str]
     report: bool
     api_total: dict
     url: str
-    ws: Optional[websocket.WebSocket]
+    ws: Optional[Union[websocket.WebSocket, RecordingWebSocket, ReplayWebSocket]]
 
     MAX_RETRIES = 5
     RETRY_DELAY = 1
@@ -161,17 +213,33 @@ class WsClient:
         :param bool report: If ``True`` - enables more verbose logging output
         :param list nodes:  A ``List[str]`` of nodes to use, each formatted like: ``wss://golosd.privex.io``
         :param kwargs:      Any additional keyword arguments, e.g. ``num_retries``
+        
+        :key str record_to: Append every request/response pair to this JSON-lines file
+        :key str|list replay_from: Serve responses from this recording (file path or list of records) instead of
+                                   connecting to a node
+        :key replay_latency: When replaying, ``'recorded'`` to sleep for the recorded latency, or a number of seconds
+        :key str nodes_file: Load nodes from this JSON file (see :func:`.load_nodes_file`), keeping them in order
+        :key bool auto_connect: (Default: ``True``) If ``False``, don't connect to a node until :py:meth:`.next_node`
         """
         self.report = report
         self.num_retries = kwargs.get("num_retries", 20)
+        self.record_to = kwargs.get("record_to")
+        self.replay_from = kwargs.get("replay_from")
+        self.replay_latency = kwargs.get("replay_latency")
+        self._replay_recording: Optional[ReplayRecording] = None
         nodes = [nodes] if type(nodes) is str else nodes
+        if nodes is None and kwargs.get("nodes_file"):
+            # Ranked node lists are already in order of preference, so they aren't shuffled
+            nodes = load_nodes_file(kwargs["nodes_file"])
         default_nodes = list(storage.nodes)
         random.shuffle(default_nodes)
         self.nodes = cycle(default_nodes if nodes is None else nodes)  # Перебор нод
         self.api_total = api_total
         self.url = ''
         self.ws = None
-        self.ws_connect()  # Подключение к ноде
+        self._ids = count(1)
+        if kwargs.get("auto_connect", True):
+            self.ws_connect()  # Подключение к ноде
 
     @retry_on_err(fail_on=[KeyboardInterrupt])
     def next_node(self):
@@ -183,9 +251,19 @@ class WsClient:
             url = self.url
         if self.report:
             log.info("Trying to connect to node %s", url)
-            
+        
+        if self.replay_from is not None:
+            # Load the recording once, so reconnecting continues the replay instead of re-reading and restarting it
+            if self._replay_recording is None:
+                self._replay_recording = ReplayRecording(self.replay_from)
+            self.ws = ReplayWebSocket(self._replay_recording, latency=self.replay_latency)
+            self.ws.connect(url)
+            return True
+        
         self.ws = websocket.WebSocket(sslopt=self.sslopt_ca_certs) if self.url[:3] == "wss" else websocket.WebSocket()
         self.ws.connect(url)
+        if self.record_to is not None:
+            self.ws = RecordingWebSocket(self.ws, self.record_to)
         return True
     
     @retry_on_err(max_retries=10, fail_on=[KeyboardInterrupt])
@@ -216,14 +294,7 @@ class WsClient:
         :return bool result: In the event of minor errors, ``False`` or ``None`` may be returned.
         """
         # Определяем для name своё api
-        api = self.api_total[name]
-        if api:
-            body_dict = {"id": 1, "method": "call", "jsonrpc": "2.0", "params": [api, name, args]}
-            body = json.dumps(body_dict, ensure_ascii=False).encode('utf8')
-        else:
-            if self.report:
-                log.warning('not find api in api_total')
-            raise GolosException("API not found...")
+        body = self._build_body(name, args)
 
         response, result = None, []
         cnt = 0
@@ -270,6 +341,120 @@ class WsClient:
 
         return response_json.get("result")
 
+    def _build_body(self, name: str, args: Iterable, req_id: int = 1) -> bytes:
+        api = self.api_total.get(name)
+        if not api:
+            if self.report:
+                log.warning('not find api in api_total')
+            raise GolosException("API not found...")
+        body_dict = {"id": req_id, "method": "call", "jsonrpc": "2.0", "params": [api, name, list(args)]}
+        return json.dumps(body_dict, ensure_ascii=False).encode('utf8')
+
+    def _reconnect(self, name: str, tries: int):
+        """Close the current connection and connect to the next node, raising :class:`.RetriesExceeded` if needed"""
+        if -1 < self.num_retries < tries:
+            raise RetriesExceeded(f"Failed to make call '{name}' after {tries} tries...")
+        sleeptime = (tries - 1) * 2 if tries < 10 else 10
+        log.info("Lost connection to node %s (%d/%d), reconnecting in %d seconds", self.url, tries,
+                 self.num_retries, sleeptime)
+        try:
+            self.ws.close()
+        except Exception:
+            pass
+        sleep(sleeptime)
+        self.ws_connect()
+
+    def call_stream(self, calls: Iterable[Tuple[str, Iterable]], window: int = 20, raw: bool = False) -> Iterator:
+        """
+        Pipeline many JsonRPC calls over the current connection, keeping up to ``window`` requests in flight,
+        and yield their results in the same order as ``calls``.
+        
+        Unlike :py:meth:`.call`, this doesn't wait for a full round trip per request - so fetching many blocks
+        runs at the speed of the network rather than one RTT per block.
+        
+        **Basic Usage**:
+        
+            >>> rpc = WsClient()
+            >>> calls = (('get_block', (str(n),)) for n in range(1000, 2000))
+            >>> for block in rpc.call_stream(calls, window=50):
+            ...     print(block['witness'])
+        
+        ``calls`` is consumed lazily, so it may be an infinite generator. If the connection fails, the client
+        reconnects (possibly to a different node) and re-sends the requests which hadn't been answered yet.
+        
+        If the generator is closed early, responses to any requests still in flight are read and discarded, so
+        the connection can be re-used for normal calls.
+        
+        :param calls: An iterable of ``(method_name, args)`` pairs, e.g. ``[('get_block', ('123',)), ...]``
+        :param int window: The maximum number of requests awaiting a response at any one time
+        :param bool raw: If ``True``, yield each raw JSON response string instead of its decoded result, so decoding
+                         can be done elsewhere (e.g. in worker processes) with :func:`.decode_response`
+        :raises RetriesExceeded: When too many failures occurred while re-trying the connection.
+        :return Iterator results: The results of each call, in the order of ``calls``
+        """
+        calls = iter(calls)
+        pending = deque()  # (req_id, name, args) which have been sent, in the order they were sent
+        unsent = deque()   # (name, args) which must be (re-)sent before taking any more from ``calls``
+        received = {}      # Responses which arrived ahead of the request at the front of ``pending``
+        exhausted, tries, name = False, 0, 'call_stream'
+        try:
+            while True:
+                try:
+                    while len(pending) < window:
+                        if not unsent:
+                            if exhausted:
+                                break
+                            try:
+                                unsent.append(tuple(next(calls)))
+                            except StopIteration:
+                                exhausted = True
+                                break
+                        name, args = unsent[0]
+                        req_id = next(self._ids)
+                        self.ws.send(self._build_body(name, args, req_id))
+                        unsent.popleft()
+                        pending.append((req_id, name, args))
+                    if not pending:
+                        return
+                    req_id, name, _ = pending[0]
+                    while req_id not in received:
+                        data = self.ws.recv()
+                        if raw:
+                            received[response_id(data)] = data
+                        else:
+                            data = json.loads(data)
+                            received[data.get('id')] = data
+                except (KeyboardInterrupt, GolosException):
+                    raise
+                except Exception as e:
+                    log.debug("Error during call_stream(): %s %s", type(e), str(e))
+                    tries += 1
+                    # Requests which weren't answered are re-sent, in their original order, on the new connection
+                    unsent.extendleft(reversed([(n, a) for _, n, a in pending]))
+                    pending.clear()
+                    received.clear()
+                    self._reconnect(name, tries)
+                    continue
+                
+                pending.popleft()
+                data = received.pop(req_id)
+                tries = 0
+                if raw:
+                    yield data
+                    continue
+                if 'error' in data:
+                    error_handler(data)
+                if 'result' not in data:
+                    raise GolosException("No 'result' key found in response...")
+                yield data['result']
+        finally:
+            # Drain any responses still in flight, so they don't get mistaken for the response to a later call()
+            try:
+                for _ in range(len(pending) - len(received)):
+                    self.ws.recv()
+            except Exception:
+                pass
+
     def close(self):
         """Close the connection on the :class:`websocket.WebSocket` object"""
         if self.ws is not None:
@@ -59,11 +59,34 @@ directly (not via pytest, as pytest will filter out the log messages):
 
 
 """
+import os
+import struct
+import tempfile
+import threading
 import unittest
+from unittest import mock
 import logging
+from calendar import timegm
+from datetime import datetime
+from decimal import Decimal
+from itertools import islice
 
 from golos.extras import dict_sort
 from golos import Api, storage, Key, exceptions
+from golos.bench import bench_node, bench_nodes, percentile, save_ranking
+from golos.chain import block_id, block_num_from_id
+from golos.blocklog import BlockLog
+from golos.checkpoint import FileCheckpoint, SqliteCheckpoint
+from golos.deposits import DepositWatcher
+from golos.fakenode import FakeNode, FakeNodeError
+from golos.index import HistoryStore, OpIndex, SqliteIndex, TxIndex
+from golos.replay import RecordingWebSocket, ReplayWebSocket
+from golos import operations, types
+from golos.deserializer import Reader, decode_transaction, iter_blocks, iter_transactions, read_operation
+from golos.serializer import serialize_block, serialize_operation, serialize_transaction, transaction_id
+from golos.timestamps import epoch_to_timestamp, format_timestamp, parse_timestamp, timestamp_to_epoch
+from golos.types import Amount, ArrayString, ExtensionsComment, Map, Optional_Permission, Permission, String, Uint16
+from golos.ws_client import WsClient
 from privex.loghelper import LogHelper
 from privex.helpers import env_bool
 
@@ -71,6 +94,8 @@ NODES = ['wss://golosd.privex.io'] + storage.nodes
 TEST_ACCOUNTS = ['someguy123', 'ksantoprotein']
 TEST_WITNESSES = ['someguy123']
 
+TEST_WIF = '5Jq19TeeVmGrBFnu32oxfxQMiipnSCKmwW7fZGUVLAoqsKJ9JwP'
+
 TEST_TXS = [
     {
         'op': {'from':   'someguy123', 'to': 'ksantoprotein', 'amount': '0.100 GOLOS', 'memo': 'testing',
@@ -92,6 +117,23 @@ TEST_TXS = [
 
 IGNORE_KEYS_FIND = ['transaction_id', 'block_num', 'transaction_num']
 
+TEST_TX_HEX = '4b6d2b19f0b3784b935d01020a736f6d656775793132330d6b73616e746f70726f7465696e640000000000000003474f4c4f53' \
+              '00000774657374696e6700'
+
+REPLAY_RECORDS = [
+    dict(request=['database_api', 'get_config', []], response={'result': {'STEEMIT_BANDWIDTH_PRECISION': 1000000}},
+         latency=0.01),
+    dict(request=['database_api', 'get_chain_properties', []], response={'result': {
+        'account_creation_fee': '1.000 GOLOS', 'create_account_min_golos_fee': '0.030 GOLOS',
+        'create_account_min_delegation': '0.150 GOLOS'
+    }}, latency=0.01),
+    dict(request=['database_api', 'get_account_count', []], response={'result': 1234}, latency=0.01),
+    dict(request=['database_api', 'get_account_count', []], response={'result': 1235}, latency=0.01),
+    dict(request=['operation_history', 'get_transaction', ['abcdef']], latency=0.01, response={
+        'error': {'code': -32000, 'message': 'Missing Transaction With ID ${id}', 'data': {'id': 'abcdef'}}
+    }),
+]
+
 DEBUG = env_bool('DEBUG', False)
 
 lh = LogHelper('golos', handler_level=logging.DEBUG if DEBUG else logging.CRITICAL)
@@ -171,6 +213,631 @@ class GolosTestCase(unittest.TestCase):
             self.assertEqual(txid_bc, t['txid'], msg='txid_bc == t["txid"]')
 
 
+class ReplayTransportTests(unittest.TestCase):
+    def test_replay_api(self):
+        """Test Api can be constructed and queried purely from recorded traffic"""
+        g = Api(replay_from=REPLAY_RECORDS)
+        self.assertEqual(g.STEEMIT_BANDWIDTH_PRECISION, 1000000)
+        self.assertEqual(g.account_creation_fee, '1.000 GOLOS')
+        # Repeated requests are served in recorded order, wrapping around once exhausted
+        self.assertEqual([g.get_account_count() for _ in range(3)], [1234, 1235, 1234])
+    
+    def test_replay_errors(self):
+        """Test recorded errors and unrecorded requests raise the appropriate exceptions"""
+        rpc = WsClient(replay_from=REPLAY_RECORDS)
+        with self.assertRaises(exceptions.TransactionNotFound):
+            rpc.call('get_transaction', 'abcdef')
+        with self.assertRaises(exceptions.GolosException):
+            rpc.call('get_witness_count')
+    
+    def test_record_and_replay(self):
+        """Test traffic captured by RecordingWebSocket can be replayed by ReplayWebSocket"""
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'traffic.jsonl')
+            rpc = WsClient(replay_from=REPLAY_RECORDS)
+            rpc.ws = RecordingWebSocket(rpc.ws, path)
+            self.assertEqual(rpc.call('get_account_count'), 1234)
+            self.assertEqual(rpc.call('get_config')['STEEMIT_BANDWIDTH_PRECISION'], 1000000)
+            rpc.close()
+            
+            replay = WsClient(replay_from=path)
+            self.assertEqual(replay.call('get_account_count'), 1234)
+            self.assertEqual(replay.call('get_account_count'), 1234)
+            self.assertIsInstance(replay.ws, ReplayWebSocket)
+    
+    def test_replay_reconnect(self):
+        """Test reconnecting a replaying WsClient continues the replay, rather than reloading and restarting it"""
+        rpc = WsClient(replay_from=REPLAY_RECORDS)
+        recording = rpc.ws.recording
+        self.assertEqual(rpc.call('get_account_count'), 1234)
+        rpc.node_connect()
+        self.assertIs(rpc.ws.recording, recording)
+        self.assertEqual(rpc.call('get_account_count'), 1235)
+
+
+class FakeNodeTestCase(unittest.TestCase):
+    """Base class for offline tests, which run against an in-process :class:`.FakeNode` (manual block production)"""
+    node: FakeNode
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.node = FakeNode(block_interval=None, initial_blocks=20, ops_per_block=2).start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.node.stop()
+    
+    def setUp(self):
+        self.golos = Api(nodes=self.node.url, report=DEBUG)
+
+
+class FakeNodeTests(FakeNodeTestCase):
+    def test_get_block(self):
+        """Test blocks from the fake node link to their previous block"""
+        head = self.golos.get_dynamic_global_properties()['head_block_number']
+        self.assertGreaterEqual(head, 20)
+        block = self.golos.get_block(head)
+        self.assertEqual(block['previous'], self.node.block_ids[head - 1])
+        self.assertIsNone(self.golos.get_block(head + 1000))
+    
+    def test_get_accounts(self):
+        """Test Api.get_accounts derived values can be calculated from fake node accounts"""
+        acc = self.golos.get_accounts(['someguy123'])[0]
+        self.assertEqual(acc['name'], 'someguy123')
+        self.assertIn('bandwidth', acc)
+        self.assertEqual(acc['rating'], 25)
+    
+    def test_transfer(self):
+        """Test a transfer broadcast to the fake node is included in a block and can be looked up"""
+        tx = self.golos.transfer(to='privex', amount='1.5', from_account='someguy123', wif=TEST_WIF, memo='test')
+        self.assertEqual(tx['block_num'], self.node.head_block_number)
+        found = self.golos.get_transaction(tx['id'])
+        self.assertEqual(found['operations'], tx['operations'])
+        hist = self.golos.get_account_history('privex', op_limit='transfer')
+        self.assertIn(tx['id'], [h['trx_id'] for h in hist])
+    
+    def test_iter_account_history(self):
+        """Test Api.iter_account_history pages through history in either direction, with or without prefetching"""
+        hist = self.node.history['privex']
+        self.assertGreater(len(hist), 10)
+        desc = list(self.golos.iter_account_history('privex', page_size=4))
+        self.assertEqual([o['number'] for o in desc], list(range(len(hist) - 1, -1, -1)))
+        self.assertEqual([o['trx_id'] for o in desc], [h[1]['trx_id'] for h in reversed(hist)])
+        self.assertEqual(list(self.golos.iter_account_history('privex', page_size=3, prefetch=0)), desc)
+        
+        asc = list(self.golos.iter_account_history('privex', direction='asc', start=3, page_size=4, prefetch=2))
+        self.assertEqual([o['number'] for o in asc], list(range(3, len(hist))))
+        
+        transfers = self.golos.iter_account_history('privex', op_limit='transfer', start=len(hist) - 2, page_size=2)
+        first = next(transfers)
+        transfers.close()
+        self.assertEqual(first['type_op'], 'transfer')
+        self.assertLessEqual(first['number'], len(hist) - 2)
+        self.assertEqual(self.golos.get_account_history('privex', start_limit=5), desc)
+        # The first operation past the age cutoff is included, and no extra connection is opened without prefetch
+        with mock.patch.object(self.golos, '_new_rpc', side_effect=AssertionError('new connection opened')):
+            self.assertEqual(self.golos.get_account_history('privex', age=-60), desc[:1])
+            self.assertEqual(list(self.golos.iter_account_history('privex', page_size=4)), desc)
+    
+    def test_iter_account_history_parallel(self):
+        """Test Api.iter_account_history with workers fetches sequence range chunks concurrently, in order"""
+        hist = self.node.history['privex']
+        desc = list(self.golos.iter_account_history('privex', page_size=2, workers=3, chunk_pages=2))
+        self.assertEqual([o['number'] for o in desc], list(range(len(hist) - 1, -1, -1)))
+        asc = list(self.golos.iter_account_history('privex', direction='asc', start=1, page_size=2, workers=3,
+                                                   chunk_pages=3))
+        self.assertEqual([o['number'] for o in asc], list(range(1, len(hist))))
+        self.assertEqual([o['trx_id'] for o in asc], [h[1]['trx_id'] for h in hist[1:]])
+    
+    def test_sync_histories(self):
+        """Test Api.sync_histories stores account histories locally, then only fetches new items"""
+        with HistoryStore() as store:
+            accounts = ['privex', 'someguy123', 'golos']
+            counts = self.golos.sync_histories(accounts, store, workers=2, page_size=3)
+            self.assertEqual(counts, {a: len(self.node.history.get(a, [])) for a in accounts})
+            self.assertEqual(store.get_account_history('privex'), self.golos.get_account_history('privex'))
+            
+            before = len(self.node.history['privex'])
+            self.golos.transfer(to='privex', amount='0.5', from_account='someguy123', wif=TEST_WIF, memo='sync')
+            new = len(self.node.history['privex']) - before
+            self.assertEqual(self.golos.sync_account_history('privex', store), new)
+            self.assertEqual(self.golos.sync_account_history('privex', store), 0)
+            latest = store.get_account_history('privex', op_limit='transfer', start_limit=new)
+            self.assertEqual(latest, self.golos.get_account_history('privex', op_limit='transfer'))
+            self.assertIn('sync', [h['memo'] for h in latest[:new]])
+            self.assertEqual(store.get_account_history('privex', age=-60),
+                             self.golos.get_account_history('privex')[:1])
+            self.assertEqual(store.last_seq('privex'), len(self.node.history['privex']) - 1)
+            with self.assertRaises(ValueError):
+                self.golos.sync_histories(accounts, store, rpc=self.golos.rpc)
+            self.assertNotIsInstance(store, SqliteIndex)
+    
+    def test_unsupported_method(self):
+        """Test methods which the fake node doesn't implement raise an exception"""
+        with self.assertRaises(exceptions.GolosException):
+            self.golos.rpc.call('get_escrow', 'someguy123', 1)
+
+
+class StreamTests(FakeNodeTestCase):
+    def test_call_stream(self):
+        """Test WsClient.call_stream returns pipelined results in order, and drains the connection when closed"""
+        rpc = self.golos._new_rpc()
+        nums = list(range(1, 15))
+        blocks = list(rpc.call_stream((('get_block', (str(n),)) for n in nums), window=4))
+        self.assertEqual([b['witness'] for b in blocks], [self.node.blocks[n]['witness'] for n in nums])
+        
+        partial = rpc.call_stream((('get_block', (str(n),)) for n in nums), window=8)
+        next(partial)
+        partial.close()
+        self.assertEqual(rpc.call('get_config')['STEEMIT_BANDWIDTH_PRECISION'], 1000000)
+    
+    def test_stream_blocks(self):
+        """Test Api.stream_blocks yields linked blocks in order"""
+        head = self.node.head_block_number
+        blocks = list(self.golos.stream_blocks(start=1, end=head, prefetch=5))
+        self.assertEqual([b['block_num'] for b in blocks], list(range(1, head + 1)))
+        for prev, b in zip(blocks, blocks[1:]):
+            self.assertEqual(b['previous'], self.node.block_ids[prev['block_num']])
+    
+    def test_stream_blocks_irreversible(self):
+        """Test Api.stream_blocks in irreversible mode never passes the last irreversible block"""
+        lib = self.node.last_irreversible_block_num
+        blocks = list(islice(self.golos.stream_blocks(start=1, mode='irreversible'), lib))
+        self.assertEqual(blocks[-1]['block_num'], lib)
+        with self.assertRaises(ValueError):
+            next(self.golos.stream_blocks(mode='invalid'))
+    
+    def test_stream_ops(self):
+        """Test Api.stream_ops filters operations by type and account, attaching block / trx context"""
+        head = self.node.head_block_number
+        expected = [
+            o for n in range(1, head + 1) for o in self.node.block_ops[n]
+            if o['op'][0] == 'transfer' and 'someguy123' in (o['op'][1]['from'], o['op'][1]['to'])
+        ]
+        ops = list(self.golos.stream_ops(op_types=['transfer'], accounts=['someguy123'], start=1, end=head))
+        self.assertGreater(len(ops), 0)
+        self.assertEqual([(o['block'], o['trx_id']) for o in ops], [(o['block'], o['trx_id']) for o in expected])
+        for o in ops:
+            self.assertEqual(o['type_op'], 'transfer')
+            self.assertIn('timestamp', o)
+    
+    def test_deposit_watcher(self):
+        """Test DepositWatcher emits transfers to watched accounts matching a memo pattern, once confirmed"""
+        head = self.node.head_block_number
+        expected = [
+            o for n in range(1, head - 2) for o in self.node.block_ops[n] if o['op'][0] == 'transfer' and
+            o['op'][1]['to'] in ('privex', 'golos') and o['op'][1]['memo'][-1] in '02468'
+        ]
+        watcher = DepositWatcher(self.golos, accounts=['privex'], memo_patterns=[r'[02468]$'], confirmations=3)
+        watcher.add_account('golos')
+        deposits = list(watcher.watch(start=1, end=head - 3, poll_interval=0.05))
+        self.assertGreater(len(deposits), 0)
+        self.assertEqual([(d['block'], d['trx_id']) for d in deposits], [(o['block'], o['trx_id']) for o in expected])
+        
+        lib = self.node.last_irreversible_block_num
+        irreversible = list(DepositWatcher(self.golos, assets=['GBG']).watch(start=1, end=lib))
+        self.assertEqual(irreversible, [])
+    
+    def test_stream_virtual_ops(self):
+        """Test Api.stream_ops can stream only virtual ops, or exclude them"""
+        head = self.node.head_block_number
+        rewards = list(self.golos.stream_ops(op_types='producer_reward', start=1, end=head))
+        self.assertEqual([o['block'] for o in rewards], list(range(1, head + 1)))
+        ops = list(self.golos.stream_ops(start=1, end=head, virtual=False))
+        self.assertTrue(all(not o['virtual_op'] for o in ops))
+        self.assertGreater(len(ops), 0)
+    
+    def test_stream_blocks_waits(self):
+        """Test Api.stream_blocks waits for new blocks once it has caught up with the head block"""
+        head = self.node.head_block_number
+        timer = threading.Timer(0.3, self.node.produce_block)
+        timer.start()
+        blocks = list(islice(self.golos.stream_blocks(poll_interval=0.05), 2))
+        timer.join()
+        self.assertEqual([b['block_num'] for b in blocks], [head, head + 1])
+
+    def test_stream_checkpoint(self):
+        """Test streams resume from a file checkpoint, re-delivering the block which wasn't finished"""
+        with tempfile.TemporaryDirectory() as d:
+            ckpt = FileCheckpoint(os.path.join(d, 'scan.ckpt'))
+            stream = self.golos.stream_blocks(start=1, checkpoint=ckpt)
+            self.assertEqual([b['block_num'] for b in islice(stream, 5)], [1, 2, 3, 4, 5])
+            stream.close()
+            self.assertEqual(ckpt.load(), 4)
+
+            blocks = list(self.golos.stream_blocks(start=1, end=8, checkpoint=ckpt))
+            self.assertEqual([b['block_num'] for b in blocks], [5, 6, 7, 8])
+            self.assertEqual(ckpt.load(), 8)
+            self.assertEqual(os.listdir(d), ['scan.ckpt'])
+
+    def test_stream_ops_checkpoint(self):
+        """Test Api.stream_ops saves SQLite checkpoints every N blocks, and always at the end of the range"""
+        with tempfile.TemporaryDirectory() as d:
+            ckpt = SqliteCheckpoint(os.path.join(d, 'state.db'), name='rewards')
+            ops = self.golos.stream_ops(op_types='producer_reward', start=1, end=10, checkpoint=ckpt,
+                                        checkpoint_every=3)
+            self.assertEqual([o['block'] for o in islice(ops, 8)], list(range(1, 9)))
+            self.assertEqual(ckpt.load(), 6)
+            list(ops)
+            self.assertEqual(ckpt.load(), 10)
+            self.assertIsNone(SqliteCheckpoint(os.path.join(d, 'state.db'), name='other').load())
+            ckpt.close()
+
+
+def _block_summary(block: dict) -> tuple:
+    """Used by :py:meth:`.BlockRangeTests.test_ingest_blocks` - must be module level to run in a worker process"""
+    return block['block_num'], block['witness'], len(block['transactions'])
+
+
+class BlockRangeTests(unittest.TestCase):
+    def test_get_blocks(self):
+        """Test Api.get_blocks returns a large range in order, retrying blocks which failed"""
+        with FakeNode(block_interval=None, initial_blocks=300) as node:
+            failed = set()
+            
+            def _flaky_get_block(num):
+                # Fail the first request for every 50th block
+                if int(num) % 50 == 0 and num not in failed:
+                    failed.add(num)
+                    raise FakeNodeError('Simulated failure for block ${num}', dict(num=num))
+                return node.api_get_block(num)
+            
+            node.register('get_block', _flaky_get_block)
+            g = Api(nodes=[node.url, node.url])
+            blocks = list(g.get_blocks(1, 300, workers=3, chunk_size=40, prefetch=10))
+            self.assertEqual([b['block_num'] for b in blocks], list(range(1, 301)))
+            self.assertEqual(blocks[99]['witness'], node.blocks[100]['witness'])
+            self.assertEqual(len(failed), 6)
+
+    def test_ingest_blocks(self):
+        """Test Api.ingest_blocks decodes and processes blocks in worker processes, yielding results in order"""
+        with FakeNode(block_interval=None, initial_blocks=60, ops_per_block=2) as node:
+            res = list(Api(nodes=node.url).ingest_blocks(1, 60, _block_summary, workers=2, batch_size=7))
+            self.assertEqual(res, [(n, node.blocks[n]['witness'], 2) for n in range(1, 61)])
+
+
+class HeadTrackerTests(unittest.TestCase):
+    def test_block_id(self):
+        """Test block IDs are calculated locally with the block number prefix, unless supplied by the node"""
+        with FakeNode(block_interval=None, initial_blocks=5) as node:
+            block = node.blocks[5]
+            self.assertEqual(block_num_from_id(block_id(block)), 5)
+            self.assertEqual(node.blocks[5]['previous'], block_id(node.blocks[4]))
+            self.assertEqual(block_id(dict(block, block_id='ab' * 20)), 'ab' * 20)
+
+    def test_track_head_fork(self):
+        """Test HeadTracker emits rollback events for orphaned blocks, then the blocks of the new chain"""
+        with FakeNode(block_interval=None, initial_blocks=10, ops_per_block=1) as node:
+            events = iter(Api(nodes=node.url).track_head(start=8, poll_interval=0.05))
+            first = list(islice(events, 3))
+            self.assertEqual([(e.type, e.block_num) for e in first], [('block', 8), ('block', 9), ('block', 10)])
+
+            node.fork(depth=2)
+            evs = list(islice(events, 5))
+            self.assertEqual([(e.type, e.block_num) for e in evs], [
+                ('rollback', 10), ('rollback', 9), ('block', 9), ('block', 10), ('block', 11)
+            ])
+            self.assertEqual([e.block_id for e in evs[:2]], [first[2].block_id, first[1].block_id])
+            self.assertEqual([e.block_id for e in evs[2:]], [node.block_ids[n] for n in (9, 10, 11)])
+            self.assertEqual(evs[2].block['witness'], 'forker')
+
+
+class OpIndexTests(unittest.TestCase):
+    def test_op_index(self):
+        """Test OpIndex syncs operations from a node, resumes, and answers history / trx_id / find_op queries"""
+        with FakeNode(block_interval=None, initial_blocks=30, ops_per_block=2) as node, OpIndex() as idx:
+            g = Api(nodes=node.url)
+            self.assertEqual(idx.sync(g, start=1, end=20, mode='head'), 20)
+            self.assertEqual(idx.sync(g, end=30, mode='head'), 30)
+            
+            hist = idx.get_account_history('privex')
+            expected = [h[1] for h in reversed(node.history['privex'])]
+            self.assertEqual([(h['block'], h['trx_id'], h['type_op']) for h in hist],
+                             [(h['block'], h['trx_id'], h['op'][0]) for h in expected])
+            transfers = idx.get_account_history('privex', op_limit='transfer', start_limit=2)
+            self.assertEqual([t['trx_id'] for t in transfers],
+                             [h['trx_id'] for h in expected if h['op'][0] == 'transfer'])
+            self.assertTrue(all(t['type_op'] == 'transfer' for t in transfers))
+            # Like Api.get_account_history, the newest operation past the age cutoff is included
+            self.assertEqual(idx.get_account_history('privex', age=-60), hist[:1])
+            
+            op = transfers[0]
+            self.assertEqual(idx.query(trx_id=op['trx_id'])[0]['amount'], op['amount'])
+            found = idx.find_op({k: op[k] for k in ('from', 'to', 'amount', 'memo', 'block', 'type_op')})
+            self.assertEqual(found['trx_id'], op['trx_id'])
+            self.assertEqual(idx.find_op(op)['trx_id'], op['trx_id'])
+            self.assertIsNone(idx.find_op(dict(op, memo='nope')))
+            
+            # Re-indexing a block replaces its operations rather than duplicating them
+            count = len(idx.query(start_block=op['block'], end_block=op['block']))
+            idx.add_block_ops(op['block'], node.block_ops[op['block']])
+            self.assertEqual(len(idx.query(start_block=op['block'], end_block=op['block'])), count)
+            idx.remove_blocks(29, 30)
+            self.assertEqual(idx.last_block, 28)
+            self.assertEqual(idx.query(start_block=29), [])
+
+
+    def test_tx_index(self):
+        """Test Api.get_transaction / find_op_transaction use a TxIndex instead of the node when possible"""
+        with FakeNode(block_interval=None, initial_blocks=20, ops_per_block=2) as node, TxIndex() as txs:
+            def _offline(*args):
+                raise FakeNodeError('Node should not have been called')
+            
+            # Transaction IDs are calculated locally, so the operations of each block aren't needed
+            node.register('get_ops_in_block', _offline)
+            self.assertEqual(txs.sync(Api(nodes=node.url), start=5, end=20, mode='head'), 20)
+            
+            # Blocks which can't be serialized locally (e.g. unknown static variant IDs) use the node's trx_ids
+            node.register('get_ops_in_block', node.api_get_ops_in_block)
+            with mock.patch('golos.index.block_trx_ids', side_effect=IndexError('unknown variant')), TxIndex() as other:
+                self.assertEqual(other.sync(Api(nodes=node.url), start=1, end=4, mode='head'), 4)
+                self.assertEqual(other.get_block_transactions(3)[0]['transaction_id'],
+                                 next(k for k, t in node.transactions.items() if t['block_num'] == 3))
+            node.register('get_ops_in_block', _offline)
+            
+            # Blocks indexed out of order, or removed, leave gaps which aren't covered by the index
+            for _ in range(5):
+                node.produce_block()
+            txs.add_block(23, Api(nodes=node.url).rpc.call('get_block', '23'))
+            txs.remove_blocks(8, 9)
+            self.assertEqual([n for n in range(1, 26) if txs.covers(n)], [5, 6, 7] + list(range(10, 21)) + [23])
+            txs.add_block(22, Api(nodes=node.url).rpc.call('get_block', '22'))
+            self.assertTrue(txs.covers(22) and txs.covers(23) and not txs.covers(21))
+            
+            node.register('get_transaction', _offline)
+            node.register('get_block', _offline)
+            g = Api(nodes=node.url, tx_index=txs)
+            txid, tx = next((k, t) for k, t in node.transactions.items() if t['block_num'] == 10)
+            self.assertEqual(g.get_transaction(txid), tx)
+            
+            op = dict(tx['operations'][0][1], block=10, type_op=tx['operations'][0][0])
+            found = g.find_op_transaction(op)
+            self.assertEqual(found['operations'], tx['operations'])
+            self.assertNotIn('block_num', found)
+            with self.assertRaises(exceptions.TransactionNotFound):
+                g.find_op_transaction(dict(op, block=11))
+
+
+def _sample(type_value):
+    """Return a sample value of the types class ``type_value``, which round-trips through the (de)serializer"""
+    key = 'GLS7qHue1h2eWV8M7WKtb6F8dbhKfEFvLVy9JqvSTHBBEM5JMdsmh'
+    perm = {'weight_threshold': 1, 'account_auths': [['someguy123', 1]], 'key_auths': [[key, 1]]}
+    samples = {
+        types.String: 'someguy123', types.Int16: -5, types.Uint16: 10000, types.Uint32: 123456, types.Uint64: 2 ** 40,
+        types.Bool: True, types.Amount: '1.500 GOLOS', types.PointInTime: '2019-10-01T12:50:00', types.Bytes: 'abcd',
+        types.PublicKey: key, types.Permission: perm, types.Optional_Permission: perm, types.ArrayString: ['a', 'bc'],
+        types.Set: [], types.ExtensionsComment: [[2, {'percent': 5000}]], types.Version: '0.19.0',
+        operations.Operation: ['transfer', {'from': 'a', 'to': 'b', 'amount': '0.001 GBG', 'memo': ''}],
+    }
+    if type_value in samples:
+        return samples[type_value]
+    if issubclass(type_value, types.Struct):
+        return {k: _sample(t) for k, t in type_value.fields}
+    if issubclass(type_value, (types.ArrayOf, types.OptionalOf)):
+        return [_sample(type_value.type)] if issubclass(type_value, types.ArrayOf) else _sample(type_value.type)
+    if issubclass(type_value, types.StaticVariantOf):
+        return [len(type_value.types) - 1, _sample(type_value.types[-1][1])]
+    if issubclass(type_value, types.FixedBytes):
+        return 'ab' * type_value.length
+    if issubclass(type_value, types.Enum):
+        return type_value.names[-1]
+    raise ValueError(f'No sample for {type_value}')
+
+
+class SerializerTests(unittest.TestCase):
+    def test_transaction_id(self):
+        """Test transaction IDs and hex are calculated locally, matching the node's"""
+        def _offline(*args):
+            raise FakeNodeError('Node should not have been called')
+        
+        with FakeNode(block_interval=None) as node:
+            node.register('get_transaction_hex', _offline)
+            g = Api(nodes=node.url)
+            for t in TEST_TXS:
+                self.assertEqual(transaction_id(t['tx']), t['txid'])
+                self.assertEqual(g.get_transaction_id(t['tx']), t['txid'])
+        self.assertEqual(serialize_transaction(TEST_TXS[0]['tx'], include_signatures=False).hex(), TEST_TX_HEX)
+        signed = serialize_transaction(TEST_TXS[0]['tx'])
+        self.assertEqual(signed[-66:], b'\x01' + bytes.fromhex(TEST_TXS[0]['tx']['signatures'][0]))
+    
+    def test_get_transaction_hex(self):
+        """Test Api.get_transaction_hex returns the node's hex (the unsigned transaction), locally or via the node"""
+        def _offline(*args):
+            raise FakeNodeError('Node should not have been called')
+        
+        tx = TEST_TXS[0]['tx']
+        with FakeNode(block_interval=None) as node:
+            g = Api(nodes=node.url)
+            self.assertEqual(g.rpc.call('get_transaction_hex', tx), TEST_TX_HEX)
+            node.register('get_transaction_hex', _offline)
+            self.assertEqual(g.get_transaction_hex(tx), TEST_TX_HEX)
+            self.assertEqual(g.get_transaction_hex(tx, remove_sigs=True), TEST_TX_HEX)
+            self.assertEqual(g.get_transaction_hex(dict(tx, signatures=[])), TEST_TX_HEX)
+    
+    def test_compiled_operations(self):
+        """Test the compiled per-operation serializers output the same bytes as the generic types based path"""
+        perm = {'weight_threshold': 1, 'account_auths': [['someguy123', 1]],
+                'key_auths': [['GLS7qHue1h2eWV8M7WKtb6F8dbhKfEFvLVy9JqvSTHBBEM5JMdsmh', 1]]}
+        ops = [
+            TEST_TXS[0]['tx']['operations'][0],
+            ['transfer', {'from': 'a', 'to': 'b', 'amount': '1.5 GBG',
+                          'memo': 'line\nbreak \x01\x08\x0c ютф ' * 20}],
+            ['vote', {'voter': 'someguy123', 'author': 'ksantoprotein', 'permlink': 'test', 'weight': -500}],
+            ['comment_options', {
+                'author': 'a', 'permlink': 'p', 'max_accepted_payout': '1000000.000 GBG',
+                'percent_steem_dollars': 10000, 'allow_votes': True, 'allow_curation_rewards': False,
+                'extensions': [[0, {'beneficiaries': [{'account': 'someguy123', 'weight': 1000}]}]]
+            }],
+            ['account_create', {'fee': '1.000 GOLOS', 'creator': 'a', 'new_account_name': 'b', 'owner': perm,
+                                'active': perm, 'posting': perm, 'memo_key': perm['key_auths'][0][0],
+                                'json_metadata': '{}'}],
+            ['custom_json', {'required_auths': [], 'required_posting_auths': ['a'], 'id': 'follow', 'json': '[]'}],
+            ['delegate_vesting_shares_with_interest', {'delegator': 'a', 'delegatee': 'b',
+                                                       'vesting_shares': '1.000000 GESTS', 'interest_rate': 500,
+                                                       'extensions': []}],
+        ]
+        for op in ops:
+            self.assertEqual(serialize_operation(op), serialize_operation(op, compiled=False), op[0])
+    
+    def test_types_write(self):
+        """Test types append to a shared buffer with write(), giving the same bytes as bytes() on each of them"""
+        perm = {'weight_threshold': 1, 'account_auths': [['someguy123', 1]],
+                'key_auths': [['GLS7qHue1h2eWV8M7WKtb6F8dbhKfEFvLVy9JqvSTHBBEM5JMdsmh', 1]]}
+        objs = [String('someguy123'), Permission(perm), Optional_Permission(None), Amount('0.100 GOLOS'),
+                ExtensionsComment([[0, {'beneficiaries': [{'account': 'a', 'weight': 1}]}], [2, {'percent': 5}]]),
+                Map([[String('k'), Uint16(1)]]), ArrayString(['a', 'bc'])]
+        buf = bytearray(b'prefix')
+        for o in objs:
+            o.write(buf)
+        self.assertEqual(bytes(buf), b'prefix' + b''.join(bytes(o) for o in objs))
+    
+    def test_integer_types_str(self):
+        """Test str() of the integer types gives the plain number"""
+        for cls in (types.Uint8, types.Int16, types.Uint16, types.Uint32, types.Uint64, types.Int64):
+            self.assertEqual(str(cls(5)), '5', cls.__name__)
+        self.assertEqual(str(types.Int64(-5)), '-5')
+    
+    def test_string_unicodify(self):
+        """Test String rewrites control characters (without a backslash), keeping tabs, newlines and unicode"""
+        self.assertEqual(String('привет\tмир\r\n').unicodify(), 'привет\tмир\r\n'.encode('utf-8'))
+        self.assertEqual(String('a\x00b\x08c\x0bd\x0ce\x1f').unicodify(), b'au0000bbcu000bdfeu001f')
+        self.assertEqual(bytes(String('\x01')), b'\x05u0001')
+    
+    def test_amount(self):
+        """Test Amount holds exact integer satoshis, including amounts too large for a float"""
+        a = Amount('103773498357.264930 GESTS')
+        self.assertEqual(a.satoshis, 103773498357264930)
+        self.assertEqual(bytes(a), struct.pack('<qb7s', 103773498357264930, 6, b'GESTS'))
+        self.assertEqual(str(a), '103773498357.264930 GESTS')
+        self.assertEqual(a.amount, Decimal('103773498357.264930'))
+        self.assertEqual(str(Amount('1 GOLOS')), '1.000 GOLOS')
+        self.assertEqual(str(Amount.from_number(Decimal('0.1235'), 'GOLOS')), '0.124 GOLOS')
+        self.assertEqual(Amount('1.500 GOLOS') + Amount('0.250 GOLOS') - Amount('0.750 GOLOS'), Amount('1.000 GOLOS'))
+        self.assertEqual(str(3 * Amount('0.001 GBG')), '0.003 GBG')
+        self.assertLess(Amount('0.001 GBG'), Amount('0.002 GBG'))
+        with self.assertRaises(AttributeError):
+            a.satoshis = 1
+        with self.assertRaises(ValueError):
+            Amount('1.000 GOLOS') + Amount('1.000 GBG')
+        with self.assertRaises(ValueError):
+            Amount('abc GOLOS')
+    
+    def test_deserialize(self):
+        """Test transactions and blocks decode back into the dicts they were serialized from"""
+        tx = dict(TEST_TXS[0]['tx'])
+        for k in ('block_num', 'transaction_id', 'transaction_num'):
+            tx.pop(k)
+        perm = {'weight_threshold': 1, 'account_auths': [['someguy123', 1]],
+                'key_auths': [['GLS7qHue1h2eWV8M7WKtb6F8dbhKfEFvLVy9JqvSTHBBEM5JMdsmh', 1]]}
+        multi = dict(tx, signatures=[], operations=[
+            ['comment_options', {
+                'author': 'a', 'permlink': 'p', 'max_accepted_payout': '1000000.000 GBG',
+                'percent_steem_dollars': 10000, 'allow_votes': True, 'allow_curation_rewards': False,
+                'extensions': [[0, {'beneficiaries': [{'account': 'someguy123', 'weight': 1000}]}]]
+            }],
+            ['account_update', {'account': 'a', 'owner': None, 'active': perm, 'posting': None,
+                                'memo_key': perm['key_auths'][0][0], 'json_metadata': '{"ютф": 1}'}],
+            ['vote', {'voter': 'someguy123', 'author': 'ksantoprotein', 'permlink': 'test', 'weight': -500}],
+        ])
+        self.assertEqual(decode_transaction(serialize_transaction(tx)), tx)
+        self.assertEqual(list(iter_transactions(serialize_transaction(tx) + serialize_transaction(multi))), [tx, multi])
+        with FakeNode(block_interval=None, initial_blocks=5, ops_per_block=3) as node:
+            blocks = [node.blocks[n] for n in range(1, 6)]
+            self.assertEqual(list(iter_blocks(b''.join(serialize_block(b) for b in blocks))), blocks)
+    
+    def test_all_operations(self):
+        """Test every operation in storage.op_names has a schema, and round-trips through the (de)serializer"""
+        for name in storage.op_names:
+            op = [name, {k: _sample(t) for k, t in operations.type_op[name]}]
+            data = serialize_operation(op)
+            self.assertEqual(data, serialize_operation(op, compiled=False), name)
+            r = Reader(data)
+            self.assertEqual(read_operation(r), op, name)
+            self.assertEqual(r.remaining, 0, name)
+    
+    def test_unsupported_operation(self):
+        """Test serializing an operation without a local definition raises UnsupportedOperation"""
+        tx = dict(TEST_TXS[0]['tx'], operations=[['not_an_operation', {}]])
+        with self.assertRaises(exceptions.UnsupportedOperation):
+            transaction_id(tx)
+    
+    def test_timestamps(self):
+        """Test the fast timestamp helpers match strptime / strftime / timegm"""
+        for ts in ['1970-01-01T00:00:00', '2016-10-18T11:20:30', '2019-12-31T23:59:59', '2038-01-19T03:14:07']:
+            dt = datetime.strptime(ts, storage.time_format)
+            epoch = timegm(dt.timetuple())
+            self.assertEqual(parse_timestamp(ts), dt)
+            self.assertEqual(format_timestamp(dt), dt.strftime(storage.time_format))
+            self.assertEqual(timestamp_to_epoch(ts), epoch)
+            self.assertEqual(epoch_to_timestamp(epoch), ts)
+        with self.assertRaises(ValueError):
+            parse_timestamp('2019-13-01T00:00:00')
+        with self.assertRaises(ValueError):
+            parse_timestamp('not a timestamp')
+
+
+class BlockLogTests(unittest.TestCase):
+    def test_block_log(self):
+        """Test BlockLog reads blocks by number and range from a block_log, with or without its index"""
+        with FakeNode(block_interval=None, initial_blocks=12, ops_per_block=2) as node, \
+                tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'block_log')
+            with open(path, 'wb') as fh, open(path + '.index', 'wb') as idx:
+                for n in range(1, 13):
+                    pos = fh.tell()
+                    fh.write(serialize_block(node.blocks[n]) + struct.pack('<Q', pos))
+                    idx.write(struct.pack('<Q', pos))
+            
+            with BlockLog(path) as bl:
+                self.assertEqual(bl.head_block_num, 12)
+                self.assertEqual(bl.get_block(7), node.blocks[7])
+                self.assertEqual(list(bl.blocks(10)), [(n, node.blocks[n]) for n in range(10, 13)])
+                with self.assertRaises(IndexError):
+                    bl.get_block(13)
+            os.remove(path + '.index')
+            with BlockLog(path) as bl:
+                self.assertEqual(bl.head_block_num, 12)
+                self.assertEqual(list(bl.blocks(1, 3)), [(n, node.blocks[n]) for n in range(1, 4)])
+                self.assertEqual(bl.get_block(12), node.blocks[12])
+
+
+class NodeBenchTests(unittest.TestCase):
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        data = list(range(1, 11))
+        self.assertEqual(percentile(data, 50), 5)
+        self.assertEqual(percentile(data, 90), 9)
+        self.assertEqual(percentile(data, 100), 10)
+        self.assertEqual(percentile([], 50), 0.0)
+    
+    def test_rank_nodes(self):
+        """Test bench_nodes ranks lagging and dead nodes last, and WsClient loads the saved ranking in order"""
+        with FakeNode(block_interval=None, initial_blocks=30) as good, \
+                FakeNode(block_interval=None, initial_blocks=10) as lagging:
+            dead = 'ws://127.0.0.1:1'
+            res = bench_nodes([dead, lagging.url, good.url], samples=3, concurrency=2, duration=0.2)
+            self.assertEqual([r['node'] for r in res], [good.url, lagging.url, dead])
+            self.assertEqual(res[1]['head_lag'], 20)
+            self.assertFalse(res[2]['ok'])
+            with tempfile.TemporaryDirectory() as d:
+                path = os.path.join(d, 'nodes.json')
+                save_ranking(path, res)
+                rpc = WsClient(nodes_file=path)
+                self.assertEqual(rpc.url, good.url)
+                rpc.next_node()
+                self.assertEqual(rpc.url, lagging.url)
+    
+    def test_bench_node_closes(self):
+        """Test bench_node closes its connection when the node fails mid-benchmark"""
+        rpc = mock.Mock()
+        rpc.call.side_effect = ConnectionResetError('connection reset')
+        with mock.patch('golos.bench._connect', return_value=(rpc, 0.01)):
+            res = bench_node('ws://127.0.0.1:1', samples=1, duration=0)
+        self.assertFalse(res['ok'])
+        self.assertIn('ConnectionResetError', res['error'])
+        rpc.close.assert_called_once_with()
+
+
 class GolosKeyTests(unittest.TestCase):
     
     def test_compare_keys(self):